@@ -3,25 +3,41 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserChangeForm, UserCreationForm
 from django.utils.html import format_html
+from django.template.defaultfilters import filesizeformat
 from django.urls import reverse, path
-from django.shortcuts import render, redirect
-from django.http import HttpResponseRedirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponseRedirect, FileResponse, Http404
 from django.contrib import messages
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Count, Sum, Avg, Q
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.safestring import mark_safe
 from django.conf import settings
 import json
 from datetime import timedelta, datetime
+from .signals import properties_bulk_updated
+from . import bulk_email, export_jobs, exports, lead_stats, outbox, seller_stats
 from .models import (
     CustomUser, UserProfile, MembershipPlan, UserMembership,
     Property, PropertyImage, PropertyInquiry, PropertyView,
-    PropertyCategory, PropertyType
+    PropertyCategory, PropertyType, ExportJob, BulkEmail, EmailDelivery, EmailOutbox
 )
 
 
+def queue_export(modeladmin, request, queryset, export_name, fmt='csv', compress=False):
+    """Enqueue a background export of ``queryset`` (see export_jobs.py)"""
+    job = export_jobs.enqueue(export_name, queryset, request.user, fmt, compress)
+    modeladmin.message_user(
+        request,
+        format_html(
+            'Export queued as job #{}. <a href="{}">Track its progress</a>.',
+            job.pk, reverse('admin:estate_app_exportjob_change', args=[job.pk])
+        ),
+        messages.SUCCESS
+    )
+
+
 class CustomUserCreationForm(UserCreationForm):
     """Custom user creation form for admin"""
     class Meta(UserCreationForm.Meta):
@@ -173,6 +189,7 @@ class CustomUserAdmin(BaseUserAdmin):
         'impersonate_users',
         'send_welcome_email',
         'export_user_data',
+        'export_user_data_jsonl',
         'bulk_update_membership',
     ]
     
@@ -263,62 +280,33 @@ class CustomUserAdmin(BaseUserAdmin):
     impersonate_users.short_description = "👤 Impersonate User"
     
     def send_welcome_email(self, request, queryset):
-        for user in queryset:
-            subject = 'Welcome to BHOOSPARSH - Your Account is Ready!'
-            message = render_to_string('emails/welcome.html', {
-                'user': user,
-                'login_url': request.build_absolute_uri('/login/')
-            })
-            
-            send_mail(
-                subject,
-                '',
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=message,
-                fail_silently=True
-            )
+        subject = 'Welcome to BHOOSPARSH - Your Account is Ready!'
+        login_url = request.build_absolute_uri('/login/')
+        count = 0
+        with transaction.atomic():
+            for user in queryset:
+                message = render_to_string('emails/welcome.html', {
+                    'user': user,
+                    'login_url': login_url
+                })
+                outbox.enqueue(subject, user.email, html_body=message, category='welcome')
+                count += 1
         
         self.message_user(
             request,
-            f'Welcome email sent to {queryset.count()} user(s).',
+            f'Welcome email queued for {count} user(s).',
             messages.SUCCESS
         )
     send_welcome_email.short_description = "📧 Send Welcome Email"
     
     def export_user_data(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="users_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Email', 'Full Name', 'User Type', 'Phone', 
-            'City', 'Join Date', 'Properties', 'Status'
-        ])
-        
-        for user in queryset:
-            try:
-                city = user.profile.city
-            except:
-                city = ''
-            
-            writer.writerow([
-                user.email,
-                user.full_name,
-                user.get_user_type_display(),
-                user.phone,
-                city,
-                user.date_joined.strftime('%Y-%m-%d'),
-                user.properties.count(),
-                'Active' if user.is_active else 'Inactive'
-            ])
-        
-        return response
+        queue_export(self, request, queryset, 'admin_users')
     export_user_data.short_description = "📥 Export User Data (CSV)"
     
+    def export_user_data_jsonl(self, request, queryset):
+        queue_export(self, request, queryset, 'admin_users', 'jsonl', compress=True)
+    export_user_data_jsonl.short_description = "📥 Export User Data (JSONL.gz)"
+    
     def bulk_update_membership(self, request, queryset):
         # This would show a custom page for bulk membership update
         from django.shortcuts import render
@@ -360,7 +348,8 @@ class CustomUserAdmin(BaseUserAdmin):
             path('impersonate/<int:user_id>/', self.admin_site.admin_view(self.impersonate_view)),
             path('stop-impersonating/', self.admin_site.admin_view(self.stop_impersonating_view)),
             path('dashboard-stats/', self.admin_site.admin_view(self.dashboard_stats_view)),
-            path('send-bulk-email/', self.admin_site.admin_view(self.send_bulk_email_view)),
+            path('send-bulk-email/', self.admin_site.admin_view(self.send_bulk_email_view),
+                 name='send-bulk-email'),
             path('user-activity/<int:user_id>/', self.admin_site.admin_view(self.user_activity_view)),
         ]
         return custom_urls + urls
@@ -452,38 +441,34 @@ class CustomUserAdmin(BaseUserAdmin):
         return render(request, 'admin/dashboard_stats.html', context)
     
     def send_bulk_email_view(self, request):
-        """Send bulk email to users"""
+        """Queue a bulk email; ``manage.py send_bulk_emails`` delivers it"""
         if request.method == 'POST':
-            subject = request.POST.get('subject')
-            message = request.POST.get('message')
+            subject = request.POST.get('subject', '').strip()
+            message = request.POST.get('message', '').strip()
             user_type = request.POST.get('user_type', 'all')
             
-            if user_type == 'all':
-                users = CustomUser.objects.filter(is_active=True)
-            else:
-                users = CustomUser.objects.filter(user_type=user_type, is_active=True)
+            if not subject or not message:
+                messages.error(request, 'Subject and message are required')
+                return redirect('admin:send-bulk-email')
+            if user_type not in dict(BulkEmail.AUDIENCE_CHOICES):
+                user_type = 'all'
             
-            sent_count = 0
-            for user in users:
-                try:
-                    send_mail(
-                        subject,
-                        '',
-                        settings.DEFAULT_FROM_EMAIL,
-                        [user.email],
-                        html_message=message,
-                        fail_silently=True
-                    )
-                    sent_count += 1
-                except:
-                    pass
-            
-            messages.success(request, f'Email sent to {sent_count} users')
+            campaign = bulk_email.enqueue(subject, message, user_type, request.user)
+            messages.success(
+                request,
+                format_html(
+                    'Email queued for {}. <a href="{}">Track its delivery</a>.',
+                    campaign.get_audience_display(),
+                    reverse('admin:estate_app_bulkemail_change', args=[campaign.pk])
+                )
+            )
             return redirect('admin:send-bulk-email')
         
         context = {
             **self.admin_site.each_context(request),
             'title': 'Send Bulk Email',
+            'audience_choices': BulkEmail.AUDIENCE_CHOICES,
+            'recent_campaigns': BulkEmail.objects.all()[:10],
         }
         return render(request, 'admin/send_bulk_email.html', context)
     
@@ -654,14 +639,23 @@ class PropertyAdmin(admin.ModelAdmin):
         'mark_as_sold',
         'renew_properties',
         'export_properties',
+        'export_properties_jsonl',
     ]
     
     def price_display(self, obj):
         return obj.formatted_price
     price_display.short_description = 'Price'
     
+    def _bulk_update(self, queryset, **values):
+        """queryset.update() that tells listing indexes/caches what changed"""
+        ids = list(queryset.values_list('pk', flat=True))
+        values.setdefault('updated_at', timezone.now())
+        updated = queryset.update(**values)
+        properties_bulk_updated.send(sender=Property, ids=ids, fields=set(values))
+        return updated
+    
     def approve_properties(self, request, queryset):
-        updated = queryset.update(status='active', published_at=timezone.now())
+        updated = self._bulk_update(queryset, status='active', published_at=timezone.now())
         self.message_user(
             request,
             f'Successfully approved {updated} property(s).',
@@ -670,7 +664,7 @@ class PropertyAdmin(admin.ModelAdmin):
     approve_properties.short_description = "✅ Approve Properties"
     
     def reject_properties(self, request, queryset):
-        updated = queryset.update(status='rejected')
+        updated = self._bulk_update(queryset, status='rejected')
         self.message_user(
             request,
             f'Successfully rejected {updated} property(s).',
@@ -679,7 +673,7 @@ class PropertyAdmin(admin.ModelAdmin):
     reject_properties.short_description = "❌ Reject Properties"
     
     def make_featured(self, request, queryset):
-        updated = queryset.update(is_featured=True)
+        updated = self._bulk_update(queryset, is_featured=True)
         self.message_user(
             request,
             f'Successfully featured {updated} property(s).',
@@ -688,7 +682,7 @@ class PropertyAdmin(admin.ModelAdmin):
     make_featured.short_description = "⭐ Make Featured"
     
     def remove_featured(self, request, queryset):
-        updated = queryset.update(is_featured=False)
+        updated = self._bulk_update(queryset, is_featured=False)
         self.message_user(
             request,
             f'Successfully removed featured from {updated} property(s).',
@@ -697,7 +691,7 @@ class PropertyAdmin(admin.ModelAdmin):
     remove_featured.short_description = "📌 Remove Featured"
     
     def mark_as_sold(self, request, queryset):
-        updated = queryset.update(status='sold')
+        updated = self._bulk_update(queryset, status='sold')
         self.message_user(
             request,
             f'Successfully marked {updated} property(s) as sold.',
@@ -721,37 +715,13 @@ class PropertyAdmin(admin.ModelAdmin):
     renew_properties.short_description = "🔄 Renew Properties"
     
     def export_properties(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="properties_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'ID', 'Title', 'Owner', 'Type', 'Status', 'City', 
-            'Price', 'Area', 'Bedrooms', 'Bathrooms', 'Views', 'Leads'
-        ])
-        
-        for property in queryset:
-            writer.writerow([
-                property.property_id,
-                property.title[:50],
-                property.owner.email,
-                property.get_property_for_display(),
-                property.get_status_display(),
-                property.city,
-                property.price,
-                property.carpet_area,
-                property.bedrooms or '',
-                property.bathrooms or '',
-                property.view_count,
-                property.inquiry_count
-            ])
-        
-        return response
+        queue_export(self, request, queryset, 'admin_properties')
     export_properties.short_description = "📥 Export Properties (CSV)"
     
+    def export_properties_jsonl(self, request, queryset):
+        queue_export(self, request, queryset, 'admin_properties', 'jsonl', compress=True)
+    export_properties_jsonl.short_description = "📥 Export Properties (JSONL.gz)"
+    
     # Custom change form for better UX
     def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
         extra_context = extra_context or {}
@@ -801,6 +771,7 @@ class PropertyInquiryAdmin(admin.ModelAdmin):
         'mark_as_converted',
         'assign_to_agent',
         'export_leads',
+        'export_leads_jsonl',
     ]
     
     def status_badge(self, obj):
@@ -833,7 +804,11 @@ class PropertyInquiryAdmin(admin.ModelAdmin):
     response_status.short_description = 'Response'
     
     def mark_as_contacted(self, request, queryset):
-        updated = queryset.update(status='contacted', responded_at=timezone.now(), responded_by=request.user)
+        owner_ids = lead_stats.owner_ids(queryset)
+        updated = queryset.update(status='contacted', responded_at=timezone.now(), responded_by=request.user,
+                                   updated_at=timezone.now())
+        lead_stats.invalidate(*owner_ids)
+        seller_stats.reconcile(owner_ids)
         self.message_user(
             request,
             f'Marked {updated} lead(s) as contacted.',
@@ -842,7 +817,10 @@ class PropertyInquiryAdmin(admin.ModelAdmin):
     mark_as_contacted.short_description = "📞 Mark as Contacted"
     
     def mark_as_interested(self, request, queryset):
-        updated = queryset.update(status='interested')
+        owner_ids = lead_stats.owner_ids(queryset)
+        updated = queryset.update(status='interested', updated_at=timezone.now())
+        lead_stats.invalidate(*owner_ids)
+        seller_stats.reconcile(owner_ids)
         self.message_user(
             request,
             f'Marked {updated} lead(s) as interested.',
@@ -851,7 +829,10 @@ class PropertyInquiryAdmin(admin.ModelAdmin):
     mark_as_interested.short_description = "⭐ Mark as Interested"
     
     def mark_as_converted(self, request, queryset):
-        updated = queryset.update(status='converted')
+        owner_ids = lead_stats.owner_ids(queryset)
+        updated = queryset.update(status='converted', updated_at=timezone.now())
+        lead_stats.invalidate(*owner_ids)
+        seller_stats.reconcile(owner_ids)
         self.message_user(
             request,
             f'Marked {updated} lead(s) as converted.',
@@ -885,33 +866,13 @@ class PropertyInquiryAdmin(admin.ModelAdmin):
     assign_to_agent.short_description = "👥 Assign to Agent"
     
     def export_leads(self, request, queryset):
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="leads_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Date', 'Name', 'Email', 'Phone', 'Property', 
-            'Status', 'Source', 'Response'
-        ])
-        
-        for lead in queryset:
-            writer.writerow([
-                lead.created_at.strftime('%Y-%m-%d %H:%M'),
-                lead.name,
-                lead.email,
-                lead.phone,
-                lead.property.title,
-                lead.get_status_display(),
-                lead.get_source_display(),
-                'Yes' if lead.response else 'No'
-            ])
-        
-        return response
+        queue_export(self, request, queryset, 'admin_leads')
     export_leads.short_description = "📥 Export Leads (CSV)"
     
+    def export_leads_jsonl(self, request, queryset):
+        queue_export(self, request, queryset, 'admin_leads', 'jsonl', compress=True)
+    export_leads_jsonl.short_description = "📥 Export Leads (JSONL.gz)"
+    
     # Custom form to make it easier to respond
     def get_form(self, request, obj=None, **kwargs):
         form = super().get_form(request, obj, **kwargs)
@@ -1298,6 +1259,133 @@ class PropertyViewAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Admin for background export jobs"""
+    list_display = ('id', 'export', 'format_display', 'status', 'progress_display',
+                    'bytes_display', 'requested_by', 'created_at', 'download_link')
+    list_filter = ('status', 'export', 'format')
+    search_fields = ('export', 'requested_by__email')
+    readonly_fields = ('export', 'format', 'compress', 'requested_by', 'status', 'rows_total',
+                       'rows_processed', 'bytes_written', 'error', 'download_link',
+                       'created_at', 'started_at', 'finished_at', 'expires_at')
+    exclude = ('object_ids', 'file')
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def format_display(self, obj):
+        return f"{obj.get_format_display()}{' (gzip)' if obj.compress else ''}"
+    format_display.short_description = 'Format'
+    
+    def progress_display(self, obj):
+        if obj.rows_total is None:
+            return f"{obj.rows_processed} rows"
+        return f"{obj.rows_processed} / {obj.rows_total} rows ({obj.progress}%)"
+    progress_display.short_description = 'Progress'
+    
+    def bytes_display(self, obj):
+        return filesizeformat(obj.bytes_written)
+    bytes_display.short_description = 'Size'
+    
+    def download_link(self, obj):
+        if obj.status == 'done' and obj.file:
+            return format_html(
+                '<a href="{}">Download</a>',
+                reverse('admin:estate_app_exportjob_download', args=[obj.pk])
+            )
+        return '-'
+    download_link.short_description = 'File'
+    
+    def retry_jobs(self, request, queryset):
+        count = export_jobs.requeue(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Requeued {count} failed export job(s).', messages.SUCCESS)
+    retry_jobs.short_description = "🔄 Retry Failed Jobs"
+    
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view),
+                 name='estate_app_exportjob_download'),
+        ]
+        return custom_urls + urls
+    
+    def download_view(self, request, job_id):
+        """Serve a finished export to staff (the file name is not guessable)"""
+        job = get_object_or_404(ExportJob, pk=job_id, status='done')
+        if not self.has_view_permission(request, job) or not job.file:
+            raise Http404
+        return FileResponse(job.file.open('rb'), as_attachment=True,
+                            filename=exports.filename(f'{job.export}_{job.pk}', job.format, job.compress))
+
+
+
+@admin.register(BulkEmail)
+class BulkEmailAdmin(admin.ModelAdmin):
+    """Admin for bulk email campaigns (queued from Send Bulk Email)"""
+    list_display = ('subject', 'audience', 'status', 'progress_display', 'failed_count',
+                    'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'audience')
+    search_fields = ('subject', 'created_by__email')
+    readonly_fields = ('subject', 'html_message', 'audience', 'created_by', 'status',
+                       'recipients_total', 'sent_count', 'failed_count', 'last_user_id', 'error',
+                       'deliveries_link', 'created_at', 'started_at', 'finished_at')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def progress_display(self, obj):
+        if obj.recipients_total is None:
+            return f"{obj.sent_count} sent"
+        return f"{obj.sent_count} / {obj.recipients_total} sent"
+    progress_display.short_description = 'Progress'
+    
+    def deliveries_link(self, obj):
+        return format_html(
+            '<a href="{}?bulk_email__id__exact={}">View delivery log</a>',
+            reverse('admin:estate_app_emaildelivery_changelist'), obj.pk
+        )
+    deliveries_link.short_description = 'Deliveries'
+
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    """Per-recipient delivery log of bulk emails"""
+    list_display = ('email', 'bulk_email', 'status', 'attempts', 'error', 'created_at')
+    list_filter = ('status', 'bulk_email')
+    search_fields = ('email', 'bulk_email__subject')
+    readonly_fields = ('bulk_email', 'user', 'email', 'status', 'attempts', 'error', 'created_at')
+    list_select_related = ('bulk_email',)
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Transactional email queue, including dead-lettered messages"""
+    list_display = ('subject', 'recipients_display', 'category', 'status', 'attempts',
+                    'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'category')
+    search_fields = ('subject', 'to')
+    readonly_fields = ('category', 'subject', 'body', 'html_body', 'from_email', 'to', 'reply_to',
+                       'status', 'attempts', 'next_attempt_at', 'claimed_at', 'last_error',
+                       'created_at', 'sent_at')
+    actions = ['requeue_emails']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def recipients_display(self, obj):
+        return ', '.join(obj.to)
+    recipients_display.short_description = 'To'
+    
+    def requeue_emails(self, request, queryset):
+        count = outbox.requeue(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'Requeued {count} dead email(s).', messages.SUCCESS)
+    requeue_emails.short_description = "🔄 Requeue Dead Emails"
+
 # Custom Admin Site Configuration
 class CustomAdminSite(admin.AdminSite):
     """Custom Admin Site with enhanced features"""
@@ -1438,6 +1526,10 @@ admin_site.register(PropertyInquiry, PropertyInquiryAdmin)
 admin_site.register(PropertyCategory, PropertyCategoryAdmin)
 admin_site.register(PropertyType, PropertyTypeAdmin)
 admin_site.register(PropertyView, PropertyViewAdmin)
+admin_site.register(ExportJob, ExportJobAdmin)
+admin_site.register(BulkEmail, BulkEmailAdmin)
+admin_site.register(EmailDelivery, EmailDeliveryAdmin)
+admin_site.register(EmailOutbox, EmailOutboxAdmin)
 
 # Replace default admin
 admin.site = admin_site
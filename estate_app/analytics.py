@@ -0,0 +1,370 @@
+"""
+Daily analytics rollup (PropertyDailyStats) and the seller chart queries.
+
+Raw PropertyView / PropertyInquiry rows are aggregated per property and day
+with a couple of grouped queries, and seller dashboards only ever read the
+small rollup table.
+
+``refresh`` is incremental and idempotent: it recomputes whole days instead
+of adding to counters, so re-running it (or running it late) never double
+counts. Each run recomputes
+
+* every day since the previous run, minus ``VIEW_LATENESS`` because buffered
+  views are written after the fact (see view_tracking.py)
+* the creation day of older inquiries whose status changed since then (bulk
+  ``QuerySet.update()`` callers must set ``updated_at`` for this to work;
+  callers deleting inquiries rebuild their days with ``rebuild_property_days``)
+
+Run it every 15 minutes with ``manage.py rollup_daily_stats``: seller charts
+read only the rollup, so they lag the raw rows by up to that cadence. Pages
+showing "today" numbers use ``today_counts``, which reads the raw rows.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import CharField, Count, Max, Min, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, ExtractHour, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import PropertyDailyStats, PropertyInquiry, PropertyView
+
+logger = logging.getLogger(__name__)
+
+# Buffered views may be flushed up to this long after they happened
+VIEW_LATENESS = timedelta(days=1)
+
+# Days recomputed per batch when backfilling
+BACKFILL_CHUNK_DAYS = 31
+
+STATUS_COLUMNS = {status: f'inquiries_{status}' for status, _label in PropertyInquiry.STATUS_CHOICES}
+SOURCE_CHOICES = PropertyInquiry._meta.get_field('source').choices
+SOURCE_COLUMNS = {source: f'source_{source}' for source, _label in SOURCE_CHOICES}
+DEVICE_COLUMNS = {device: f'views_{device}' for device, _label in PropertyView.DEVICE_CHOICES}
+
+SOURCE_COLORS = {
+    'website': '#10B981',
+    'phone': '#0E68B9',
+    'whatsapp': '#8B5CF6',
+    'email': '#F59E0B',
+    'walkin': '#EF4444',
+}
+
+
+def _day_bounds(start, end):
+    """Aware datetimes covering the dates start..end (inclusive)"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+# ======================================================
+# Aggregation
+# ======================================================
+
+def _view_counts(views):
+    # A visitor is the user, else the session, else the IP address
+    visitor = Coalesce(
+        Cast('user_id', CharField()), 'session_key', Cast('ip_address', CharField()),
+        output_field=CharField(),
+    )
+    return (
+        views.annotate(day=TruncDate('viewed_at'))
+        .values('property_id', 'day')
+        .annotate(
+            views=Count('id'),
+            unique_visitors=Count(visitor, distinct=True),
+            **{column: Count('id', filter=Q(device_type=device)) for device, column in DEVICE_COLUMNS.items()},
+        )
+        .order_by()
+    )
+
+
+def _inquiry_counts(inquiries):
+    return (
+        inquiries.order_by().annotate(day=TruncDate('created_at'))
+        .values('property_id', 'day')
+        .annotate(
+            inquiries=Count('id'),
+            **{column: Count('id', filter=Q(status=status)) for status, column in STATUS_COLUMNS.items()},
+            **{column: Count('id', filter=Q(source=source)) for source, column in SOURCE_COLUMNS.items()},
+        )
+        .order_by()
+    )
+
+
+def _compute(views, inquiries, computed_at):
+    """Unsaved PropertyDailyStats rows for the given raw querysets"""
+    rows = {}
+    for counts in list(_view_counts(views)) + list(_inquiry_counts(inquiries)):
+        key = (counts.pop('property_id'), counts.pop('day'))
+        row = rows.setdefault(key, PropertyDailyStats(property_id=key[0], date=key[1], computed_at=computed_at))
+        for column, value in counts.items():
+            setattr(row, column, value)
+    return list(rows.values())
+
+
+def rebuild_days(start, end):
+    """Recompute every property's rows for the dates start..end"""
+    computed_at = timezone.now()
+    count = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), end)
+        low, high = _day_bounds(chunk_start, chunk_end)
+        rows = _compute(
+            PropertyView.objects.filter(viewed_at__gte=low, viewed_at__lt=high),
+            PropertyInquiry.objects.filter(created_at__gte=low, created_at__lt=high),
+            computed_at,
+        )
+        with transaction.atomic():
+            PropertyDailyStats.objects.filter(date__gte=chunk_start, date__lte=chunk_end).delete()
+            PropertyDailyStats.objects.bulk_create(rows, batch_size=1000)
+        count += len(rows)
+        chunk_start = chunk_end + timedelta(days=1)
+    return count
+
+
+def rebuild_property_days(pairs):
+    """Recompute the rows of specific (property_id, date) pairs"""
+    computed_at = timezone.now()
+    by_day = {}
+    for property_id, day in pairs:
+        by_day.setdefault(day, set()).add(property_id)
+
+    count = 0
+    for day, property_ids in by_day.items():
+        low, high = _day_bounds(day, day)
+        rows = _compute(
+            PropertyView.objects.filter(property_id__in=property_ids, viewed_at__gte=low, viewed_at__lt=high),
+            PropertyInquiry.objects.filter(property_id__in=property_ids, created_at__gte=low, created_at__lt=high),
+            computed_at,
+        )
+        with transaction.atomic():
+            PropertyDailyStats.objects.filter(date=day, property_id__in=property_ids).delete()
+            PropertyDailyStats.objects.bulk_create(rows, batch_size=1000)
+        count += len(rows)
+    return count
+
+
+def inquiry_days(inquiries):
+    """Distinct (property_id, creation date) pairs of an inquiry queryset"""
+    return list(
+        inquiries.order_by().annotate(day=TruncDate('created_at'))
+        .values_list('property_id', 'day')
+        .distinct()
+    )
+
+
+def refresh():
+    """Bring the rollup up to date; returns the number of rows written"""
+    today = timezone.localdate()
+    last_run = PropertyDailyStats.objects.aggregate(last=Max('computed_at'))['last']
+
+    if last_run is None:
+        first_view = PropertyView.objects.aggregate(first=Min('viewed_at'))['first']
+        first_inquiry = PropertyInquiry.objects.aggregate(first=Min('created_at'))['first']
+        firsts = [timezone.localtime(value).date() for value in (first_view, first_inquiry) if value]
+        count = rebuild_days(min(firsts), today) if firsts else 0
+        logger.info(f"Daily stats backfilled: {count} rows")
+        return count
+
+    window_start = timezone.localtime(last_run - VIEW_LATENESS).date()
+    count = rebuild_days(window_start, today)
+
+    # Status changes of older inquiries
+    low, _high = _day_bounds(window_start, window_start)
+    changed = inquiry_days(PropertyInquiry.objects.filter(updated_at__gte=last_run, created_at__lt=low))
+    count += rebuild_property_days(changed)
+    logger.info(f"Daily stats refreshed: {count} rows")
+    return count
+
+
+# ======================================================
+# Reading
+# ======================================================
+
+def today_counts(properties):
+    """Today's views and inquiries of a Property queryset, from the raw rows"""
+    low, _high = _day_bounds(timezone.localdate(), timezone.localdate())
+    return {
+        'views': PropertyView.objects.filter(property__in=properties, viewed_at__gte=low).count(),
+        'inquiries': PropertyInquiry.objects.filter(property__in=properties, created_at__gte=low).count(),
+    }
+
+
+def stats_for(properties):
+    """PropertyDailyStats rows of a Property queryset"""
+    return PropertyDailyStats.objects.filter(property__in=properties)
+
+
+def totals(stats, start=None, end=None, fields=('views', 'inquiries')):
+    """Summed rollup columns, optionally limited to dates start..end"""
+    if start:
+        stats = stats.filter(date__gte=start)
+    if end:
+        stats = stats.filter(date__lte=end)
+    return stats.aggregate(**{field: Coalesce(Sum(field), Value(0)) for field in fields})
+
+
+def daily_series(stats, start, end, fields=('views', 'inquiries')):
+    """Per-day sums for start..end, one dict per day including empty days"""
+    rows = (
+        stats.filter(date__gte=start, date__lte=end)
+        .values('date')
+        .annotate(**{field: Sum(field) for field in fields})
+        .order_by('date')
+    )
+    by_date = {row['date']: row for row in rows}
+    series = []
+    day = start
+    while day <= end:
+        row = by_date.get(day, {})
+        series.append(dict({field: row.get(field) or 0 for field in fields}, date=day))
+        day += timedelta(days=1)
+    return series
+
+
+def lead_sources(stats, start=None, end=None):
+    """Inquiry counts and shares per source, largest first, for charts"""
+    return source_breakdown(totals(stats, start, end, fields=tuple(SOURCE_COLUMNS.values())))
+
+
+def source_breakdown(counts):
+    """``lead_sources`` from ``totals`` over SOURCE_COLUMNS"""
+    total = sum(counts[column] for column in SOURCE_COLUMNS.values())
+    sources = [
+        {
+            'source': source,
+            'name': label,
+            'count': counts[SOURCE_COLUMNS[source]],
+            'value': round(counts[SOURCE_COLUMNS[source]] / total * 100) if total else 0,
+            'color': SOURCE_COLORS.get(source, '#3B82F6'),
+        }
+        for source, label in SOURCE_CHOICES
+    ]
+    return sorted((s for s in sources if s['count']), key=lambda s: -s['count'])
+
+
+def status_distribution(stats, start=None, end=None):
+    """Inquiry counts per status (non-zero only)"""
+    counts = totals(stats, start, end, fields=tuple(STATUS_COLUMNS.values()))
+    return [
+        {'status': label, 'count': counts[STATUS_COLUMNS[status]]}
+        for status, label in PropertyInquiry.STATUS_CHOICES
+        if counts[STATUS_COLUMNS[status]]
+    ]
+
+
+# ======================================================
+# Seller analytics report
+# ======================================================
+
+# Hour ranges (start inclusive, end exclusive) of the "best time" buckets
+TIME_BUCKETS = (
+    ('Morning (6AM - 12PM)', 6, 12),
+    ('Afternoon (12PM - 5PM)', 12, 17),
+    ('Evening (5PM - 9PM)', 17, 21),
+    ('Night (9PM - 6AM)', 21, 30),
+)
+
+
+def monthly_series(stats, start, end):
+    """Views and leads per calendar month touching start..end"""
+    months = {
+        row['month']: row
+        for row in stats.filter(date__gte=start, date__lte=end)
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(views=Sum('views'), leads=Sum('inquiries'))
+        .order_by()
+    }
+    series = []
+    month_start = start.replace(day=1)
+    while month_start <= end:
+        row = months.get(month_start, {})
+        series.append({
+            'month': month_start.strftime('%b %Y'),
+            'views': row.get('views') or 0,
+            'leads': row.get('leads') or 0,
+        })
+        month_start = (month_start + timedelta(days=32)).replace(day=1)
+    return series
+
+
+def device_breakdown(counts):
+    """Human views per device, from ``totals`` over DEVICE_COLUMNS"""
+    devices = [
+        (label, counts[DEVICE_COLUMNS[device]])
+        for device, label in PropertyView.DEVICE_CHOICES
+        if device != 'bot'
+    ]
+    total = sum(count for _label, count in devices)
+    breakdown = [
+        {'device': label, 'count': count, 'percentage': round(count / total * 100) if total else 0}
+        for label, count in devices
+    ]
+    return sorted(breakdown, key=lambda d: -d['count'])
+
+
+def lead_hours(properties, start, end):
+    """Inquiries per local hour of day (24 counts) received in start..end"""
+    low, high = _day_bounds(start, end)
+    rows = (
+        PropertyInquiry.objects.filter(property__in=properties, created_at__gte=low, created_at__lt=high)
+        .annotate(hour=ExtractHour('created_at'))
+        .values('hour')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    hours = [0] * 24
+    for row in rows:
+        hours[row['hour']] = row['count']
+    return hours
+
+
+def best_times(hours):
+    """Group an hour histogram into the TIME_BUCKETS"""
+    total = sum(hours)
+    buckets = []
+    for label, first, last in TIME_BUCKETS:
+        leads = sum(hours[hour % 24] for hour in range(first, last))
+        buckets.append({'time': label, 'leads': leads, 'percentage': round(leads / total * 100) if total else 0})
+    return buckets
+
+
+def seller_report(properties, start, end, top=5):
+    """
+    Analytics of a Property queryset over the dates start..end.
+
+    Four grouped queries: rollup totals (views, leads, device and source
+    splits), rollup sums per month, raw inquiries per hour of day, and the top
+    properties by views in the range.
+    """
+    stats = stats_for(properties)
+    counts = totals(
+        stats, start, end,
+        fields=('views', 'inquiries') + tuple(DEVICE_COLUMNS.values()) + tuple(SOURCE_COLUMNS.values()),
+    )
+    hours = lead_hours(properties, start, end)
+
+    in_range = Q(daily_stats__date__gte=start, daily_stats__date__lte=end)
+    top_properties = list(
+        properties.annotate(
+            views_count=Coalesce(Sum('daily_stats__views', filter=in_range), 0),
+            lead_count=Coalesce(Sum('daily_stats__inquiries', filter=in_range), 0),
+        ).order_by('-views_count', '-id')[:top]
+    )
+    return {
+        'total_views': counts['views'],
+        'total_leads': counts['inquiries'],
+        'monthly_data': monthly_series(stats, start, end),
+        'device_breakdown': device_breakdown(counts),
+        'lead_sources': source_breakdown(counts),
+        'lead_hours': hours,
+        'best_times': best_times(hours),
+        'top_properties': top_properties,
+    }
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class EstateAppConfig(AppConfig):
@@ -8,4 +9,5 @@ class EstateAppConfig(AppConfig):
     def ready(self):
         """Import signals when app is ready"""
         import estate_app.signals
-
+        from .search import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self)
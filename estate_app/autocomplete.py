@@ -0,0 +1,211 @@
+"""
+In-memory location autocomplete.
+
+Suggestions (cities, localities and pincodes of active listings, with listing
+counts) live in a per-process sorted array of search keys, so a keystroke is a
+``bisect`` plus a short scan and never touches the database.
+
+The index is built lazily from one grouped query and then maintained
+incrementally from the Property save/delete signals (see signals.py). Other
+processes learn about changes through a version number in the shared cache
+and rebuild, at most once every ``REBUILD_INTERVAL`` seconds.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'location_index:version'
+
+# Minimum seconds between rebuilds triggered by changes in other processes
+REBUILD_INTERVAL = 30
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+
+def normalize(value):
+    """Lowercase, whitespace-collapsed form used for keys and identity"""
+    return ' '.join((value or '').split()).casefold()
+
+
+def location_of(values):
+    """(city, locality, state, pincode) tuple from a Property or dict"""
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name)
+    return (get('city') or '', get('locality') or '', get('state') or '', get('pincode') or '')
+
+
+class LocationIndex:
+    """Sorted-array prefix index over active listing locations"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._keys = []          # sorted [(search_key, suggestion_id), ...]
+        self._suggestions = {}   # suggestion_id -> suggestion dict
+        self._built = False
+        self._version = None
+        self._built_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        """Rebuild the whole index from active listings"""
+        from .models import Property
+
+        version = cache.get(VERSION_CACHE_KEY)
+        rows = (
+            Property.objects.filter(status='active')
+            .order_by()
+            .values('city', 'locality', 'state', 'pincode')
+            .annotate(count=Count('id'))
+        )
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._apply(location_of(row), row['count'])
+            self._built = True
+            self._version = version
+            self._built_at = time.monotonic()
+        logger.info(f"Location index rebuilt with {len(self._suggestions)} suggestions")
+
+    def _ensure_fresh(self):
+        if not self._built:
+            self.rebuild()
+            return
+        version = cache.get(VERSION_CACHE_KEY)
+        if version != self._version and time.monotonic() - self._built_at >= REBUILD_INTERVAL:
+            self.rebuild()
+
+    def _suggestion_specs(self, location):
+        """Suggestions a location contributes to: (id, search names, fields)"""
+        city, locality, state, pincode = location
+        specs = []
+        if city:
+            specs.append((
+                ('city', normalize(city), normalize(state)),
+                [city],
+                {'type': 'city', 'label': f'{city}, {state}' if state else city,
+                 'city': city, 'locality': '', 'state': state, 'pincode': ''},
+            ))
+        if locality:
+            specs.append((
+                ('locality', normalize(locality), normalize(city), normalize(state)),
+                [locality],
+                {'type': 'locality', 'label': f'{locality}, {city}' if city else locality,
+                 'city': city, 'locality': locality, 'state': state, 'pincode': ''},
+            ))
+        if pincode:
+            specs.append((
+                ('pincode', normalize(pincode)),
+                [pincode],
+                {'type': 'pincode', 'label': f'{pincode} ({city})' if city else pincode,
+                 'city': city, 'locality': '', 'state': state, 'pincode': pincode},
+            ))
+        return specs
+
+    @staticmethod
+    def _search_keys(name):
+        """Every word start of a name, so "navi mumbai" is found by "mum" too"""
+        words = normalize(name).split(' ')
+        return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+    def _apply(self, location, delta):
+        """Add ``delta`` listings at ``location`` (negative to remove)"""
+        for suggestion_id, names, fields in self._suggestion_specs(location):
+            suggestion = self._suggestions.get(suggestion_id)
+            if suggestion is None:
+                if delta <= 0:
+                    continue
+                suggestion = dict(fields, count=0)
+                self._suggestions[suggestion_id] = suggestion
+                for name in names:
+                    for key in self._search_keys(name):
+                        insort(self._keys, (key, suggestion_id))
+
+            suggestion['count'] += delta
+            if suggestion['count'] <= 0:
+                del self._suggestions[suggestion_id]
+                for name in names:
+                    for key in self._search_keys(name):
+                        i = bisect_left(self._keys, (key, suggestion_id))
+                        if i < len(self._keys) and self._keys[i] == (key, suggestion_id):
+                            del self._keys[i]
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def update(self, old_location=None, new_location=None):
+        """
+        Move one listing between locations.
+
+        ``old_location`` is where it was counted before (None if it wasn't an
+        active listing), ``new_location`` where it counts now (None if it is no
+        longer active).
+        """
+        if old_location == new_location:
+            return
+        with self._lock:
+            if self._built:
+                if old_location is not None:
+                    self._apply(old_location, -1)
+                if new_location is not None:
+                    self._apply(new_location, 1)
+            version = self._bump_version()
+            # Only our own bump may be skipped: if another process bumped in
+            # between, its change is missing here and _ensure_fresh rebuilds
+            if self._built and version == (self._version or 0) + 1:
+                self._version = version
+
+    def mark_stale(self):
+        """Force a rebuild everywhere (e.g. after a bulk queryset.update())"""
+        with self._lock:
+            self._bump_version()
+            self._built = False
+
+    @staticmethod
+    def _bump_version():
+        cache.add(VERSION_CACHE_KEY, 0, None)
+        try:
+            return cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, None)
+            return 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """Top ``limit`` suggestions whose name starts with ``query``"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self._ensure_fresh()
+        with self._lock:
+            matches = {}
+            i = bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+                suggestion_id = self._keys[i][1]
+                matches[suggestion_id] = self._suggestions[suggestion_id]
+                i += 1
+            best = heapq.nlargest(
+                limit, matches.values(),
+                key=lambda s: (s['count'], s['type'] == 'city', s['label']),
+            )
+            return [dict(s) for s in best]
+
+
+location_index = LocationIndex()
@@ -0,0 +1,132 @@
+"""
+Admin bulk email campaigns.
+
+The admin's "Send Bulk Email" form only creates a BulkEmail; ``manage.py
+send_bulk_emails`` delivers it off-request:
+
+* recipients are streamed in id order with ``.values_list().iterator()``
+* every ``BULK_EMAIL_BATCH_SIZE`` of them go out through one reused
+  connection (mailer.Sender), paced to ``BULK_EMAIL_RATE`` messages/second,
+  with failed messages of a batch retried with backoff
+* each batch is logged as EmailDelivery rows and the campaign's counters and
+  resume point (``last_user_id``) are saved, so an interrupted campaign
+  continues where it stopped (``send_bulk_emails --resume``)
+
+``BULK_EMAIL_BACKEND`` (default EMAIL_BACKEND) or the command's
+``--backend console|file`` selects where the mail goes.
+"""
+
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import F
+from django.utils import timezone
+
+from . import mailer
+from .models import BulkEmail, CustomUser, EmailDelivery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+
+
+def enqueue(subject, html_message, audience='all', user=None):
+    """Create a pending campaign"""
+    return BulkEmail.objects.create(
+        subject=subject,
+        html_message=html_message,
+        audience=audience,
+        created_by=user if user and user.is_authenticated else None,
+    )
+
+
+def recipients(campaign):
+    """Active users of the campaign's audience, by id"""
+    users = CustomUser.objects.filter(is_active=True)
+    if campaign.audience != 'all':
+        users = users.filter(user_type=campaign.audience)
+    return users.order_by('pk')
+
+
+def _message(campaign, email):
+    message = EmailMultiAlternatives(campaign.subject, '', settings.DEFAULT_FROM_EMAIL, [email])
+    message.attach_alternative(campaign.html_message, 'text/html')
+    return message
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def send(campaign, backend=None, batch_size=None, rate=None, **backend_options):
+    """Deliver a claimed campaign from its resume point; returns the number sent"""
+    batch_size = batch_size or getattr(settings, 'BULK_EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    rate = rate if rate is not None else getattr(settings, 'BULK_EMAIL_RATE', mailer.DEFAULT_RATE)
+    backend = backend or mailer.default_backend('BULK_EMAIL_BACKEND')
+
+    users = recipients(campaign)
+    if campaign.recipients_total is None:
+        campaign.recipients_total = users.count()
+        BulkEmail.objects.filter(pk=campaign.pk).update(recipients_total=campaign.recipients_total)
+
+    rows = (
+        users.filter(pk__gt=campaign.last_user_id)
+        .values_list('pk', 'email')
+        .iterator(chunk_size=batch_size * 10)
+    )
+    sent = 0
+    with mailer.Sender(backend, rate=rate, **backend_options) as sender:
+        for batch in _batches(rows, batch_size):
+            results = sender.send_batch([_message(campaign, email) for _pk, email in batch])
+            deliveries = [
+                EmailDelivery(
+                    bulk_email=campaign, user_id=user_id, email=email,
+                    status='failed' if result.error else 'sent', attempts=result.attempts,
+                    error=result.error or '',
+                )
+                for (user_id, email), result in zip(batch, results)
+            ]
+            EmailDelivery.objects.bulk_create(deliveries)
+            batch_sent = sum(1 for result in results if not result.error)
+            sent += batch_sent
+            campaign.last_user_id = batch[-1][0]
+            BulkEmail.objects.filter(pk=campaign.pk).update(
+                sent_count=F('sent_count') + batch_sent,
+                failed_count=F('failed_count') + len(batch) - batch_sent,
+                last_user_id=campaign.last_user_id,
+            )
+    return sent
+
+
+def _claim(campaign_id, statuses):
+    return bool(
+        BulkEmail.objects.filter(pk=campaign_id, status__in=statuses)
+        .update(status='sending', started_at=timezone.now())
+    )
+
+
+def run_pending(resume=False, **options):
+    """Send pending campaigns (and interrupted ones with ``resume``); returns emails sent"""
+    statuses = ('pending', 'sending') if resume else ('pending',)
+    total = 0
+    for campaign in BulkEmail.objects.filter(status__in=statuses).order_by('created_at'):
+        if not _claim(campaign.pk, statuses):
+            continue
+        try:
+            total += send(campaign, **options)
+        except Exception as e:
+            logger.error(f"Bulk email {campaign.pk} failed: {e}")
+            BulkEmail.objects.filter(pk=campaign.pk).update(
+                status='failed', error=str(e), finished_at=timezone.now()
+            )
+            continue
+        BulkEmail.objects.filter(pk=campaign.pk).update(status='done', finished_at=timezone.now())
+        logger.info(f"Bulk email {campaign.pk} finished")
+    return total
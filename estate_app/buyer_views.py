@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q, Count, Avg, Min, Max
 from django.views.decorators.http import require_POST, require_GET
@@ -9,6 +9,12 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Property, PropertyFavorite, PropertyComparison, SiteVisit, BuyerProfile, PropertyInquiry,PropertyCategory, PropertyType
 from .forms import PropertyInquiryForm
+from .filters import BUYER_SPEC
+from .pagination import KeysetPaginator, wants_cursor
+from .result_cache import hydrate
+from .recommendations import recommend_ids
+from .view_tracking import record_view
+from . import exports
 import json
 
 @login_required
@@ -39,7 +45,7 @@ def buyer_dashboard(request):
     ).select_related('property').order_by('-created_at')[:5]
     
     # Get recommended properties based on buyer preferences
-    recommended_properties = get_recommended_properties(buyer_profile)
+    recommended_properties = get_recommended_properties(buyer_profile, limit=4)
     
     # Get comparison lists
     comparison_lists = PropertyComparison.objects.filter(user=user)
@@ -67,7 +73,7 @@ def buyer_dashboard(request):
         'saved_count': saved_count,
         'upcoming_visits': upcoming_visits,
         'recent_inquiries': recent_inquiries,
-        'recommended_properties': recommended_properties[:4],
+        'recommended_properties': recommended_properties,
         'comparison_lists': comparison_lists,
         'stats': {
             'total_searches': total_searches,
@@ -81,47 +87,12 @@ def buyer_dashboard(request):
     return render(request, 'dashboard/buyer/dashboard.html', context)
 
 
-def get_recommended_properties(buyer_profile):
-    """Get AI-recommended properties based on buyer preferences"""
-    # Base query
-    properties = Property.objects.filter(status='active')
-    
-    # Apply buyer preferences
-    if buyer_profile.min_budget:
-        properties = properties.filter(price__gte=buyer_profile.min_budget)
-    
-    if buyer_profile.max_budget:
-        properties = properties.filter(price__lte=buyer_profile.max_budget)
-    
-    if buyer_profile.min_bedrooms:
-        properties = properties.filter(bedrooms__gte=buyer_profile.min_bedrooms)
-    
-    if buyer_profile.min_bathrooms:
-        properties = properties.filter(bathrooms__gte=buyer_profile.min_bathrooms)
-    
-    if buyer_profile.min_area:
-        properties = properties.filter(carpet_area__gte=buyer_profile.min_area)
-    
-    if buyer_profile.max_area:
-        properties = properties.filter(carpet_area__lte=buyer_profile.max_area)
-    
-    if buyer_profile.property_for:
-        properties = properties.filter(property_for=buyer_profile.property_for)
-    
-    if buyer_profile.furnishing_preference:
-        properties = properties.filter(furnishing=buyer_profile.furnishing_preference)
-    
-    if buyer_profile.preferred_locations:
-        location_q = Q()
-        for location in buyer_profile.preferred_locations:
-            location_q |= Q(city__icontains=location) | Q(state__icontains=location)
-        if location_q:
-            properties = properties.filter(location_q)
-    
-    # Order by relevance (you can add more sophisticated ranking)
-    return properties.annotate(
-        relevance_score=Count('id')  # Placeholder for actual relevance scoring
-    ).order_by('-relevance_score', '-created_at')
+def get_recommended_properties(buyer_profile, limit=4):
+    """Get recommended properties scored against buyer preferences and history"""
+    ids = recommend_ids(buyer_profile, limit=limit)
+    # Cached ids may have been sold or deactivated since; drop them
+    properties = Property.objects.filter(status='active').select_related('property_type', 'category')
+    return hydrate(ids, properties)
 
 
 def get_average_price(locations):
@@ -170,63 +141,26 @@ def buyer_properties(request):
     property_for = request.GET.get('property_for', '')
     furnishing = request.GET.get('furnishing', '')
     
-    # Base queryset
-    properties = Property.objects.filter(status='active')
-    
-    # Apply filters
-    if category:
-        properties = properties.filter(category__slug=category)
-    
-    if property_type:
-        properties = properties.filter(property_type__slug=property_type)
-    
-    if min_price:
-        properties = properties.filter(price__gte=min_price)
-    
-    if max_price:
-        properties = properties.filter(price__lte=max_price)
-    
-    if bedrooms:
-        properties = properties.filter(bedrooms__gte=bedrooms)
-    
-    if bathrooms:
-        properties = properties.filter(bathrooms__gte=bathrooms)
-    
-    if min_area:
-        properties = properties.filter(carpet_area__gte=min_area)
-    
-    if max_area:
-        properties = properties.filter(carpet_area__lte=max_area)
-    
-    if city:
-        properties = properties.filter(city__icontains=city)
-    
-    if property_for:
-        properties = properties.filter(property_for=property_for)
-    
-    if furnishing:
-        properties = properties.filter(furnishing=furnishing)
-    
-    if search_query:
-        properties = properties.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query) |
-            Q(landmark__icontains=search_query)
-        )
-    
-    # Apply sorting
-    if sort_by in ['price', '-price', 'created_at', '-created_at', 'carpet_area', '-carpet_area', 'view_count', '-view_count']:
-        properties = properties.order_by(sort_by)
+    # Base queryset with filters and sorting applied by the shared engine
+    filters = BUYER_SPEC.parse(request.GET)
+    properties = filters.queryset()
     
     # Get user's favorites for comparison
     user_favorites = PropertyFavorite.objects.filter(user=user).values_list('property_id', flat=True)
     
-    # Pagination
-    paginator = Paginator(properties, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset pagination when a cursor is passed)
+    if wants_cursor(request):
+        paginator = KeysetPaginator(
+            properties, 12,
+            count_cache_key=f"{filters.without('sort').cache_key}:count",
+        )
+        page_obj = paginator.get_page(request.GET.get('cursor'), request.GET)
+    else:
+        # Page through ids on the narrow index, then fetch only that page
+        paginator = Paginator(filters.id_queryset(), 12)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
+        page_obj.object_list = hydrate(list(page_obj.object_list), properties)
     
     # Get filter options
     categories = PropertyCategory.objects.filter(is_active=True)
@@ -262,8 +196,8 @@ def buyer_property_detail(request, slug):
     user = request.user
     property_obj = get_object_or_404(Property, slug=slug, status='active')
     
-    # Track view
-    property_obj.increment_view_count()
+    # Track view (buffered, written by the periodic flush)
+    record_view(request, property_obj.pk)
     
     # Check if property is favorited
     is_favorited = PropertyFavorite.objects.filter(user=user, property=property_obj).exists()
@@ -632,11 +566,7 @@ def buyer_inquiry_detail(request, pk):
     seller_profile = getattr(seller, 'profile', None)
     
     # Get similar properties
-    similar_properties = Property.objects.filter(
-        Q(city=inquiry.property.city) | 
-        Q(property_type=inquiry.property.property_type),
-        status='active'
-    ).exclude(id=inquiry.property.id)[:3]
+    similar_properties = inquiry.property.get_similar_properties(limit=3)
     
     context = {
         'inquiry': inquiry,
@@ -727,29 +657,10 @@ def ajax_delete_inquiry(request, inquiry_id):
 @login_required
 @require_GET
 def ajax_export_inquiries(request):
-    """Export inquiries as CSV"""
-    user = request.user
-    inquiries = PropertyInquiry.objects.filter(user=user).select_related('property')
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="my_inquiries.csv"'
-    
-    import csv
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Property', 'Location', 'Message', 'Status', 'Seller Response', 'Response Date'])
-    
-    for inquiry in inquiries:
-        writer.writerow([
-            inquiry.created_at.strftime('%Y-%m-%d %H:%M'),
-            inquiry.property.title,
-            f"{inquiry.property.city}, {inquiry.property.state}",
-            inquiry.message[:100] + '...' if len(inquiry.message) > 100 else inquiry.message,
-            inquiry.get_status_display(),
-            inquiry.response[:100] + '...' if inquiry.response and len(inquiry.response) > 100 else inquiry.response or 'No response yet',
-            inquiry.responded_at.strftime('%Y-%m-%d %H:%M') if inquiry.responded_at else ''
-        ])
-    
-    return response
+    """Export inquiries as CSV, or JSON Lines with ?format=jsonl (streamed)"""
+    inquiries = PropertyInquiry.objects.filter(user=request.user)
+    fmt, compress = exports.options_from_request(request.GET)
+    return exports.export_response(exports.BUYER_INQUIRIES, inquiries, 'my_inquiries', fmt, compress)
 
 @login_required
 @require_GET
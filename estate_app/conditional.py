@@ -0,0 +1,102 @@
+"""
+Conditional GET (ETag / Last-Modified) for the public property JSON APIs.
+
+The validators are computed before the view runs, from data far cheaper than
+the response itself, so Django's ``condition`` decorator can answer
+``If-None-Match`` / ``If-Modified-Since`` with a 304 straight away:
+
+* property details: ``Property.updated_at`` (one primary-key lookup)
+* featured listings: the result-cache generation of the request's filter
+  scope (see result_cache.py), no query at all. Counter sorts
+  (``-view_count`` etc.) get no ETag: counter updates never bump a
+  generation, so the order could change under an unchanged validator
+* property types: a generation counter bumped when a type changes
+
+Each ETag also covers the request's query string, since ``view``, ``fields``,
+``page`` etc. change the body. Generations live in the cache, so they are
+combined with a cache epoch: if the cache is flushed, generations restart
+from zero under a new epoch and old ETags stop matching.
+"""
+
+import hashlib
+import uuid
+
+from django.core.cache import cache
+
+from . import result_cache
+from .filters import LISTING_SPEC
+from .models import Property
+
+EPOCH_CACHE_KEY = 'conditional:epoch'
+PROPERTY_TYPES_GENERATION_KEY = 'conditional:property_types:gen'
+
+
+def _epoch():
+    epoch = cache.get(EPOCH_CACHE_KEY)
+    if epoch is None:
+        cache.add(EPOCH_CACHE_KEY, uuid.uuid4().hex[:8], None)
+        epoch = cache.get(EPOCH_CACHE_KEY)
+    return epoch
+
+
+def _etag(*parts):
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _query_string(request):
+    return repr(sorted(request.GET.lists()))
+
+
+# ======================================================
+# Property details
+# ======================================================
+
+def _property_updated_at(request, property_id):
+    # Shared by the ETag and Last-Modified functions: one lookup per request
+    if not hasattr(request, '_property_updated_at'):
+        request._property_updated_at = (
+            Property.objects.filter(id=property_id, status='active')
+            .values_list('updated_at', flat=True)
+            .first()
+        )
+    return request._property_updated_at
+
+
+def property_last_modified(request, property_id):
+    return _property_updated_at(request, property_id)
+
+
+def property_etag(request, property_id):
+    updated_at = _property_updated_at(request, property_id)
+    if updated_at is None:
+        return None
+    return _etag(property_id, updated_at.timestamp(), _query_string(request))
+
+
+# ======================================================
+# Featured listings
+# ======================================================
+
+def featured_properties_etag(request):
+    filters = LISTING_SPEC.parse(request.GET, featured_only=True)
+    if {field.lstrip('-') for field in (filters.sort or '').split(',')} & result_cache.COUNTER_FIELDS:
+        return None
+    return _etag(_epoch(), result_cache.generation(filters), _query_string(request))
+
+
+# ======================================================
+# Property types
+# ======================================================
+
+def bump_property_types():
+    """Invalidate ETags of the property types endpoint"""
+    cache.add(PROPERTY_TYPES_GENERATION_KEY, 0, None)
+    try:
+        cache.incr(PROPERTY_TYPES_GENERATION_KEY)
+    except ValueError:
+        cache.set(PROPERTY_TYPES_GENERATION_KEY, 1, None)
+
+
+def property_types_etag(request):
+    generation = cache.get(PROPERTY_TYPES_GENERATION_KEY) or 0
+    return _etag(_epoch(), generation)
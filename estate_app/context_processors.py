@@ -7,30 +7,17 @@ def user_context(request):
         context['user_type'] = request.user.user_type
         context['is_verified'] = request.user.is_verified
         
-        # Add seller-specific counts for seller users (seller, agent, builder)
+        # Add seller-specific counts for seller users (seller, agent, builder),
+        # read from the owner's SellerStats snapshot (one row, see seller_stats.py)
         if hasattr(request.user, 'user_type') and request.user.user_type in ['seller', 'agent', 'builder']:
-            from .models import Property, PropertyInquiry
+            from . import seller_stats
             
-            # Get total properties count for this user (all statuses)
             try:
-                properties_count = Property.objects.filter(owner=request.user).count()
-                # Use actual count or 0 if empty/None
-                properties_count_value = properties_count if properties_count else 0
+                stats = seller_stats.get(request.user)
+                context['user_properties_count'] = stats.properties_total
+                context['new_leads_count'] = stats.new_leads
             except Exception:
-                properties_count_value = 0
-            
-            # Get new leads count (inquiries with status='new') for user's properties  
-            try:
-                new_leads_qs = PropertyInquiry.objects.filter(
-                    property__owner=request.user,
-                    status='new'
-                )
-                new_leads_value = new_leads_qs.count() if new_leads_qs else 0
-            except Exception:
-                new_leads_value = 0
-            
-            # Add to context
-            context['user_properties_count'] = properties_count_value
-            context['new_leads_count'] = new_leads_value
+                context['user_properties_count'] = 0
+                context['new_leads_count'] = 0
     
     return context
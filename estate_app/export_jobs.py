@@ -0,0 +1,161 @@
+"""
+Background export jobs.
+
+Admin export actions ``enqueue`` an ExportJob holding the primary keys of the
+selected rows and return straight away; the worker selects them again from
+the export's model in ``EXPORT_MODELS``. ``manage.py
+run_export_jobs`` claims pending jobs and streams each one through the
+export engine (exports.py) into ``MEDIA_ROOT/exports/``, saving the rows
+processed and bytes written every ``PROGRESS_INTERVAL`` seconds.
+
+Finished artifacts are kept for ``EXPORT_JOB_TTL`` seconds (default one
+week); every worker pass deletes expired files, and fails jobs left running
+by a crashed worker after ``STALE_AFTER``.
+"""
+
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import exports
+from .models import CustomUser, ExportJob, Property, PropertyInquiry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = 'exports'
+PROGRESS_INTERVAL = 1.0             # seconds between progress saves
+STALE_AFTER = timedelta(hours=6)    # running jobs older than this died with their worker
+
+# Which model each registered export reads
+EXPORT_MODELS = {
+    'seller_leads': PropertyInquiry,
+    'seller_leads_summary': PropertyInquiry,
+    'buyer_inquiries': PropertyInquiry,
+    'admin_leads': PropertyInquiry,
+    'admin_properties': Property,
+    'admin_users': CustomUser,
+}
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'EXPORT_JOB_TTL', 60 * 60 * 24 * 7))
+
+
+def enqueue(export_name, queryset, user=None, fmt='csv', compress=False):
+    """Create a pending ExportJob for ``queryset``"""
+    if export_name not in exports.EXPORTS:
+        raise ValueError(f"Unknown export: {export_name}")
+    return ExportJob.objects.create(
+        export=export_name,
+        format=fmt,
+        compress=compress,
+        object_ids=list(queryset.order_by('pk').values_list('pk', flat=True)),
+        requested_by=user if user and user.is_authenticated else None,
+    )
+
+
+def _queryset(job):
+    return EXPORT_MODELS[job.export].objects.filter(pk__in=job.object_ids).order_by('pk')
+
+
+def _claim(job_id):
+    """Atomically move a pending job to running; False if someone else did"""
+    return bool(
+        ExportJob.objects.filter(pk=job_id, status='pending')
+        .update(status='running', started_at=timezone.now())
+    )
+
+
+def run(job):
+    """Write one claimed job's artifact; returns True if it succeeded"""
+    export = exports.EXPORTS[job.export]
+    name = exports.filename(
+        f"{job.export}_{job.pk}_{uuid.uuid4().hex}", job.format, job.compress
+    )
+    relative_path = f"{EXPORT_DIR}/{name}"
+    path = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    progress = {'rows': 0, 'bytes': 0, 'saved_at': time.monotonic()}
+
+    def save_progress():
+        ExportJob.objects.filter(pk=job.pk).update(
+            rows_processed=progress['rows'], bytes_written=progress['bytes']
+        )
+        progress['saved_at'] = time.monotonic()
+
+    def counted(rows):
+        for row in rows:
+            progress['rows'] += 1
+            yield row
+
+    try:
+        queryset = _queryset(job)
+        ExportJob.objects.filter(pk=job.pk).update(rows_total=queryset.count())
+        rows = counted(export.rows(queryset))
+        with open(path, 'wb') as output:
+            for chunk in exports.encode(export.headers, rows, job.format, job.compress):
+                output.write(chunk)
+                progress['bytes'] += len(chunk)
+                if time.monotonic() - progress['saved_at'] >= PROGRESS_INTERVAL:
+                    save_progress()
+    except Exception as e:
+        logger.error(f"Export job {job.pk} failed: {e}")
+        if os.path.exists(path):
+            os.remove(path)
+        now = timezone.now()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='failed', error=str(e), finished_at=now, expires_at=now + _ttl(),
+            rows_processed=progress['rows'], bytes_written=progress['bytes'],
+        )
+        return False
+
+    now = timezone.now()
+    ExportJob.objects.filter(pk=job.pk).update(
+        status='done', file=relative_path, finished_at=now, expires_at=now + _ttl(),
+        rows_processed=progress['rows'], bytes_written=progress['bytes'],
+    )
+    logger.info(f"Export job {job.pk}: {progress['rows']} rows, {progress['bytes']} bytes")
+    return True
+
+
+def run_pending(limit=None):
+    """Run pending jobs oldest first; returns the number processed"""
+    processed = 0
+    for job in ExportJob.objects.filter(status='pending').order_by('created_at'):
+        if limit is not None and processed >= limit:
+            break
+        if _claim(job.pk):
+            run(job)
+            processed += 1
+    return processed
+
+
+def expire():
+    """Delete expired artifacts and fail stale running jobs; returns the number expired"""
+    now = timezone.now()
+    ExportJob.objects.filter(status='running', started_at__lt=now - STALE_AFTER).update(
+        status='failed', error='Worker stopped before the export finished',
+        finished_at=now, expires_at=now + _ttl(),
+    )
+
+    expired = 0
+    for job in ExportJob.objects.filter(status__in=('done', 'failed'), expires_at__lte=now):
+        if job.file:
+            job.file.delete(save=False)
+        ExportJob.objects.filter(pk=job.pk).update(status='expired', file='')
+        expired += 1
+    return expired
+
+
+def requeue(job_ids):
+    """Put failed jobs back in the queue"""
+    return ExportJob.objects.filter(pk__in=job_ids, status='failed').update(
+        status='pending', error='', rows_processed=0, bytes_written=0,
+        started_at=None, finished_at=None, expires_at=None,
+    )
@@ -0,0 +1,273 @@
+"""
+Streaming CSV / JSON Lines exports.
+
+An ``Export`` describes a download as a list of columns over ``.values()``
+lookups, plus any annotations (counts) the columns read. ``stream`` turns a
+queryset into the encoded file, chunk by chunk:
+
+* rows come from ``.values(...).iterator(chunk_size=CHUNK_SIZE)`` so no model
+  instances are built and the result set is never held in memory
+* cells are encoded into ~``BUFFER_SIZE`` byte chunks
+* ``compress=True`` gzips the chunks on the fly
+
+``export_response`` wraps that in a ``StreamingHttpResponse``: the first byte
+goes out as soon as the first rows are fetched, however large the export is.
+Views pick the format with ``?format=csv|jsonl`` and ``?compress=gzip``.
+The exports the site offers are registered by name in ``EXPORTS``.
+"""
+
+import csv
+import io
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import CustomUser, Property, PropertyInquiry
+
+CHUNK_SIZE = 2000           # rows fetched per database round trip
+BUFFER_SIZE = 64 * 1024     # bytes per streamed chunk
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+class Column:
+    """One export column: a header and the ``.values()`` lookups it reads"""
+
+    def __init__(self, header, *fields, format=None):
+        self.header = header
+        self.fields = fields
+        self.format = format
+
+    def value(self, row):
+        values = [row[field] for field in self.fields]
+        if self.format:
+            return self.format(*values)
+        return values[0]
+
+
+class Export:
+    """A named download: columns plus the annotations they need"""
+
+    def __init__(self, name, columns, annotations=None):
+        self.name = name
+        self.columns = columns
+        self.annotations = annotations or {}
+
+    @property
+    def headers(self):
+        return [column.header for column in self.columns]
+
+    def fields(self):
+        return list(dict.fromkeys(field for column in self.columns for field in column.fields))
+
+    def rows(self, queryset, chunk_size=CHUNK_SIZE):
+        """Cell lists, one per row, streamed from the database"""
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        for row in queryset.values(*self.fields()).iterator(chunk_size=chunk_size):
+            yield [column.value(row) for column in self.columns]
+
+
+# ======================================================
+# Encoding
+# ======================================================
+
+def _csv_chunks(headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _jsonl_chunks(headers, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines, size = [], 0
+    for row in rows:
+        line = encoder.encode(dict(zip(headers, row)))
+        lines.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines, size = [], 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode(headers, rows, fmt='csv', compress=False):
+    """Iterator of byte chunks encoding ``rows`` (cell lists)"""
+    chunks = (_jsonl_chunks if fmt == 'jsonl' else _csv_chunks)(headers, rows)
+    return _gzip(chunks) if compress else chunks
+
+
+def stream(export, queryset, fmt='csv', compress=False):
+    """The encoded export as an iterator of byte chunks"""
+    return encode(export.headers, export.rows(queryset), fmt, compress)
+
+
+def filename(base, fmt='csv', compress=False):
+    """``base`` with the format's extension (and .gz)"""
+    extension = FORMATS[fmt][1]
+    return f"{base}.{extension}{'.gz' if compress else ''}"
+
+
+def options_from_request(params):
+    """(format, compress) from ``?format=`` and ``?compress=``"""
+    fmt = params.get('format', 'csv')
+    if fmt not in FORMATS:
+        fmt = 'csv'
+    return fmt, params.get('compress') == 'gzip'
+
+
+def export_response(export, queryset, base_name, fmt='csv', compress=False):
+    """StreamingHttpResponse downloading ``queryset`` as ``export``"""
+    content_type = 'application/gzip' if compress else FORMATS[fmt][0]
+    response = StreamingHttpResponse(stream(export, queryset, fmt, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename(base_name, fmt, compress)}"'
+    return response
+
+
+def timestamped(base):
+    return f'{base}_{timezone.now().strftime("%Y%m%d_%H%M%S")}'
+
+
+# ======================================================
+# Cell formatters
+# ======================================================
+
+def _display(model, field):
+    labels = dict(model._meta.get_field(field).flatchoices)
+    return lambda value: labels.get(value, value)
+
+
+def _datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else ''
+
+
+def _truncated(length, ellipsis=''):
+    def truncate(value):
+        value = value or ''
+        return value[:length] + ellipsis if len(value) > length else value
+    return truncate
+
+
+def _single_line(value):
+    return value.replace('\n', ' ') if value else ''
+
+
+def _location(city, state):
+    return f"{city}, {state}"
+
+
+def _or_blank(value):
+    return value or ''
+
+
+# ======================================================
+# Registered exports
+# ======================================================
+
+SELLER_LEADS = Export('seller_leads', [
+    Column('Date', 'created_at', format=_datetime),
+    Column('Name', 'name'),
+    Column('Email', 'email'),
+    Column('Phone', 'phone'),
+    Column('Property', 'property__title'),
+    Column('Location', 'property__city', 'property__state', format=_location),
+    Column('Message', 'message', format=_single_line),
+    Column('Status', 'status', format=_display(PropertyInquiry, 'status')),
+    Column('Priority', 'priority'),
+    Column('Source', 'source', format=_display(PropertyInquiry, 'source')),
+    Column('Response', 'response', format=_single_line),
+    Column('Response Date', 'responded_at', format=_datetime),
+    Column('Budget', 'budget', format=_or_blank),
+    Column('Preferred Date', 'preferred_date', format=_date),
+])
+
+SELLER_LEADS_SUMMARY = Export('seller_leads_summary', [
+    Column('Date', 'created_at', format=_datetime),
+    Column('Name', 'name'),
+    Column('Email', 'email'),
+    Column('Phone', 'phone'),
+    Column('Property', 'property__title'),
+    Column('Message', 'message', format=lambda message: message[:100]),
+    Column('Status', 'status', format=_display(PropertyInquiry, 'status')),
+    Column('Source', 'source', format=_display(PropertyInquiry, 'source')),
+])
+
+BUYER_INQUIRIES = Export('buyer_inquiries', [
+    Column('Date', 'created_at', format=_datetime),
+    Column('Property', 'property__title'),
+    Column('Location', 'property__city', 'property__state', format=_location),
+    Column('Message', 'message', format=_truncated(100, '...')),
+    Column('Status', 'status', format=_display(PropertyInquiry, 'status')),
+    Column('Seller Response', 'response',
+           format=lambda response: _truncated(100, '...')(response) or 'No response yet'),
+    Column('Response Date', 'responded_at', format=_datetime),
+])
+
+ADMIN_LEADS = Export('admin_leads', [
+    Column('Date', 'created_at', format=_datetime),
+    Column('Name', 'name'),
+    Column('Email', 'email'),
+    Column('Phone', 'phone'),
+    Column('Property', 'property__title'),
+    Column('Status', 'status', format=_display(PropertyInquiry, 'status')),
+    Column('Source', 'source', format=_display(PropertyInquiry, 'source')),
+    Column('Response', 'response', format=lambda response: 'Yes' if response else 'No'),
+])
+
+ADMIN_PROPERTIES = Export('admin_properties', [
+    Column('ID', 'property_id'),
+    Column('Title', 'title', format=lambda title: title[:50]),
+    Column('Owner', 'owner__email'),
+    Column('Type', 'property_for', format=_display(Property, 'property_for')),
+    Column('Status', 'status', format=_display(Property, 'status')),
+    Column('City', 'city'),
+    Column('Price', 'price'),
+    Column('Area', 'carpet_area'),
+    Column('Bedrooms', 'bedrooms', format=_or_blank),
+    Column('Bathrooms', 'bathrooms', format=_or_blank),
+    Column('Views', 'view_count'),
+    Column('Leads', 'inquiry_count'),
+])
+
+ADMIN_USERS = Export('admin_users', [
+    Column('Email', 'email'),
+    Column('Full Name', 'first_name', 'last_name', format=lambda first, last: f"{first} {last}".strip()),
+    Column('User Type', 'user_type', format=_display(CustomUser, 'user_type')),
+    Column('Phone', 'phone'),
+    Column('City', 'profile__city', format=_or_blank),
+    Column('Join Date', 'date_joined', format=_date),
+    Column('Properties', 'properties_count'),
+    Column('Status', 'is_active', format=lambda active: 'Active' if active else 'Inactive'),
+], annotations={'properties_count': Count('properties', distinct=True)})
+
+EXPORTS = {
+    export.name: export
+    for export in (SELLER_LEADS, SELLER_LEADS_SUMMARY, BUYER_INQUIRIES, ADMIN_LEADS, ADMIN_PROPERTIES, ADMIN_USERS)
+}
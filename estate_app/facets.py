@@ -0,0 +1,138 @@
+"""
+Facet counts for the property search sidebar.
+
+All facets (city, property_for, bedrooms bucket, furnishing, property type,
+price bucket and amenities) come from a single GROUP BY over the filtered
+queryset: the bedroom and price buckets are computed in SQL with CASE
+expressions, amenity counts are conditional counts on ``amenity_mask`` bits,
+and the grouped rows are rolled up into per-facet counts in Python. Results are cached
+under the filter's canonical cache key.
+"""
+
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from .filters import PRICE_BUCKETS, has_amenities_q
+from .models import Property
+
+FACETS_CACHE_TIMEOUT = 300  # 5 minutes
+
+PRICE_BUCKET_LABELS = {
+    'under_50l': 'Under ₹50 Lakh',
+    '50l_1cr': '₹50 Lakh - ₹1 Cr',
+    '1cr_2cr': '₹1 Cr - ₹2 Cr',
+    'above_2cr': 'Above ₹2 Cr',
+}
+
+# Bedroom buckets use the same values as the ``bhk`` filter parameter
+BEDROOM_BUCKET_LABELS = {
+    '1': '1 BHK',
+    '2': '2 BHK',
+    '3': '3 BHK',
+    '4plus': '4+ BHK',
+}
+
+
+def _price_bucket():
+    whens = []
+    for key, (low, high) in PRICE_BUCKETS.items():
+        condition = Q()
+        if low is not None:
+            condition &= Q(price__gte=low)
+        if high is not None:
+            condition &= Q(price__lt=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, default=Value(''), output_field=CharField())
+
+
+def _bedroom_bucket():
+    whens = [When(bedrooms=n, then=Value(str(n))) for n in (1, 2, 3)]
+    whens.append(When(bedrooms__gte=4, then=Value('4plus')))
+    return Case(*whens, default=Value(''), output_field=CharField())
+
+
+def _facet(counter, labels=None, order=None):
+    """Turn a Counter into [{'value', 'label', 'count'}, ...]"""
+    labels = labels or {}
+    if order is not None:
+        keys = [key for key in order if counter.get(key)]
+    else:
+        keys = [key for key, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0]))) if count]
+    return [
+        {'value': key, 'label': labels.get(key, key), 'count': counter[key]}
+        for key in keys
+    ]
+
+
+def _amenity_counts():
+    return {
+        f'amenity_{amenity}': Count('id', filter=has_amenities_q(bit))
+        for amenity, bit in Property.AMENITY_BITS.items()
+    }
+
+
+def compute_facets(filters):
+    """Facet counts for a PropertyFilter, computed in one aggregation query"""
+    rows = (
+        filters.queryset()
+        .order_by()
+        .annotate(price_bucket=_price_bucket(), bedroom_bucket=_bedroom_bucket())
+        .values(
+            'city', 'property_for', 'furnishing', 'property_type_id',
+            'property_type__name', 'price_bucket', 'bedroom_bucket',
+        )
+        .annotate(count=Count('id'), **_amenity_counts())
+    )
+
+    total = 0
+    cities = Counter()
+    property_for = Counter()
+    furnishing = Counter()
+    property_types = Counter()
+    type_names = {}
+    prices = Counter()
+    bedrooms = Counter()
+    amenities = Counter()
+
+    for row in rows:
+        count = row['count']
+        total += count
+        if row['city']:
+            cities[row['city']] += count
+        property_for[row['property_for']] += count
+        if row['furnishing']:
+            furnishing[row['furnishing']] += count
+        if row['property_type_id']:
+            property_types[row['property_type_id']] += count
+            type_names[row['property_type_id']] = row['property_type__name']
+        if row['price_bucket']:
+            prices[row['price_bucket']] += count
+        if row['bedroom_bucket']:
+            bedrooms[row['bedroom_bucket']] += count
+        for amenity in Property.AMENITY_BITS:
+            amenities[amenity] += row[f'amenity_{amenity}']
+
+    return {
+        'total': total,
+        'city': _facet(cities),
+        'property_for': _facet(property_for, dict(Property.PROPERTY_FOR_CHOICES)),
+        'bedrooms': _facet(bedrooms, BEDROOM_BUCKET_LABELS, order=BEDROOM_BUCKET_LABELS),
+        'furnishing': _facet(furnishing, dict(Property.FURNISHING_CHOICES)),
+        'property_type': _facet(property_types, type_names),
+        'price_range': _facet(prices, PRICE_BUCKET_LABELS, order=PRICE_BUCKETS),
+        'amenities': _facet(amenities, dict(Property.AMENITY_CHOICES)),
+    }
+
+
+def get_facets(filters):
+    """Cached facet counts for a PropertyFilter"""
+    # Sorting doesn't change counts; share one entry across sort orders
+    filters = filters.without('sort')
+    key = f'{filters.cache_key}:facets'
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,454 @@
+"""
+Shared property filter engine.
+
+The public listing endpoints (home page filter API, properties list, featured
+properties API and the buyer search page) all accept slightly different GET
+parameters for the same handful of filters. Each endpoint declares its
+parameters here as a ``FilterSpec``; parsing produces a ``PropertyFilter``,
+a frozen, canonical description of the search:
+
+    spec = LISTING_SPEC
+    pf = spec.parse(request.GET, featured_only=True)
+    properties = pf.queryset()      # Property queryset
+    ids = pf.id_queryset()          # ordered ids, from ActiveListingIndex when possible
+    key = pf.cache_key
+
+Equivalent searches normalise to the same object regardless of which endpoint
+(or parameter spelling) produced them, so the compiled queryset is built once
+per canonical filter and ``cache_key`` can be used to cache results.
+"""
+
+import hashlib
+from dataclasses import dataclass, fields, replace
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.db.models import F, Q
+from django.db.models.lookups import Exact
+
+from .models import ActiveListingIndex, Property
+from .search import keyword_q, rank_expression, tokenize
+
+# Number of compiled querysets kept per process
+COMPILED_CACHE_SIZE = 256
+
+# Named price buckets: (inclusive lower bound, exclusive upper bound)
+PRICE_BUCKETS = {
+    'under_50l': (None, Decimal('5000000')),
+    '50l_1cr': (Decimal('5000000'), Decimal('10000000')),
+    '1cr_2cr': (Decimal('10000000'), Decimal('20000000')),
+    'above_2cr': (Decimal('20000000'), None),
+}
+
+POSSESSION_CHOICES = ('ready', 'under_construction')
+
+# Sort fields available on ActiveListingIndex
+INDEX_SORT_FIELDS = frozenset({'price', 'carpet_area', 'created_at', 'is_urgent'})
+
+# Pseudo sort: best keyword match first (see search.rank_expression). Only
+# Property querysets can be ranked, so relevance never uses the index.
+RELEVANCE = 'relevance'
+
+
+@dataclass(frozen=True)
+class PropertyFilter:
+    """Canonical, hashable description of a property search"""
+
+    q: str = ''
+    city: str = ''
+    location: str = ''
+    type_text: str = ''
+    property_for: str = ''
+    category: str = ''
+    property_type: str = ''
+    property_type_ids: tuple = ()
+    furnishing: str = ''
+    price_min: Decimal = None
+    price_max: Decimal = None
+    price_below: Decimal = None
+    bedrooms_min: int = None
+    bedrooms_max: int = None
+    bathrooms_min: int = None
+    area_min: Decimal = None
+    area_max: Decimal = None
+    amenities: tuple = ()
+    possession: str = ''
+    featured_only: bool = False
+    sort: str = '-created_at'  # comma-separated order_by fields, or RELEVANCE
+
+    @property
+    def canonical(self):
+        """Stable string form of the non-default fields"""
+        parts = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if value == f.default:
+                continue
+            if isinstance(value, Decimal):
+                value = format(value.normalize(), 'f')
+            elif isinstance(value, tuple):
+                value = ','.join(str(v) for v in value)
+            parts.append(f'{f.name}={value}')
+        return '&'.join(parts)
+
+    @property
+    def cache_key(self):
+        """Cache key for anything derived from this search (results, counts, ...)"""
+        return 'property_filter:' + hashlib.md5(self.canonical.encode()).hexdigest()
+
+    def without(self, *names):
+        """Copy of this filter with the given fields reset to their defaults"""
+        defaults = {f.name: f.default for f in fields(self) if f.name in names}
+        return replace(self, **defaults)
+
+    @property
+    def uses_index(self):
+        """Whether this search can run entirely on ActiveListingIndex"""
+        if self.location or self.type_text:
+            return False
+        sort_fields = [field.lstrip('-') for field in self.sort.split(',') if field]
+        return all(field in INDEX_SORT_FIELDS for field in sort_fields)
+
+    def to_q(self, index=False):
+        """
+        Build the WHERE clause for this filter.
+
+        With ``index=True`` the clause targets ActiveListingIndex (only valid
+        when ``uses_index`` is true), otherwise Property.
+        """
+        if index:
+            q = Q()
+        else:
+            q = Q(status='active')
+
+        if self.featured_only:
+            q &= Q(is_featured=True)
+        if self.q:
+            q &= keyword_q(self.q, field='listing_id' if index else 'id')
+        if self.city:
+            q &= Q(city__icontains=self.city)
+        if self.location:
+            q &= (
+                Q(city__icontains=self.location) |
+                Q(locality__icontains=self.location) |
+                Q(address__icontains=self.location)
+            )
+        if self.type_text:
+            q &= (
+                Q(title__icontains=self.type_text) |
+                Q(property_type__name__icontains=self.type_text)
+            )
+        if self.property_for:
+            q &= Q(property_for=self.property_for)
+        if self.category:
+            q &= Q(category_slug=self.category) if index else Q(category__slug=self.category)
+        if self.property_type:
+            q &= Q(type_slug=self.property_type) if index else Q(property_type__slug=self.property_type)
+        if self.property_type_ids:
+            q &= Q(property_type_id__in=self.property_type_ids)
+        if self.furnishing:
+            q &= Q(furnishing=self.furnishing)
+
+        if self.price_min is not None:
+            q &= Q(price__gte=self.price_min)
+        if self.price_max is not None:
+            q &= Q(price__lte=self.price_max)
+        if self.price_below is not None:
+            q &= Q(price__lt=self.price_below)
+
+        if self.bedrooms_min is not None and self.bedrooms_min == self.bedrooms_max:
+            q &= Q(bedrooms=self.bedrooms_min)
+        else:
+            if self.bedrooms_min is not None:
+                q &= Q(bedrooms__gte=self.bedrooms_min)
+            if self.bedrooms_max is not None:
+                q &= Q(bedrooms__lte=self.bedrooms_max)
+        if self.bathrooms_min is not None:
+            q &= Q(bathrooms__gte=self.bathrooms_min)
+
+        if self.area_min is not None:
+            q &= Q(carpet_area__gte=self.area_min)
+        if self.area_max is not None:
+            q &= Q(carpet_area__lte=self.area_max)
+
+        if self.amenities:
+            q &= has_amenities_q(Property.amenity_mask_for(self.amenities))
+
+        if self.possession and index:
+            q &= Q(possession=self.possession)
+        elif self.possession == 'ready':
+            q &= Q(possession_status__icontains='ready')
+        elif self.possession == 'under_construction':
+            q &= Q(possession_status__icontains='construction')
+
+        return q
+
+    def queryset(self):
+        """Fresh clone of the compiled queryset for this filter"""
+        return _compile(self).all()
+
+    def id_queryset(self):
+        """
+        Ordered ids of the matching properties.
+
+        Served from the narrow ActiveListingIndex table when possible, so
+        callers can filter/sort/paginate there and then fetch just a page of
+        Property rows.
+        """
+        return _compile_ids(self).all()
+
+
+def has_amenities_q(mask):
+    """Properties having every amenity in ``mask`` (one bitwise predicate)"""
+    return Q(Exact(F('amenity_mask').bitand(mask), mask))
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile(pf):
+    """Compile a filter into an (unevaluated) ordered queryset"""
+    queryset = Property.objects.filter(pf.to_q())
+    if pf.sort == RELEVANCE:
+        # Newest first among equally relevant matches
+        queryset = queryset.annotate(search_rank=rank_expression(pf.q))
+        queryset = queryset.order_by('-search_rank', '-created_at', '-id')
+    elif pf.sort:
+        # id breaks ties so pages are stable and match the index ordering
+        queryset = queryset.order_by(*pf.sort.split(','), '-id')
+    return queryset
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile_ids(pf):
+    """Compile a filter into an ordered values_list of property ids"""
+    if not pf.uses_index:
+        return _compile(pf).values_list('id', flat=True)
+    queryset = ActiveListingIndex.objects.filter(pf.to_q(index=True))
+    if pf.sort:
+        queryset = queryset.order_by(*pf.sort.split(','), '-listing_id')
+    return queryset.values_list('listing_id', flat=True)
+
+
+def clear_compiled_cache():
+    """Drop all compiled querysets (e.g. after switching search backends)"""
+    _compile.cache_clear()
+    _compile_ids.cache_clear()
+
+
+# ======================================================
+# Value parsers
+# ======================================================
+# Each parser takes the raw GET value (or list, for multi-value params) and
+# returns a dict of PropertyFilter fields. Invalid input yields {} so a bad
+# parameter is ignored, as the views always did.
+
+def _text(field, lower=True):
+    def parse(value):
+        value = ' '.join(value.split())
+        return {field: value.lower() if lower else value} if value else {}
+    return parse
+
+
+def _choice(field, choices=None):
+    def parse(value):
+        value = value.strip()
+        if not value or (choices is not None and value not in choices):
+            return {}
+        return {field: value}
+    return parse
+
+
+def _to_decimal(value):
+    try:
+        number = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not number.is_finite() or number < 0:
+        return None
+    return number
+
+
+def _to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _decimal(field):
+    def parse(value):
+        number = _to_decimal(value)
+        return {field: number} if number is not None else {}
+    return parse
+
+
+def _integer(field):
+    def parse(value):
+        number = _to_int(value)
+        return {field: number} if number is not None else {}
+    return parse
+
+
+def _keywords(value):
+    terms = tokenize(value)
+    return {'q': ' '.join(terms)} if terms else {}
+
+
+def _price_bucket(value):
+    """Named buckets used by the listing pages: under_50l, 50l_1cr, ..."""
+    if value not in PRICE_BUCKETS:
+        return {}
+    low, high = PRICE_BUCKETS[value]
+    result = {}
+    if low is not None:
+        result['price_min'] = low
+    if high is not None:
+        result['price_below'] = high
+    return result
+
+
+def _price_span(value):
+    """Home page ranges: "<min>-<max>" (inclusive) or "<min>+" """
+    value = value.strip()
+    if value.endswith('+'):
+        low = _to_decimal(value[:-1])
+        return {'price_min': low} if low is not None else {}
+    low, sep, high = value.partition('-')
+    low, high = _to_decimal(low), _to_decimal(high)
+    if not sep or low is None or high is None:
+        return {}
+    return {'price_min': low, 'price_max': high}
+
+
+def _bhk(value):
+    """Exact bedroom count, "4plus" meaning four or more"""
+    if value == '4plus':
+        return {'bedrooms_min': 4}
+    number = _to_int(value)
+    return {'bedrooms_min': number, 'bedrooms_max': number} if number is not None else {}
+
+
+def _home_bedrooms(value):
+    """Home page bedrooms: exact, "4" meaning four or more, "0" meaning any"""
+    number = _to_int(value)
+    if not number:
+        return {}
+    if number >= 4:
+        return {'bedrooms_min': number}
+    return {'bedrooms_min': number, 'bedrooms_max': number}
+
+
+def _id_list(field):
+    def parse(values):
+        ids = {_to_int(v) for v in values}
+        ids.discard(None)
+        return {field: tuple(sorted(ids))} if ids else {}
+    return parse
+
+
+def _amenity_list(values):
+    """Known amenity ids only, as in Property.AMENITY_CHOICES"""
+    items = {v.strip() for v in values} & Property.AMENITY_BITS.keys()
+    return {'amenities': tuple(sorted(items))} if items else {}
+
+
+# ======================================================
+# Endpoint specs
+# ======================================================
+
+_LOWER_BOUNDS = ('price_min', 'bedrooms_min', 'bathrooms_min', 'area_min')
+_UPPER_BOUNDS = ('price_max', 'price_below', 'bedrooms_max', 'area_max')
+
+
+def _merge(values, parsed):
+    """Add parsed fields; bounds set by two parameters keep the tighter one"""
+    for name, value in parsed.items():
+        if name in values and name in _LOWER_BOUNDS:
+            value = max(values[name], value)
+        elif name in values and name in _UPPER_BOUNDS:
+            value = min(values[name], value)
+        values[name] = value
+
+
+class FilterSpec:
+    """
+    Declarative mapping from an endpoint's GET parameters to a PropertyFilter.
+
+    ``params`` maps parameter name -> parser; names listed in ``multi`` are read
+    with ``getlist``. ``sorts`` is the sort whitelist; an unknown sort falls
+    back to ``default_sort``, or to ``RELEVANCE`` for keyword searches.
+    """
+
+    def __init__(self, params, multi=(), sorts=(), default_sort='-created_at'):
+        self.params = params
+        self.multi = frozenset(multi)
+        self.sorts = frozenset(sorts)
+        self.default_sort = default_sort
+
+    def parse(self, data, **base):
+        """Normalise a QueryDict (or plain dict) into a PropertyFilter"""
+        values = {}
+        for name, parser in self.params.items():
+            if name in self.multi:
+                raw = data.getlist(name) if hasattr(data, 'getlist') else data.get(name) or []
+            else:
+                raw = data.get(name)
+            if raw:
+                _merge(values, parser(raw))
+
+        sort = data.get('sort')
+        if sort not in self.sorts and not (sort == RELEVANCE and values.get('q')):
+            # Keyword searches rank by relevance unless a sort was chosen
+            sort = RELEVANCE if values.get('q') else self.default_sort
+        values['sort'] = sort
+        values.update(base)
+        return PropertyFilter(**values)
+
+
+# Home page filter API (api_filter_properties)
+HOME_SPEC = FilterSpec(
+    params={
+        'property_type': _text('type_text'),
+        'price_range': _price_span,
+        'location': _text('location'),
+        'bedrooms': _home_bedrooms,
+    },
+)
+
+# Public listing pages (properties_list_view, api_featured_properties)
+LISTING_SPEC = FilterSpec(
+    params={
+        'q': _keywords,
+        'city': _text('city'),
+        'property_for': _choice('property_for', dict(Property.PROPERTY_FOR_CHOICES)),
+        'price_range': _price_bucket,
+        'min_price': _decimal('price_min'),
+        'max_price': _decimal('price_max'),
+        'property_type': _id_list('property_type_ids'),
+        'bhk': _bhk,
+        'amenities': _amenity_list,
+        'possession': _choice('possession', POSSESSION_CHOICES),
+    },
+    multi=('property_type', 'amenities'),
+    sorts=('price', '-price', 'created_at', '-created_at', 'view_count', '-view_count',
+           'inquiry_count', '-inquiry_count'),
+)
+
+# Buyer dashboard search (buyer_properties)
+BUYER_SPEC = FilterSpec(
+    params={
+        'q': _keywords,
+        'category': _choice('category'),
+        'property_type': _choice('property_type'),
+        'min_price': _decimal('price_min'),
+        'max_price': _decimal('price_max'),
+        'bedrooms': _integer('bedrooms_min'),
+        'bathrooms': _integer('bathrooms_min'),
+        'min_area': _decimal('area_min'),
+        'max_area': _decimal('area_max'),
+        'city': _text('city'),
+        'property_for': _choice('property_for', dict(Property.PROPERTY_FOR_CHOICES)),
+        'furnishing': _choice('furnishing', dict(Property.FURNISHING_CHOICES)),
+    },
+    sorts=('price', '-price', 'created_at', '-created_at', 'carpet_area', '-carpet_area',
+           'view_count', '-view_count'),
+)
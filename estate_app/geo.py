@@ -0,0 +1,158 @@
+"""
+Geo search helpers for Property latitude/longitude.
+
+Every property with coordinates stores a geohash (see ``Property.save``), so a
+radius or viewport search can run in two steps:
+
+1. Prefilter: the area is covered with a handful of geohash cells and the
+   query keeps rows whose indexed ``geohash`` starts with one of them, plus a
+   latitude/longitude BETWEEN on the bounding box.
+2. Refine: the exact great-circle (haversine) distance is computed in SQL for
+   the surviving rows, which also makes results sortable by distance.
+
+The helpers take and return querysets, so they compose with the shared filter
+engine (price, bhk, ...) and with pagination.
+"""
+
+import math
+
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Precision stored on Property (~4.8m x 4.8m cells)
+GEOHASH_PRECISION = 9
+
+# Upper bound on cells used for a prefilter; the precision is lowered until
+# the area fits
+MAX_COVER_CELLS = 16
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point"""
+    lat, lng = float(lat), float(lng)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(lat_degrees, lng_degrees) spanned by a geohash cell"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def _frange(start, stop, step):
+    value = start
+    while value < stop + step:
+        yield min(value, stop)
+        value += step
+
+
+def cover_cells(min_lat, min_lng, max_lat, max_lng):
+    """
+    Geohash prefixes covering a bounding box.
+
+    Picks the finest precision whose cover stays within MAX_COVER_CELLS.
+    Returns an empty list when the box is too large to be worth prefiltering.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * cols > MAX_COVER_CELLS:
+            continue
+        cells = set()
+        for lat in _frange(min_lat, max_lat, lat_step):
+            for lng in _frange(min_lng, max_lng, lng_step):
+                cells.add(encode_geohash(lat, lng, precision))
+        return sorted(cells)
+    return []
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, min_lng, max_lat, max_lng) enclosing a circle"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    if cos_lat < 1e-6:
+        lng_delta = 180.0
+    else:
+        lng_delta = min(180.0, lat_delta / cos_lat)
+    return (
+        max(-90.0, lat - lat_delta),
+        max(-180.0, lng - lng_delta),
+        min(90.0, lat + lat_delta),
+        min(180.0, lng + lng_delta),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def distance_expression(lat, lng):
+    """SQL haversine distance (km) from a point to each row's coordinates"""
+    row_lat = Radians(Cast(F('latitude'), FloatField()))
+    row_lng = Radians(Cast(F('longitude'), FloatField()))
+    phi = math.radians(lat)
+    lam = math.radians(lng)
+    a = (
+        Power(Sin((row_lat - phi) / 2), 2) +
+        math.cos(phi) * Cos(row_lat) * Power(Sin((row_lng - lam) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def within_bbox(queryset, min_lat, min_lng, max_lat, max_lng):
+    """Restrict a Property queryset to a viewport using the geohash prefilter"""
+    cells = cover_cells(min_lat, min_lng, max_lat, max_lng)
+    if cells:
+        prefix_q = Q()
+        for cell in cells:
+            prefix_q |= Q(geohash__startswith=cell)
+        queryset = queryset.filter(prefix_q)
+    return queryset.filter(
+        latitude__gte=min_lat, latitude__lte=max_lat,
+        longitude__gte=min_lng, longitude__lte=max_lng,
+    )
+
+
+def within_radius(queryset, lat, lng, radius_km):
+    """
+    Restrict a Property queryset to a circle and annotate ``distance_km``.
+
+    The bounding box prefilter narrows the rows by index before the exact
+    haversine distance is evaluated.
+    """
+    queryset = within_bbox(queryset, *bounding_box(lat, lng, radius_km))
+    return queryset.annotate(
+        distance_km=distance_expression(lat, lng)
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,113 @@
+"""
+Per-seller lead statistics for the leads page header.
+
+Every figure (status, priority and source breakdowns, response rate and
+average response time) comes from a single conditional-aggregate query over
+the seller's inquiries, with ``Count(filter=Q(...))`` per bucket and the
+average response time computed in SQL as ``Avg(responded_at - created_at)``.
+
+Results are cached per seller for ``CACHE_TIMEOUT`` seconds. Saving or
+deleting an inquiry invalidates its seller's entry (see signals.py); code
+changing inquiries with ``QuerySet.update()`` must call ``invalidate`` itself
+(with the ``owner_ids`` taken before the update), since it sends no signals.
+"""
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+
+from .models import PropertyInquiry
+
+CACHE_TIMEOUT = 60 * 10     # 10 minutes
+
+PRIORITIES = (1, 2, 3, 4, 5)
+SOURCE_CHOICES = PropertyInquiry._meta.get_field('source').choices
+
+
+def _cache_key(user_id):
+    return f'lead_stats:{user_id}'
+
+
+def invalidate(*user_ids):
+    """Drop sellers' cached lead statistics"""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids if user_id])
+
+
+def owner_ids(inquiries):
+    """Ids of the sellers owning the given PropertyInquiry queryset"""
+    return set(inquiries.order_by().values_list('property__owner_id', flat=True).distinct())
+
+
+def format_duration(seconds):
+    """Human readable response time, e.g. '45 minutes' or '1.5 days'"""
+    if seconds is None:
+        return "N/A"
+    hours = seconds / 3600
+    if hours < 1:
+        return f"{int(seconds / 60)} minutes"
+    if hours < 24:
+        return f"{hours:.1f} hours"
+    return f"{hours / 24:.1f} days"
+
+
+def _aggregate(inquiries):
+    status_counts = {
+        f'status_{status}': Count('id', filter=Q(status=status))
+        for status, _label in PropertyInquiry.STATUS_CHOICES
+    }
+    priority_counts = {
+        f'priority_{priority}': Count('id', filter=Q(priority=priority))
+        for priority in PRIORITIES
+    }
+    source_counts = {
+        f'source_{source}': Count('id', filter=Q(source=source))
+        for source, _label in SOURCE_CHOICES
+    }
+    response_time = ExpressionWrapper(F('responded_at') - F('created_at'), output_field=DurationField())
+    return inquiries.order_by().aggregate(
+        total=Count('id'),
+        responded=Count('id', filter=~Q(response='')),
+        avg_response=Avg(response_time, filter=Q(responded_at__isnull=False)),
+        **status_counts,
+        **priority_counts,
+        **source_counts,
+    )
+
+
+def compute(user):
+    """Lead statistics of a seller, straight from the database"""
+    row = _aggregate(PropertyInquiry.objects.filter(property__owner=user))
+    total = row['total']
+
+    lead_sources = [
+        {
+            'source': source,
+            'count': row[f'source_{source}'],
+            'percentage': row[f'source_{source}'] * 100.0 / total if total else 0,
+        }
+        for source, _label in SOURCE_CHOICES
+        if row[f'source_{source}']
+    ]
+    lead_sources.sort(key=lambda item: -item['count'])
+
+    avg_response = row['avg_response']
+    return {
+        'total_leads': total,
+        'status_counts': {
+            status: row[f'status_{status}'] for status, _label in PropertyInquiry.STATUS_CHOICES
+        },
+        'responded_leads': row['responded'],
+        'response_rate': round(row['responded'] / total * 100, 1) if total else 0,
+        'avg_response_seconds': avg_response.total_seconds() if avg_response is not None else None,
+        'lead_sources': lead_sources,
+        'priority_counts': {priority: row[f'priority_{priority}'] for priority in PRIORITIES},
+    }
+
+
+def get_lead_stats(user):
+    """Cached lead statistics of a seller (see ``compute``)"""
+    key = _cache_key(user.pk)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute(user)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
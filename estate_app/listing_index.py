@@ -0,0 +1,107 @@
+"""
+Maintenance of the ActiveListingIndex search table.
+
+Active listings get one narrow row with the columns search endpoints filter
+and sort on; anything else has no row. ``sync_property`` is called from the
+Property post_save signal, ``sync_ids`` after bulk updates, and ``rebuild``
+from the ``rebuild_listing_index`` command.
+"""
+
+import logging
+
+from django.db import transaction
+
+from .models import ActiveListingIndex, Property
+
+logger = logging.getLogger(__name__)
+
+# Property fields copied into the index; saves touching none of them skip it
+INDEXED_FIELDS = frozenset({
+    'status', 'city', 'locality', 'latitude', 'longitude', 'geohash',
+    'property_for', 'property_type', 'category', 'furnishing', 'possession_status',
+    'amenities', 'amenity_mask', 'price', 'price_per_sqft', 'carpet_area',
+    'bedrooms', 'bathrooms', 'is_featured', 'is_urgent', 'is_premium', 'is_verified',
+})
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def possession_code(possession_status):
+    status = (possession_status or '').lower()
+    if 'ready' in status:
+        return 'ready'
+    if 'construction' in status:
+        return 'under_construction'
+    return ''
+
+
+def index_values(prop):
+    """Column values of the index row for a Property"""
+    return {
+        'city': prop.city,
+        'locality': prop.locality,
+        'geohash': prop.geohash,
+        'property_for': prop.property_for,
+        'property_type_id': prop.property_type_id,
+        'type_slug': prop.property_type.slug if prop.property_type_id else '',
+        'category_slug': prop.category.slug if prop.category_id else '',
+        'furnishing': prop.furnishing,
+        'possession': possession_code(prop.possession_status),
+        'amenity_mask': prop.amenity_mask,
+        'price': prop.price,
+        'price_per_sqft': prop.price_per_sqft,
+        'carpet_area': prop.carpet_area,
+        'bedrooms': prop.bedrooms,
+        'bathrooms': prop.bathrooms,
+        'is_featured': prop.is_featured,
+        'is_urgent': prop.is_urgent,
+        'is_premium': prop.is_premium,
+        'is_verified': prop.is_verified,
+        'created_at': prop.created_at,
+    }
+
+
+def sync_property(prop):
+    """Insert, update or remove the index row of one listing"""
+    if prop.status == 'active':
+        ActiveListingIndex.objects.update_or_create(listing_id=prop.pk, defaults=index_values(prop))
+    else:
+        ActiveListingIndex.objects.filter(listing_id=prop.pk).delete()
+
+
+def sync_ids(ids):
+    """Re-sync the index rows of the given property ids"""
+    ids = list(ids)
+    active = (
+        Property.objects.filter(pk__in=ids, status='active')
+        .select_related('property_type', 'category')
+    )
+    with transaction.atomic():
+        ActiveListingIndex.objects.filter(listing_id__in=ids).delete()
+        ActiveListingIndex.objects.bulk_create(
+            [ActiveListingIndex(listing_id=prop.pk, **index_values(prop)) for prop in active]
+        )
+
+
+def rebuild(batch_size=REBUILD_BATCH_SIZE):
+    """Rebuild the whole index from core_property; returns the row count"""
+    active = (
+        Property.objects.filter(status='active')
+        .select_related('property_type', 'category')
+        .order_by('pk')
+    )
+    count = 0
+    with transaction.atomic():
+        ActiveListingIndex.objects.all().delete()
+        batch = []
+        for prop in active.iterator(chunk_size=batch_size):
+            batch.append(ActiveListingIndex(listing_id=prop.pk, **index_values(prop)))
+            if len(batch) >= batch_size:
+                ActiveListingIndex.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            ActiveListingIndex.objects.bulk_create(batch)
+            count += len(batch)
+    logger.info(f"Active listing index rebuilt with {count} rows")
+    return count
@@ -0,0 +1,143 @@
+"""
+Sending many emails over one connection.
+
+``Sender`` keeps a single backend connection (one SMTP session and TLS
+handshake) open across batches, paces messages with a ``RateLimiter`` and
+retries what failed in a batch with exponential backoff, reconnecting
+first. Refused recipients are permanent failures and are not retried.
+
+Backends are the usual Django ones, so pipelines built on this can run
+offline with the console or file backend (``BACKEND_ALIASES``).
+"""
+
+import logging
+import smtplib
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ALIASES = {
+    'smtp': 'django.core.mail.backends.smtp.EmailBackend',
+    'console': 'django.core.mail.backends.console.EmailBackend',
+    'file': 'django.core.mail.backends.filebased.EmailBackend',
+    'locmem': 'django.core.mail.backends.locmem.EmailBackend',
+}
+
+# Errors that retrying the same message can't fix
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused,)
+
+DEFAULT_RATE = 5            # messages per second
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 2.0       # seconds before the first retry, doubled each time
+
+# Outcome of one message: error is None when it was delivered
+Result = namedtuple('Result', 'error attempts permanent')
+
+
+class RateLimiter:
+    """Token bucket: at most ``rate`` calls per second, bursts of ``burst``"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = self.burst
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+
+    def wait(self):
+        if not self.rate:
+            return
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.sleep((1 - self.tokens) / self.rate)
+            self.tokens = 1
+            self.updated = self.clock()
+        self.tokens -= 1
+
+
+def resolve_backend(backend):
+    """Dotted backend path from an alias (``console``, ``file``...) or path"""
+    return BACKEND_ALIASES.get(backend, backend)
+
+
+class Sender:
+    """
+    Rate-limited, retrying delivery over one reused backend connection.
+
+    Use as a context manager; ``send_batch`` returns one ``Result`` per
+    message.
+    """
+
+    def __init__(self, backend=None, rate=DEFAULT_RATE, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff=DEFAULT_BACKOFF, sleep=time.sleep, **backend_options):
+        self.backend = resolve_backend(backend) if backend else None
+        self.backend_options = backend_options
+        self.limiter = RateLimiter(rate, sleep=sleep)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connection(self):
+        if self.connection is None:
+            self.connection = get_connection(self.backend, fail_silently=False, **self.backend_options)
+            # Opened explicitly so send_messages() doesn't close it after each call
+            self.connection.open()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass  # the server may already have dropped us
+            self.connection = None
+
+    def send_batch(self, messages):
+        results = [None] * len(messages)
+        errors = {}
+        pending = list(range(len(messages)))
+        attempt = 0
+        while pending:
+            attempt += 1
+            failed = []
+            for index in pending:
+                self.limiter.wait()
+                try:
+                    if not self._connection().send_messages([messages[index]]):
+                        raise smtplib.SMTPException('Message was not accepted')
+                    results[index] = Result(None, attempt, False)
+                except PERMANENT_ERRORS as e:
+                    results[index] = Result(str(e), attempt, True)
+                except Exception as e:
+                    errors[index] = str(e)
+                    failed.append(index)
+                    self.close()  # reconnect for the next message
+            pending = failed
+            if pending and attempt > self.max_retries:
+                break
+            if pending:
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"{len(pending)} email(s) failed, retrying in {delay:.0f}s")
+                self.sleep(delay)
+        for index in pending:
+            results[index] = Result(errors[index], attempt, False)
+        return results
+
+
+def default_backend(setting):
+    """Backend from a per-pipeline setting, falling back to EMAIL_BACKEND"""
+    return getattr(settings, setting, None) or settings.EMAIL_BACKEND
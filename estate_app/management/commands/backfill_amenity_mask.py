@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from estate_app.models import Property
+
+
+class Command(BaseCommand):
+    help = 'Recompute Property.amenity_mask from the amenities JSON field'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of properties to update per query',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = 0
+        changed = 0
+        batch = []
+
+        properties = Property.objects.only('id', 'amenities', 'amenity_mask')
+        for prop in properties.iterator(chunk_size=batch_size):
+            checked += 1
+            mask = prop.compute_amenity_mask()
+            if mask == prop.amenity_mask:
+                continue
+            prop.amenity_mask = mask
+            batch.append(prop)
+            if len(batch) >= batch_size:
+                Property.objects.bulk_update(batch, ['amenity_mask'])
+                changed += len(batch)
+                batch = []
+
+        if batch:
+            Property.objects.bulk_update(batch, ['amenity_mask'])
+            changed += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Checked {checked} properties, updated {changed} amenity masks')
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from estate_app.models import Property, PropertyImage
+from estate_app.renditions import build
+
+
+class Command(BaseCommand):
+    help = 'Build WebP/JPEG renditions of property images uploaded before they were generated on upload'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild renditions of images that already have them',
+        )
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.exclude(image='').only('id', 'image', 'renditions')
+        if not options['force']:
+            images = images.filter(renditions={})
+
+        built = 0
+        manifests = {}
+        for image in images.iterator(chunk_size=100):
+            image.renditions = build(image.image)
+            PropertyImage.objects.filter(pk=image.pk).update(renditions=image.renditions)
+            manifests[image.image.name] = image.renditions
+            built += bool(image.renditions)
+
+        # Primary images are usually a gallery image's file; reuse its manifest
+        properties = Property.objects.exclude(primary_image='').only('id', 'primary_image', 'primary_image_renditions')
+        if not options['force']:
+            properties = properties.filter(primary_image_renditions={})
+
+        primaries = 0
+        for prop in properties.iterator(chunk_size=100):
+            name = prop.primary_image.name
+            if name not in manifests:
+                gallery_image = PropertyImage.objects.filter(image=name).exclude(renditions={}).first()
+                manifests[name] = gallery_image.renditions if gallery_image else build(prop.primary_image)
+            Property.objects.filter(pk=prop.pk).update(primary_image_renditions=manifests[name])
+            primaries += bool(manifests[name])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully built renditions of {built} images and {primaries} primary images')
+        )
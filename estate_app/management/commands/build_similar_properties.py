@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from estate_app import similarity
+
+
+class Command(BaseCommand):
+    help = 'Compute the similar-properties neighbor lists of active listings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every listing instead of only changed neighborhoods',
+        )
+
+    def handle(self, *args, **options):
+        if options['full']:
+            count = similarity.build()
+        else:
+            count = similarity.refresh()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully computed similar properties for {count} listings')
+        )
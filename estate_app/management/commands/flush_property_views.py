@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from estate_app import view_tracking
+
+
+class Command(BaseCommand):
+    help = 'Write buffered property views (view_count and PropertyView rows) to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=view_tracking.FLUSH_BATCH_SIZE,
+            help='Number of buffered views read per batch',
+        )
+
+    def handle(self, *args, **options):
+        count = view_tracking.flush(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully flushed {count} property views')
+        )
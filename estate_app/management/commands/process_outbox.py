@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from estate_app import mailer, outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued transactional emails from the outbox, retrying and dead-lettering failures'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            help=f"Email backend: {', '.join(mailer.BACKEND_ALIASES)} or a dotted path "
+                 f"(default OUTBOX_BACKEND, then EMAIL_BACKEND)",
+        )
+        parser.add_argument(
+            '--file-path',
+            help='Directory the file backend writes messages to',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help=f'Messages claimed at a time (default OUTBOX_BATCH_SIZE or {outbox.DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Messages per second, 0 for no limit (default OUTBOX_RATE or 0)',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Only print the queue size per status and the age of the oldest pending email',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new emails instead of exiting when the outbox is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for key, value in outbox.stats().items():
+                self.stdout.write(f'{key}: {value}')
+            return
+
+        process_options = {
+            'backend': options['backend'],
+            'batch_size': options['batch_size'],
+            'rate': options['rate'],
+        }
+        if options['file_path']:
+            process_options['file_path'] = options['file_path']
+
+        while True:
+            metrics = outbox.process(**process_options)
+            if any(metrics.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Successfully processed outbox: {metrics['sent']} sent, {metrics['retried']} "
+                    f"to retry, {metrics['dead']} dead-lettered, {metrics['released']} released"
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
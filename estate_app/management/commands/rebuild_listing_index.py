@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from estate_app import listing_index, result_cache
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the ActiveListingIndex search table from active properties'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=listing_index.REBUILD_BATCH_SIZE,
+            help='Number of rows to insert per query',
+        )
+
+    def handle(self, *args, **options):
+        count = listing_index.rebuild(batch_size=options['batch_size'])
+        result_cache.invalidate_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully indexed {count} active listings')
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from estate_app.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Create (if missing) and rebuild the property full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recreate',
+            action='store_true',
+            help='Drop and recreate the index structures before rebuilding',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        name = type(backend).__name__
+
+        if options['recreate']:
+            backend.uninstall()
+            self.stdout.write(f'Dropped search index ({name})')
+
+        backend.install()
+        backend.rebuild()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt property search index ({name})')
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from estate_app import seller_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute SellerStats counters from properties and inquiries, repairing drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='Only reconcile this user id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        drifted = seller_stats.reconcile(options['users'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully reconciled seller stats ({drifted} rows had drifted)')
+        )
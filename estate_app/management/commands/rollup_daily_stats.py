@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from estate_app import analytics
+
+
+class Command(BaseCommand):
+    help = 'Aggregate property views and inquiries into the PropertyDailyStats rollup (run every 15 minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Recompute the last N days instead of only what changed since the last run',
+        )
+
+    def handle(self, *args, **options):
+        if options['days']:
+            today = timezone.localdate()
+            count = analytics.rebuild_days(today - timedelta(days=options['days'] - 1), today)
+        else:
+            count = analytics.refresh()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully wrote {count} daily stats rows')
+        )
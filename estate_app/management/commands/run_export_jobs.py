@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from estate_app import export_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run pending export jobs into MEDIA_ROOT/exports/ and delete expired export files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new jobs instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expired = export_jobs.expire()
+            count = export_jobs.run_pending()
+            if count or expired or not options['loop']:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Successfully ran {count} export jobs ({expired} expired)')
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
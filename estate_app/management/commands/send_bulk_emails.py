@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from estate_app import bulk_email, mailer
+
+
+class Command(BaseCommand):
+    help = 'Send queued bulk email campaigns in rate-limited batches over one connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            help=f"Email backend: {', '.join(mailer.BACKEND_ALIASES)} or a dotted path "
+                 f"(default BULK_EMAIL_BACKEND, then EMAIL_BACKEND)",
+        )
+        parser.add_argument(
+            '--file-path',
+            help='Directory the file backend writes messages to',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help=f'Recipients per batch (default BULK_EMAIL_BATCH_SIZE or {bulk_email.DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help=f'Messages per second, 0 for no limit (default BULK_EMAIL_RATE or {mailer.DEFAULT_RATE})',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Also continue campaigns left sending by an interrupted run',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new campaigns instead of exiting when the queue is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Seconds between polls with --loop',
+        )
+
+    def handle(self, *args, **options):
+        send_options = {
+            'backend': options['backend'],
+            'batch_size': options['batch_size'],
+            'rate': options['rate'],
+        }
+        if options['file_path']:
+            send_options['file_path'] = options['file_path']
+
+        resume = options['resume']
+        while True:
+            sent = bulk_email.run_pending(resume=resume, **send_options)
+            resume = False  # anything still sending after the first pass belongs to another worker
+            if sent or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Successfully sent {sent} bulk emails'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
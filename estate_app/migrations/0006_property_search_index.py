@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from estate_app.search import BACKENDS
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend().install(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from estate_app.search import BACKENDS
+    backend = BACKENDS.get(schema_editor.connection.vendor)
+    if backend is not None:
+        backend().uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0005_propertyinquiry_follow_ups_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
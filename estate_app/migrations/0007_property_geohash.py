@@ -0,0 +1,41 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:34
+
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    from estate_app.geo import encode_geohash
+    Property = apps.get_model('estate_app', 'Property')
+    properties = Property.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only('id', 'latitude', 'longitude')
+    batch = []
+    for prop in properties.iterator(chunk_size=1000):
+        prop.geohash = encode_geohash(prop.latitude, prop.longitude)
+        batch.append(prop)
+        if len(batch) >= 1000:
+            Property.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        Property.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0006_property_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, verbose_name='geohash'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='DA7C94ED', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:36
+
+from django.db import migrations, models
+
+
+# Property.AMENITY_BITS as of this migration; later changes to the model's
+# amenity choices must not change what it writes
+AMENITY_BITS = {
+    amenity: 1 << bit
+    for bit, amenity in enumerate((
+        'parking', 'security', 'lift', 'power_backup', 'swimming_pool', 'gym',
+        'clubhouse', 'garden', 'water_supply', 'play_area', 'internet', 'ac',
+        'cctv', 'fire_safety', 'waste_disposal', 'maintenance_staff',
+    ))
+}
+
+
+def amenity_mask_for(amenity_ids):
+    mask = 0
+    for amenity in amenity_ids:
+        mask |= AMENITY_BITS.get(amenity, 0)
+    return mask
+
+
+def backfill_amenity_mask(apps, schema_editor):
+    Property = apps.get_model('estate_app', 'Property')
+    batch = []
+    for prop in Property.objects.only('id', 'amenities').iterator(chunk_size=1000):
+        selected = prop.amenities.get('selected', []) if isinstance(prop.amenities, dict) else []
+        prop.amenity_mask = amenity_mask_for(selected)
+        if prop.amenity_mask:
+            batch.append(prop)
+        if len(batch) >= 1000:
+            Property.objects.bulk_update(batch, ['amenity_mask'])
+            batch = []
+    if batch:
+        Property.objects.bulk_update(batch, ['amenity_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0007_property_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='bitmask of amenities, derived from amenities', verbose_name='amenity mask'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='95B30BD4', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.RunPython(backfill_amenity_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_index(apps, schema_editor):
+    from estate_app.listing_index import possession_code
+    Property = apps.get_model('estate_app', 'Property')
+    ActiveListingIndex = apps.get_model('estate_app', 'ActiveListingIndex')
+    batch = []
+    active = Property.objects.filter(status='active').select_related('property_type', 'category')
+    for prop in active.iterator(chunk_size=1000):
+        batch.append(ActiveListingIndex(
+            listing_id=prop.pk,
+            city=prop.city,
+            locality=prop.locality,
+            geohash=prop.geohash,
+            property_for=prop.property_for,
+            property_type_id=prop.property_type_id,
+            type_slug=prop.property_type.slug if prop.property_type_id else '',
+            category_slug=prop.category.slug if prop.category_id else '',
+            furnishing=prop.furnishing,
+            possession=possession_code(prop.possession_status),
+            amenity_mask=prop.amenity_mask,
+            price=prop.price,
+            price_per_sqft=prop.price_per_sqft,
+            carpet_area=prop.carpet_area,
+            bedrooms=prop.bedrooms,
+            bathrooms=prop.bathrooms,
+            is_featured=prop.is_featured,
+            is_urgent=prop.is_urgent,
+            is_premium=prop.is_premium,
+            is_verified=prop.is_verified,
+            created_at=prop.created_at,
+        ))
+        if len(batch) >= 1000:
+            ActiveListingIndex.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ActiveListingIndex.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0008_property_amenity_mask'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='590C779D', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.CreateModel(
+            name='ActiveListingIndex',
+            fields=[
+                ('listing', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='estate_app.property')),
+                ('city', models.CharField(max_length=100, verbose_name='city')),
+                ('locality', models.CharField(blank=True, max_length=200, verbose_name='locality/area')),
+                ('geohash', models.CharField(blank=True, max_length=12, verbose_name='geohash')),
+                ('property_for', models.CharField(max_length=20, verbose_name='property for')),
+                ('property_type_id', models.IntegerField(blank=True, null=True, verbose_name='property type id')),
+                ('type_slug', models.CharField(blank=True, max_length=50, verbose_name='type slug')),
+                ('category_slug', models.CharField(blank=True, max_length=50, verbose_name='category slug')),
+                ('furnishing', models.CharField(blank=True, max_length=20, verbose_name='furnishing')),
+                ('possession', models.CharField(blank=True, choices=[('ready', 'Ready to Move'), ('under_construction', 'Under Construction')], max_length=20, verbose_name='possession')),
+                ('amenity_mask', models.PositiveIntegerField(default=0, verbose_name='amenity mask')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='price')),
+                ('price_per_sqft', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='price per sqft')),
+                ('carpet_area', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='carpet area')),
+                ('bedrooms', models.IntegerField(blank=True, null=True, verbose_name='bedrooms')),
+                ('bathrooms', models.IntegerField(blank=True, null=True, verbose_name='bathrooms')),
+                ('is_featured', models.BooleanField(default=False, verbose_name='featured listing')),
+                ('is_urgent', models.BooleanField(default=False, verbose_name='urgent')),
+                ('is_premium', models.BooleanField(default=False, verbose_name='premium')),
+                ('is_verified', models.BooleanField(default=False, verbose_name='verified')),
+                ('created_at', models.DateTimeField(verbose_name='created at')),
+            ],
+            options={
+                'verbose_name': 'active listing index',
+                'verbose_name_plural': 'active listing index',
+                'db_table': 'core_active_listing_index',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['is_featured', 'created_at'], name='core_active_is_feat_3b659e_idx'), models.Index(fields=['property_for', 'price'], name='core_active_propert_4f114c_idx'), models.Index(fields=['city'], name='core_active_city_db2a8b_idx'), models.Index(fields=['price'], name='core_active_price_630d51_idx'), models.Index(fields=['created_at'], name='core_active_created_6c8fb9_idx'), models.Index(fields=['bedrooms'], name='core_active_bedroom_8c058e_idx'), models.Index(fields=['geohash'], name='core_active_geohash_c2f16d_idx')],
+            },
+        ),
+        migrations.RunPython(populate_index, migrations.RunPython.noop),
+    ]
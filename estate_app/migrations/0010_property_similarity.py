@@ -0,0 +1,61 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0009_active_listing_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertySimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='rank')),
+                ('distance', models.FloatField(verbose_name='distance')),
+                ('computed_at', models.DateTimeField(verbose_name='computed at')),
+            ],
+            options={
+                'verbose_name': 'property similarity',
+                'verbose_name_plural': 'property similarities',
+                'db_table': 'core_property_similarity',
+                'ordering': ['property', 'rank'],
+            },
+        ),
+        migrations.AddField(
+            model_name='activelistingindex',
+            name='indexed_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='indexed at'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='971F5E7E', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.AddIndex(
+            model_name='activelistingindex',
+            index=models.Index(fields=['indexed_at'], name='core_active_indexed_a598a9_idx'),
+        ),
+        migrations.AddField(
+            model_name='propertysimilarity',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='estate_app.property'),
+        ),
+        migrations.AddField(
+            model_name='propertysimilarity',
+            name='similar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbor_of', to='estate_app.property'),
+        ),
+        migrations.AddIndex(
+            model_name='propertysimilarity',
+            index=models.Index(fields=['computed_at'], name='core_proper_compute_46f777_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='propertysimilarity',
+            constraint=models.UniqueConstraint(fields=('property', 'rank'), name='unique_similarity_rank'),
+        ),
+    ]
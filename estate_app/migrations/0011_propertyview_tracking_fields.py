@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0010_property_similarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyview',
+            name='device_type',
+            field=models.CharField(choices=[('desktop', 'Desktop'), ('mobile', 'Mobile'), ('tablet', 'Tablet'), ('bot', 'Bot')], default='desktop', max_length=10, verbose_name='device type'),
+        ),
+        migrations.AddField(
+            model_name='propertyview',
+            name='referrer',
+            field=models.TextField(blank=True, verbose_name='referrer'),
+        ),
+        migrations.AddField(
+            model_name='propertyview',
+            name='session_key',
+            field=models.CharField(blank=True, max_length=40, null=True, verbose_name='session key'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='30F2AD58', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.AlterField(
+            model_name='propertyview',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
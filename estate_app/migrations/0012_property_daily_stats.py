@@ -0,0 +1,54 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0011_propertyview_tracking_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='8DBA89A6', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.CreateModel(
+            name='PropertyDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('unique_visitors', models.PositiveIntegerField(default=0, verbose_name='unique visitors')),
+                ('views_desktop', models.PositiveIntegerField(default=0, verbose_name='desktop views')),
+                ('views_mobile', models.PositiveIntegerField(default=0, verbose_name='mobile views')),
+                ('views_tablet', models.PositiveIntegerField(default=0, verbose_name='tablet views')),
+                ('views_bot', models.PositiveIntegerField(default=0, verbose_name='bot views')),
+                ('inquiries', models.PositiveIntegerField(default=0, verbose_name='inquiries')),
+                ('inquiries_new', models.PositiveIntegerField(default=0, verbose_name='new inquiries')),
+                ('inquiries_contacted', models.PositiveIntegerField(default=0, verbose_name='contacted inquiries')),
+                ('inquiries_interested', models.PositiveIntegerField(default=0, verbose_name='interested inquiries')),
+                ('inquiries_not_interested', models.PositiveIntegerField(default=0, verbose_name='not interested inquiries')),
+                ('inquiries_converted', models.PositiveIntegerField(default=0, verbose_name='converted inquiries')),
+                ('inquiries_spam', models.PositiveIntegerField(default=0, verbose_name='spam inquiries')),
+                ('source_website', models.PositiveIntegerField(default=0, verbose_name='website inquiries')),
+                ('source_phone', models.PositiveIntegerField(default=0, verbose_name='phone inquiries')),
+                ('source_whatsapp', models.PositiveIntegerField(default=0, verbose_name='WhatsApp inquiries')),
+                ('source_email', models.PositiveIntegerField(default=0, verbose_name='email inquiries')),
+                ('source_walkin', models.PositiveIntegerField(default=0, verbose_name='walk-in inquiries')),
+                ('computed_at', models.DateTimeField(verbose_name='computed at')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='estate_app.property')),
+            ],
+            options={
+                'verbose_name': 'property daily stats',
+                'verbose_name_plural': 'property daily stats',
+                'db_table': 'core_property_daily_stats',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='core_proper_date_3858b3_idx'), models.Index(fields=['computed_at'], name='core_proper_compute_e15689_idx')],
+                'constraints': [models.UniqueConstraint(fields=('property', 'date'), name='unique_property_daily_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0012_property_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seller_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('properties_total', models.IntegerField(default=0, verbose_name='properties')),
+                ('properties_draft', models.IntegerField(default=0, verbose_name='draft properties')),
+                ('properties_pending', models.IntegerField(default=0, verbose_name='pending properties')),
+                ('properties_active', models.IntegerField(default=0, verbose_name='active properties')),
+                ('properties_inactive', models.IntegerField(default=0, verbose_name='inactive properties')),
+                ('properties_sold', models.IntegerField(default=0, verbose_name='sold properties')),
+                ('properties_rejected', models.IntegerField(default=0, verbose_name='rejected properties')),
+                ('inquiries_total', models.IntegerField(default=0, verbose_name='inquiries')),
+                ('new_leads', models.IntegerField(default=0, verbose_name='new leads')),
+                ('total_views', models.BigIntegerField(default=0, verbose_name='total views')),
+                ('reconciled_at', models.DateTimeField(verbose_name='reconciled at')),
+            ],
+            options={
+                'verbose_name': 'seller stats',
+                'verbose_name_plural': 'seller stats',
+                'db_table': 'core_seller_stats',
+            },
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='5EC55569', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-16 19:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0013_seller_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='18146157', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export', models.CharField(max_length=50, verbose_name='export')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')], default='csv', max_length=10, verbose_name='format')),
+                ('compress', models.BooleanField(default=False, verbose_name='gzip compressed')),
+                ('query', models.BinaryField(help_text='Pickled queryset query selecting the rows', verbose_name='query')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('expired', 'Expired')], default='pending', max_length=20, verbose_name='status')),
+                ('rows_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='rows total')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='rows processed')),
+                ('bytes_written', models.PositiveBigIntegerField(default=0, verbose_name='bytes written')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('file', models.FileField(blank=True, upload_to='exports/', verbose_name='file')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='expires at')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'export job',
+                'verbose_name_plural': 'export jobs',
+                'db_table': 'core_export_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_export_status_f74fed_idx'), models.Index(fields=['expires_at'], name='core_export_expires_c54e68_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0014_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='0A3E2265', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.CreateModel(
+            name='BulkEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='subject')),
+                ('html_message', models.TextField(verbose_name='message (HTML)')),
+                ('audience', models.CharField(choices=[('all', 'All Users'), ('buyer', 'Buyer/Tenant'), ('seller', 'Seller/Owner'), ('agent', 'Agent/Broker'), ('builder', 'Builder/Developer'), ('admin', 'Administrator')], default='all', max_length=20, verbose_name='audience')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='status')),
+                ('recipients_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='recipients')),
+                ('sent_count', models.PositiveIntegerField(default=0, verbose_name='sent')),
+                ('failed_count', models.PositiveIntegerField(default=0, verbose_name='failed')),
+                ('last_user_id', models.PositiveBigIntegerField(default=0, help_text='Resume point: recipients are sent in id order', verbose_name='last recipient id')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_emails', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'bulk email',
+                'verbose_name_plural': 'bulk emails',
+                'db_table': 'core_bulk_email',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmailDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='email')),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('failed', 'Failed')], max_length=10, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=1, verbose_name='attempts')),
+                ('error', models.TextField(blank=True, verbose_name='error')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='logged at')),
+                ('bulk_email', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='estate_app.bulkemail')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='email_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'email delivery',
+                'verbose_name_plural': 'email deliveries',
+                'db_table': 'core_email_delivery',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bulkemail',
+            index=models.Index(fields=['status', 'created_at'], name='core_bulk_e_status_674839_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emaildelivery',
+            index=models.Index(fields=['bulk_email', 'status'], name='core_email__bulk_em_7c2de0_idx'),
+        ),
+    ]
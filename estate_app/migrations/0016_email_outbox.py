@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0015_bulk_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='CEA63698', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(blank=True, max_length=30, verbose_name='category')),
+                ('subject', models.CharField(max_length=255, verbose_name='subject')),
+                ('body', models.TextField(blank=True, verbose_name='text body')),
+                ('html_body', models.TextField(blank=True, verbose_name='HTML body')),
+                ('from_email', models.CharField(max_length=255, verbose_name='from')),
+                ('to', models.JSONField(default=list, verbose_name='to')),
+                ('reply_to', models.JSONField(blank=True, default=list, verbose_name='reply to')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=20, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='next attempt at')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='claimed at')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='sent at')),
+            ],
+            options={
+                'verbose_name': 'outbox email',
+                'verbose_name_plural': 'email outbox',
+                'db_table': 'core_email_outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_email__status_966f16_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0016_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='primary_image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='renditions manifest of the primary image', verbose_name='primary image renditions'),
+        ),
+        migrations.AddField(
+            model_name='propertyimage',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='resized WebP/JPEG copies, see renditions.py', verbose_name='renditions'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='5CBEC3AB', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:16
+
+from django.db import migrations, models
+
+
+def fail_queued_jobs(apps, schema_editor):
+    # Their rows were only recorded in the dropped query column
+    ExportJob = apps.get_model('estate_app', 'ExportJob')
+    ExportJob.objects.filter(status='pending').update(
+        status='failed', error='Queued before exports stored row ids; queue it again'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('estate_app', '0017_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_queued_jobs, migrations.RunPython.noop),
+        # A default lets the column come back on existing rows when unapplied
+        migrations.AlterField(
+            model_name='exportjob',
+            name='query',
+            field=models.BinaryField(default=b'', help_text='Pickled queryset query selecting the rows', verbose_name='query'),
+        ),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='object_ids',
+            field=models.JSONField(default=list, help_text='Primary keys of the rows to export', verbose_name='object ids'),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='property_id',
+            field=models.CharField(default='98FDD429', max_length=20, unique=True, verbose_name='property ID'),
+        ),
+    ]
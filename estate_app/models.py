@@ -8,7 +8,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.conf import settings
-from django.db.models import Q, Sum, Count, Avg
+from django.db.models import F, Q, Sum, Count, Avg
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from datetime import datetime, timedelta
@@ -21,6 +21,9 @@ from builtins import property as py_property
 from django.core.validators import RegexValidator
 import uuid
 
+from .geo import encode_geohash
+from .renditions import build as build_renditions
+
 
 
 phone_regex = RegexValidator(
@@ -768,6 +771,28 @@ class Property(models.Model):
         ('unfurnished', 'Unfurnished'),
     )
     
+    # Amenity vocabulary. Order matters: each amenity's position is its bit in
+    # amenity_mask, so only ever append new entries.
+    AMENITY_CHOICES = (
+        ('parking', 'Parking'),
+        ('security', '24/7 Security'),
+        ('lift', 'Lift/Elevator'),
+        ('power_backup', 'Power Backup'),
+        ('swimming_pool', 'Swimming Pool'),
+        ('gym', 'Gym/Fitness Center'),
+        ('clubhouse', 'Club House'),
+        ('garden', 'Garden/Park'),
+        ('water_supply', '24/7 Water Supply'),
+        ('play_area', 'Children Play Area'),
+        ('internet', 'Internet/WiFi'),
+        ('ac', 'Air Conditioning'),
+        ('cctv', 'CCTV Security'),
+        ('fire_safety', 'Fire Safety'),
+        ('waste_disposal', 'Waste Disposal'),
+        ('maintenance_staff', 'Maintenance Staff'),
+    )
+    AMENITY_BITS = {amenity: 1 << bit for bit, (amenity, _name) in enumerate(AMENITY_CHOICES)}
+    
     LISTING_TYPE_CHOICES = (
         ('basic', 'Basic Listing'),
         ('featured', 'Featured Listing'),
@@ -814,6 +839,7 @@ class Property(models.Model):
     latitude = models.DecimalField(_('latitude'), max_digits=10, decimal_places=8, null=True, blank=True)
     longitude = models.DecimalField(_('longitude'), max_digits=11, decimal_places=8, null=True, blank=True)
     google_map_url = models.URLField(_('google map URL'), blank=True)
+    geohash = models.CharField(_('geohash'), max_length=12, blank=True, db_index=True, editable=False)
     
     # Pricing
     price = models.DecimalField(_('price'), max_digits=15, decimal_places=2)
@@ -865,9 +891,14 @@ class Property(models.Model):
     
     # Amenities (Store as JSON)
     amenities = models.JSONField(_('amenities'), default=dict, blank=True)
+    amenity_mask = models.PositiveIntegerField(_('amenity mask'), default=0, db_index=True, editable=False,
+                                               help_text=_('bitmask of amenities, derived from amenities'))
     
     # Images
     primary_image = models.ImageField(_('primary image'), upload_to='properties/primary/')
+    primary_image_renditions = models.JSONField(_('primary image renditions'), default=dict, blank=True,
+                                                editable=False,
+                                                help_text=_('renditions manifest of the primary image'))
     
     # Contact Information
     contact_person = models.CharField(_('contact person'), max_length=100)
@@ -938,7 +969,43 @@ class Property(models.Model):
         if self.status == 'active' and not self.published_at:
             self.published_at = timezone.now()
         
+        # Keep derived search columns in step with their source fields
+        self.geohash = self.compute_geohash()
+        self.amenity_mask = self.compute_amenity_mask()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'latitude', 'longitude'} & update_fields:
+                update_fields.add('geohash')
+            if 'amenities' in update_fields:
+                update_fields.add('amenity_mask')
+            kwargs['update_fields'] = update_fields
+        
+        # Views copy the manifest of an existing PropertyImage; direct uploads
+        # (e.g. from the admin) are resized here
+        new_upload = bool(self.primary_image) and not self.primary_image._committed
         super().save(*args, **kwargs)
+        
+        if new_upload:
+            self.primary_image_renditions = build_renditions(self.primary_image)
+            Property.objects.filter(pk=self.pk).update(primary_image_renditions=self.primary_image_renditions)
+    
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ''
+        return encode_geohash(self.latitude, self.longitude)
+    
+    @classmethod
+    def amenity_mask_for(cls, amenity_ids):
+        """Bitmask for a list of amenity ids (unknown ids are ignored)"""
+        mask = 0
+        for amenity in amenity_ids or ():
+            mask |= cls.AMENITY_BITS.get(amenity, 0)
+        return mask
+    
+    def compute_amenity_mask(self):
+        selected = self.amenities.get('selected', []) if isinstance(self.amenities, dict) else []
+        return self.amenity_mask_for(selected)
     
     @property
     def is_active(self):
@@ -968,11 +1035,17 @@ class Property(models.Model):
         return reverse('property_detail', kwargs={'slug': self.slug})
     
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        Property.objects.filter(pk=self.pk).update(view_count=F('view_count') + 1)
     
     def get_similar_properties(self, limit=4):
-        """Get similar properties in same area/price range"""
+        """Get similar properties from the precomputed neighbor list"""
+        similar = list(
+            Property.objects.filter(neighbor_of__property=self, status='active')
+            .order_by('neighbor_of__rank')[:limit]
+        )
+        if similar:
+            return similar
+        # Not computed yet (new listing, or before the first batch run)
         return Property.objects.filter(
             Q(city=self.city) | Q(property_type=self.property_type),
             status='active',
@@ -980,6 +1053,101 @@ class Property(models.Model):
         ).exclude(id=self.id).order_by('-created_at')[:limit]
 
 
+class ActiveListingIndex(models.Model):
+    """
+    Narrow, denormalized copy of the searchable columns of active listings.
+    
+    Maintained by the Property save/delete signals (see listing_index.py) and
+    rebuilt with ``manage.py rebuild_listing_index``. Search endpoints filter
+    and sort here, then fetch only the page of Property rows they display.
+    """
+    POSSESSION_CHOICES = (
+        ('ready', 'Ready to Move'),
+        ('under_construction', 'Under Construction'),
+    )
+    
+    listing = models.OneToOneField(Property, on_delete=models.CASCADE, primary_key=True, related_name='search_index')
+    
+    # Location
+    city = models.CharField(_('city'), max_length=100)
+    locality = models.CharField(_('locality/area'), max_length=200, blank=True)
+    geohash = models.CharField(_('geohash'), max_length=12, blank=True)
+    
+    # Classification
+    property_for = models.CharField(_('property for'), max_length=20)
+    property_type_id = models.IntegerField(_('property type id'), null=True, blank=True)
+    type_slug = models.CharField(_('type slug'), max_length=50, blank=True)
+    category_slug = models.CharField(_('category slug'), max_length=50, blank=True)
+    furnishing = models.CharField(_('furnishing'), max_length=20, blank=True)
+    possession = models.CharField(_('possession'), max_length=20, choices=POSSESSION_CHOICES, blank=True)
+    amenity_mask = models.PositiveIntegerField(_('amenity mask'), default=0)
+    
+    # Numbers
+    price = models.DecimalField(_('price'), max_digits=15, decimal_places=2)
+    price_per_sqft = models.DecimalField(_('price per sqft'), max_digits=10, decimal_places=2, null=True, blank=True)
+    carpet_area = models.DecimalField(_('carpet area'), max_digits=10, decimal_places=2)
+    bedrooms = models.IntegerField(_('bedrooms'), null=True, blank=True)
+    bathrooms = models.IntegerField(_('bathrooms'), null=True, blank=True)
+    
+    # Flags
+    is_featured = models.BooleanField(_('featured listing'), default=False)
+    is_urgent = models.BooleanField(_('urgent'), default=False)
+    is_premium = models.BooleanField(_('premium'), default=False)
+    is_verified = models.BooleanField(_('verified'), default=False)
+    
+    created_at = models.DateTimeField(_('created at'))
+    indexed_at = models.DateTimeField(_('indexed at'), auto_now=True)
+    
+    class Meta:
+        db_table = 'core_active_listing_index'
+        verbose_name = _('active listing index')
+        verbose_name_plural = _('active listing index')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_featured', 'created_at']),
+            models.Index(fields=['property_for', 'price']),
+            models.Index(fields=['city']),
+            models.Index(fields=['price']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['bedrooms']),
+            models.Index(fields=['geohash']),
+            models.Index(fields=['indexed_at']),
+        ]
+    
+    def __str__(self):
+        return f"Index entry for property {self.listing_id}"
+
+
+class PropertySimilarity(models.Model):
+    """
+    Precomputed nearest neighbors of an active listing.
+    
+    Each listing keeps its top-N most similar active listings (same
+    rent/sale segment), ranked from 0. Built by
+    ``manage.py build_similar_properties`` (see similarity.py).
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='similarities')
+    similar = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='neighbor_of')
+    rank = models.PositiveSmallIntegerField(_('rank'))
+    distance = models.FloatField(_('distance'))
+    computed_at = models.DateTimeField(_('computed at'))
+    
+    class Meta:
+        db_table = 'core_property_similarity'
+        verbose_name = _('property similarity')
+        verbose_name_plural = _('property similarities')
+        ordering = ['property', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'rank'], name='unique_similarity_rank'),
+        ]
+        indexes = [
+            models.Index(fields=['computed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.property_id} ~ {self.similar_id} (#{self.rank})"
+
+
 class PropertyImage(models.Model):
     """Property images gallery"""
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
@@ -987,6 +1155,8 @@ class PropertyImage(models.Model):
     caption = models.CharField(_('caption'), max_length=200, blank=True)
     is_primary = models.BooleanField(_('primary image'), default=False)
     display_order = models.IntegerField(_('display order'), default=0)
+    renditions = models.JSONField(_('renditions'), default=dict, blank=True, editable=False,
+                                  help_text=_('resized WebP/JPEG copies, see renditions.py'))
     
     class Meta:
         db_table = 'core_propertyimage'
@@ -1001,7 +1171,13 @@ class PropertyImage(models.Model):
         # If this is set as primary, unset primary for other images
         if self.is_primary:
             PropertyImage.objects.filter(property=self.property, is_primary=True).update(is_primary=False)
+        new_upload = bool(self.image) and not self.image._committed
         super().save(*args, **kwargs)
+        
+        # Resize new uploads once, at upload time
+        if new_upload:
+            self.renditions = build_renditions(self.image)
+            PropertyImage.objects.filter(pk=self.pk).update(renditions=self.renditions)
 
 
 class PropertyInquiry(models.Model):
@@ -1096,11 +1272,22 @@ class PropertyInquiry(models.Model):
 
 class PropertyView(models.Model):
     """Track property views"""
+    DEVICE_CHOICES = (
+        ('desktop', 'Desktop'),
+        ('mobile', 'Mobile'),
+        ('tablet', 'Tablet'),
+        ('bot', 'Bot'),
+    )
+    
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='views')
     user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    session_key = models.CharField(_('session key'), max_length=40, null=True, blank=True)
     ip_address = models.GenericIPAddressField(_('IP address'))
     user_agent = models.TextField(_('user agent'), blank=True)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    referrer = models.TextField(_('referrer'), blank=True)
+    device_type = models.CharField(_('device type'), max_length=10, choices=DEVICE_CHOICES, default='desktop')
+    # Set when the view happened; rows are written later in batches
+    viewed_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'core_propertyview'
@@ -1112,6 +1299,278 @@ class PropertyView(models.Model):
     
     def __str__(self):
         return f"View of {self.property.title} at {self.viewed_at}"    
+
+
+class PropertyDailyStats(models.Model):
+    """
+    Per-property, per-day rollup of PropertyView and PropertyInquiry rows.
+    
+    Maintained by ``manage.py rollup_daily_stats`` (see analytics.py); seller
+    charts and counters read from here instead of the raw tables. Inquiry
+    columns count the inquiries *created* that day, by their current status.
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField(_('date'))
+    
+    # Views
+    views = models.PositiveIntegerField(_('views'), default=0)
+    unique_visitors = models.PositiveIntegerField(_('unique visitors'), default=0)
+    views_desktop = models.PositiveIntegerField(_('desktop views'), default=0)
+    views_mobile = models.PositiveIntegerField(_('mobile views'), default=0)
+    views_tablet = models.PositiveIntegerField(_('tablet views'), default=0)
+    views_bot = models.PositiveIntegerField(_('bot views'), default=0)
+    
+    # Inquiries by status
+    inquiries = models.PositiveIntegerField(_('inquiries'), default=0)
+    inquiries_new = models.PositiveIntegerField(_('new inquiries'), default=0)
+    inquiries_contacted = models.PositiveIntegerField(_('contacted inquiries'), default=0)
+    inquiries_interested = models.PositiveIntegerField(_('interested inquiries'), default=0)
+    inquiries_not_interested = models.PositiveIntegerField(_('not interested inquiries'), default=0)
+    inquiries_converted = models.PositiveIntegerField(_('converted inquiries'), default=0)
+    inquiries_spam = models.PositiveIntegerField(_('spam inquiries'), default=0)
+    
+    # Inquiries by source
+    source_website = models.PositiveIntegerField(_('website inquiries'), default=0)
+    source_phone = models.PositiveIntegerField(_('phone inquiries'), default=0)
+    source_whatsapp = models.PositiveIntegerField(_('WhatsApp inquiries'), default=0)
+    source_email = models.PositiveIntegerField(_('email inquiries'), default=0)
+    source_walkin = models.PositiveIntegerField(_('walk-in inquiries'), default=0)
+    
+    computed_at = models.DateTimeField(_('computed at'))
+    
+    class Meta:
+        db_table = 'core_property_daily_stats'
+        verbose_name = _('property daily stats')
+        verbose_name_plural = _('property daily stats')
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['property', 'date'], name='unique_property_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['computed_at']),
+        ]
+    
+    def __str__(self):
+        return f"Stats for property {self.property_id} on {self.date}"
+    
+
+class SellerStats(models.Model):
+    """
+    Per-owner snapshot of listing and lead counters.
+    
+    Read once per page by the context processor and the seller dashboards.
+    Kept current with atomic F() updates from Property/PropertyInquiry signals
+    and the view flusher (see seller_stats.py); ``manage.py
+    reconcile_seller_stats`` recomputes it from the source tables.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True,
+                                related_name='seller_stats')
+    
+    # Properties by status
+    properties_total = models.IntegerField(_('properties'), default=0)
+    properties_draft = models.IntegerField(_('draft properties'), default=0)
+    properties_pending = models.IntegerField(_('pending properties'), default=0)
+    properties_active = models.IntegerField(_('active properties'), default=0)
+    properties_inactive = models.IntegerField(_('inactive properties'), default=0)
+    properties_sold = models.IntegerField(_('sold properties'), default=0)
+    properties_rejected = models.IntegerField(_('rejected properties'), default=0)
+    
+    # Leads and views
+    inquiries_total = models.IntegerField(_('inquiries'), default=0)
+    new_leads = models.IntegerField(_('new leads'), default=0)
+    total_views = models.BigIntegerField(_('total views'), default=0)
+    
+    reconciled_at = models.DateTimeField(_('reconciled at'))
+    
+    class Meta:
+        db_table = 'core_seller_stats'
+        verbose_name = _('seller stats')
+        verbose_name_plural = _('seller stats')
+    
+    def __str__(self):
+        return f"Stats for {self.user_id}"
+    
+
+class ExportJob(models.Model):
+    """
+    An export run off-request by ``manage.py run_export_jobs`` (see export_jobs.py).
+    
+    The artifact is written under MEDIA_ROOT/exports/ and deleted once the
+    job expires; rows/bytes are updated while it runs so the admin can poll
+    progress.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    )
+    FORMAT_CHOICES = (
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    )
+    
+    export = models.CharField(_('export'), max_length=50)
+    format = models.CharField(_('format'), max_length=10, choices=FORMAT_CHOICES, default='csv')
+    compress = models.BooleanField(_('gzip compressed'), default=False)
+    object_ids = models.JSONField(_('object ids'), default=list, help_text=_('Primary keys of the rows to export'))
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='export_jobs')
+    
+    # Progress
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows_total = models.PositiveIntegerField(_('rows total'), null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(_('rows processed'), default=0)
+    bytes_written = models.PositiveBigIntegerField(_('bytes written'), default=0)
+    error = models.TextField(_('error'), blank=True)
+    
+    # Artifact
+    file = models.FileField(_('file'), upload_to='exports/', blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('finished at'), null=True, blank=True)
+    expires_at = models.DateTimeField(_('expires at'), null=True, blank=True)
+    
+    class Meta:
+        db_table = 'core_export_job'
+        verbose_name = _('export job')
+        verbose_name_plural = _('export jobs')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.export} export #{self.pk} ({self.status})"
+    
+    @property
+    def progress(self):
+        """Percentage of rows processed, if the total is known"""
+        if not self.rows_total:
+            return 100 if self.status == 'done' else 0
+        return min(100, round(self.rows_processed * 100 / self.rows_total))
+    
+
+class BulkEmail(models.Model):
+    """
+    An admin email campaign, sent off-request by ``manage.py send_bulk_emails``
+    (see bulk_email.py). Each recipient gets an EmailDelivery row.
+    """
+    AUDIENCE_CHOICES = (('all', 'All Users'),) + CustomUser.USER_TYPE_CHOICES
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    subject = models.CharField(_('subject'), max_length=255)
+    html_message = models.TextField(_('message (HTML)'))
+    audience = models.CharField(_('audience'), max_length=20, choices=AUDIENCE_CHOICES, default='all')
+    created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='bulk_emails')
+    
+    # Progress
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='pending')
+    recipients_total = models.PositiveIntegerField(_('recipients'), null=True, blank=True)
+    sent_count = models.PositiveIntegerField(_('sent'), default=0)
+    failed_count = models.PositiveIntegerField(_('failed'), default=0)
+    last_user_id = models.PositiveBigIntegerField(_('last recipient id'), default=0,
+                                                  help_text=_('Resume point: recipients are sent in id order'))
+    error = models.TextField(_('error'), blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    finished_at = models.DateTimeField(_('finished at'), null=True, blank=True)
+    
+    class Meta:
+        db_table = 'core_bulk_email'
+        verbose_name = _('bulk email')
+        verbose_name_plural = _('bulk emails')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_audience_display()})"
+    
+
+class EmailDelivery(models.Model):
+    """Delivery log: one row per recipient of a BulkEmail"""
+    STATUS_CHOICES = (
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    bulk_email = models.ForeignKey(BulkEmail, on_delete=models.CASCADE, related_name='deliveries')
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='email_deliveries')
+    email = models.EmailField(_('email'))
+    status = models.CharField(_('status'), max_length=10, choices=STATUS_CHOICES)
+    attempts = models.PositiveSmallIntegerField(_('attempts'), default=1)
+    error = models.TextField(_('error'), blank=True)
+    created_at = models.DateTimeField(_('logged at'), default=timezone.now)
+    
+    class Meta:
+        db_table = 'core_email_delivery'
+        verbose_name = _('email delivery')
+        verbose_name_plural = _('email deliveries')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['bulk_email', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.email}: {self.status}"
+    
+
+class EmailOutbox(models.Model):
+    """
+    A transactional email waiting to be sent. Views enqueue it in the same
+    transaction as their writes; ``manage.py process_outbox`` delivers it
+    (see outbox.py). Messages that keep failing end up ``dead``.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    )
+    
+    category = models.CharField(_('category'), max_length=30, blank=True)
+    subject = models.CharField(_('subject'), max_length=255)
+    body = models.TextField(_('text body'), blank=True)
+    html_body = models.TextField(_('HTML body'), blank=True)
+    from_email = models.CharField(_('from'), max_length=255)
+    to = models.JSONField(_('to'), default=list)
+    reply_to = models.JSONField(_('reply to'), default=list, blank=True)
+    
+    # Delivery
+    status = models.CharField(_('status'), max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(_('attempts'), default=0)
+    next_attempt_at = models.DateTimeField(_('next attempt at'), default=timezone.now)
+    claimed_at = models.DateTimeField(_('claimed at'), null=True, blank=True)
+    last_error = models.TextField(_('last error'), blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_('sent at'), null=True, blank=True)
+    
+    class Meta:
+        db_table = 'core_email_outbox'
+        verbose_name = _('outbox email')
+        verbose_name_plural = _('email outbox')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
     
 # models.py - Add these for buyer-specific features
 class BuyerProfile(models.Model):
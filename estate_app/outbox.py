@@ -0,0 +1,151 @@
+"""
+Transactional email outbox.
+
+Views call ``enqueue`` instead of sending: the EmailOutbox row is written in
+the caller's transaction, so a message exists exactly when the change it
+announces was committed, and the request never waits on SMTP.
+
+``manage.py process_outbox`` drains due messages (``process``):
+
+* one reused connection per pass, paced and retried inline by mailer.Sender
+* a message that still fails is rescheduled ``OUTBOX_RETRY_DELAY`` seconds
+  later, doubling per attempt, up to ``OUTBOX_MAX_ATTEMPTS``
+* refused recipients, and messages out of attempts, are dead-lettered
+  (status ``dead``) and can be requeued from the admin
+* messages left ``sending`` by a crashed worker go back to pending after
+  ``STALE_AFTER`` (delivery is at-least-once)
+
+``OUTBOX_BACKEND`` (default EMAIL_BACKEND) selects the backend.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from . import mailer
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 60            # seconds before the first retry
+INLINE_RETRIES = 1                  # reconnect-and-retry within a pass
+STALE_AFTER = timedelta(minutes=15)
+
+
+def enqueue(subject, to, body='', html_body='', from_email=None, reply_to=None, category=''):
+    """Queue an email in the current transaction; returns the EmailOutbox row"""
+    if isinstance(to, str):
+        to = [to]
+    return EmailOutbox.objects.create(
+        category=category,
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to or []),
+    )
+
+
+def build_message(entry):
+    message = EmailMultiAlternatives(
+        entry.subject, entry.body, entry.from_email, entry.to, reply_to=entry.reply_to or None
+    )
+    if entry.html_body:
+        if entry.body:
+            message.attach_alternative(entry.html_body, 'text/html')
+        else:
+            message.body = entry.html_body
+            message.content_subtype = 'html'
+    return message
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the ``attempts``-th failed attempt"""
+    return getattr(settings, 'OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY) * 2 ** (attempts - 1)
+
+
+def release_stale():
+    """Return messages claimed by a worker that died to the queue"""
+    return EmailOutbox.objects.filter(
+        status='sending', claimed_at__lt=timezone.now() - STALE_AFTER
+    ).update(status='pending', claimed_at=None)
+
+
+def _claim(batch_size):
+    """Claim up to ``batch_size`` due messages, oldest first"""
+    now = timezone.now()
+    due = (
+        EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    claimed = [
+        pk for pk in due
+        if EmailOutbox.objects.filter(pk=pk, status='pending').update(status='sending', claimed_at=now)
+    ]
+    return list(EmailOutbox.objects.filter(pk__in=claimed).order_by('next_attempt_at', 'pk'))
+
+
+def _record(entry, result, max_attempts, now):
+    attempts = entry.attempts + result.attempts
+    if not result.error:
+        return 'sent', {'status': 'sent', 'attempts': attempts, 'sent_at': now, 'last_error': '', 'claimed_at': None}
+    if result.permanent or attempts >= max_attempts:
+        logger.error(f"Outbox email {entry.pk} dead-lettered after {attempts} attempts: {result.error}")
+        return 'dead', {'status': 'dead', 'attempts': attempts, 'last_error': result.error, 'claimed_at': None}
+    return 'retried', {
+        'status': 'pending', 'attempts': attempts, 'last_error': result.error, 'claimed_at': None,
+        'next_attempt_at': now + timedelta(seconds=retry_delay(attempts)),
+    }
+
+
+def process(backend=None, batch_size=None, rate=None, **backend_options):
+    """
+    Send every due message over one connection; returns the pass's metrics,
+    {'sent': n, 'retried': n, 'dead': n, 'released': n}.
+    """
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    rate = rate if rate is not None else getattr(settings, 'OUTBOX_RATE', 0)
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    backend = backend or mailer.default_backend('OUTBOX_BACKEND')
+
+    metrics = {'sent': 0, 'retried': 0, 'dead': 0, 'released': release_stale()}
+    with mailer.Sender(backend, rate=rate, max_retries=INLINE_RETRIES, **backend_options) as sender:
+        while True:
+            entries = _claim(batch_size)
+            if not entries:
+                break
+            results = sender.send_batch([build_message(entry) for entry in entries])
+            now = timezone.now()
+            for entry, result in zip(entries, results):
+                outcome, changes = _record(entry, result, max_attempts, now)
+                EmailOutbox.objects.filter(pk=entry.pk).update(**changes)
+                metrics[outcome] += 1
+    if any(metrics.values()):
+        logger.info(f"Outbox pass: {metrics}")
+    return metrics
+
+
+def stats():
+    """Queue health: message count per status and age of the oldest due message"""
+    counts = dict.fromkeys(dict(EmailOutbox.STATUS_CHOICES), 0)
+    counts.update(
+        EmailOutbox.objects.values_list('status').annotate(count=Count('pk')).order_by()
+    )
+    oldest = EmailOutbox.objects.filter(status='pending').aggregate(oldest=Min('created_at'))['oldest']
+    counts['oldest_pending_seconds'] = int((timezone.now() - oldest).total_seconds()) if oldest else 0
+    return counts
+
+
+def requeue(entry_ids):
+    """Send dead-lettered messages again"""
+    return EmailOutbox.objects.filter(pk__in=entry_ids, status='dead').update(
+        status='pending', attempts=0, last_error='', next_attempt_at=timezone.now()
+    )
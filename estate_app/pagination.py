@@ -0,0 +1,213 @@
+"""
+Keyset (cursor) pagination.
+
+``Paginator`` runs ``COUNT(*)`` and ``OFFSET n`` on every page, which gets
+slower the deeper a user scrolls. ``KeysetPaginator`` instead remembers the
+sort key and id of the last row served in an opaque cursor and fetches the
+next page with a ``WHERE (sort_key, id) < (last_key, last_id)`` predicate, so
+every page costs the same index range scan and no count is needed.
+
+    paginator = KeysetPaginator(queryset, per_page=12)
+    page = paginator.page(request.GET.get('cursor'))
+    page.object_list, page.has_next, page.next_cursor
+
+The total is only computed if something asks for ``paginator.count`` and is
+cached under ``count_cache_key`` when one is given.
+
+Sort keys must be non-nullable model fields on the paginated model, or
+annotations with an ``output_field`` (e.g. a search relevance score).
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+COUNT_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor can't be decoded or doesn't match the ordering"""
+
+
+def _encode_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (int, str)) or value is None:
+        return value
+    return str(value)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by keyset instead of OFFSET"""
+
+    def __init__(self, queryset, per_page, ordering=None, count_cache_key=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+
+        # Always end on the primary key so the keyset is unique
+        pk_name = queryset.model._meta.pk.name
+        names = [field.lstrip('-') for field in ordering]
+        if 'id' not in names and 'pk' not in names and pk_name not in names:
+            descending = ordering[-1].startswith('-') if ordering else True
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+
+        self.ordering = ordering
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def keys(self):
+        """[(field, descending), ...] for the ordering"""
+        keys = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if name == 'pk':
+                name = self.queryset.model._meta.pk.name
+            keys.append((name, field.startswith('-')))
+        return keys
+
+    @cached_property
+    def count(self):
+        """Total rows (cached estimate); only queried when asked for"""
+        if self.count_cache_key is None:
+            return self.queryset.count()
+        return cache.get_or_set(self.count_cache_key, self.queryset.count, COUNT_CACHE_TIMEOUT)
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    def _signature(self):
+        return ','.join(self.ordering)
+
+    def encode_cursor(self, obj):
+        """Opaque cursor pointing just after ``obj``"""
+        if isinstance(obj, dict):
+            values = [obj[name] for name, _ in self.keys]
+        else:
+            values = [getattr(obj, name) for name, _ in self.keys]
+        payload = {'o': self._signature(), 'k': [_encode_value(v) for v in values]}
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Decode a cursor into typed key values"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            values = payload['k']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor('Malformed cursor')
+
+        if payload.get('o') != self._signature() or len(values) != len(self.keys):
+            raise InvalidCursor('Cursor does not match the current sort order')
+
+        opts = self.queryset.model._meta
+        annotations = self.queryset.query.annotations
+        typed = []
+        try:
+            for (name, _), value in zip(self.keys, values):
+                field = annotations[name].output_field if name in annotations else opts.get_field(name)
+                typed.append(field.to_python(value))
+        except (FieldDoesNotExist, ValidationError):
+            raise InvalidCursor('Malformed cursor')
+        return typed
+
+    def _after(self, values):
+        """Keyset predicate: rows strictly after ``values`` in sort order"""
+        predicate = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending else 'gt'
+            predicate |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return predicate
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    def page(self, cursor=None, query=None):
+        """
+        Return the page following ``cursor`` (first page if empty).
+
+        ``query`` is the request's QueryDict; when given, the page can build
+        the querystring for the next page (``page.next_querystring``).
+        """
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = self.encode_cursor(rows[-1]) if has_next else None
+        return CursorPage(rows, self, cursor or None, next_cursor, query)
+
+    def get_page(self, cursor=None, query=None):
+        """Like page(), but an invalid cursor falls back to the first page"""
+        try:
+            return self.page(cursor, query)
+        except InvalidCursor:
+            return self.page(None, query)
+
+
+class CursorPage:
+    """
+    One page of keyset results.
+
+    Mirrors the parts of Django's ``Page`` the templates use; numbered
+    navigation is not available, so ``has_other_pages`` is always False and
+    templates should link to ``next_cursor`` instead.
+    """
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, paginator, cursor, next_cursor, query=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.query = query
+
+    def __repr__(self):
+        return f'<CursorPage cursor={self.cursor!r} size={len(self.object_list)}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return False
+
+    def has_other_pages(self):
+        return False
+
+    @property
+    def next_querystring(self):
+        """Current querystring with the cursor advanced to the next page"""
+        if self.next_cursor is None:
+            return ''
+        query = self.query.copy() if self.query is not None else QueryDict(mutable=True)
+        query.pop('page', None)
+        query['cursor'] = self.next_cursor
+        return query.urlencode()
+
+
+def wants_cursor(request):
+    """Cursor mode is opt-in: any request carrying a ``cursor`` parameter"""
+    return 'cursor' in request.GET
@@ -0,0 +1,276 @@
+"""
+Vectorized property recommendations for buyers.
+
+Active listings are loaded once per process into NumPy feature arrays (from
+the narrow ActiveListingIndex table). A buyer is scored against every
+candidate in a single vectorized pass combining:
+
+* preference fit: budget, carpet area, bedrooms/bathrooms, location,
+  furnishing, possession, property type and amenities (BuyerProfile)
+* history affinity: closeness to the listings the buyer favorited or
+  inquired about (price, area, rooms, city, type)
+* a small freshness / featured prior, so cold-start buyers still get
+  sensible results
+
+The matrix is rebuilt when listings change (tracked through the listing
+result-cache generation) at most every ``MATRIX_TTL`` seconds, and each
+buyer's top-k ids are cached for ``USER_CACHE_TIMEOUT`` seconds.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from django.core.cache import cache
+
+from .autocomplete import normalize
+from .models import ActiveListingIndex, Property, PropertyFavorite, PropertyInquiry
+
+logger = logging.getLogger(__name__)
+
+MATRIX_TTL = 60                 # seconds between matrix rebuilds
+USER_CACHE_TIMEOUT = 60 * 15    # 15 minutes
+DEFAULT_LIMIT = 12
+
+# Relative weights of the score components
+WEIGHTS = {
+    'budget': 3.0,
+    'area': 1.5,
+    'rooms': 1.5,
+    'location': 3.0,
+    'furnishing': 0.5,
+    'possession': 0.5,
+    'property_type': 1.0,
+    'amenities': 1.0,
+    'history': 2.5,
+    'prior': 0.5,
+}
+
+# Spread (in log space) used when a value falls outside the preferred range:
+# 0.25 ~ a 28% overshoot halves the score
+RANGE_SOFTNESS = 0.25
+
+
+def _user_cache_key(user_id):
+    return f'recommendations:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Drop a buyer's cached recommendations (preferences/history changed)"""
+    cache.delete(_user_cache_key(user_id))
+
+
+class ListingMatrix:
+    """Column-oriented NumPy snapshot of active listings"""
+
+    def __init__(self):
+        rows = list(
+            ActiveListingIndex.objects.order_by().values_list(
+                'listing_id', 'price', 'carpet_area', 'bedrooms', 'bathrooms',
+                'city', 'locality', 'listing__state', 'property_for', 'furnishing',
+                'possession', 'property_type_id', 'amenity_mask', 'is_featured', 'created_at',
+            )
+        )
+        self.size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * 15
+
+        self.ids = np.array(columns[0], dtype=np.int64)
+        self.index_of = {pk: i for i, pk in enumerate(columns[0])}
+        self.log_price = np.log1p(np.array(columns[1], dtype=np.float64))
+        self.log_area = np.log1p(np.array(columns[2], dtype=np.float64))
+        self.bedrooms = np.array([v or 0 for v in columns[3]], dtype=np.float64)
+        self.bathrooms = np.array([v or 0 for v in columns[4]], dtype=np.float64)
+
+        # Location: one code per (city, locality, state) place, plus the
+        # lowercased text used to match preferred locations
+        self.city_codes, self.city_names = self._encode(normalize(c) for c in columns[5])
+        self.place_text = [
+            f'{normalize(city)}|{normalize(locality)}|{normalize(state)}'
+            for city, locality, state in zip(columns[5], columns[6], columns[7])
+        ]
+        self.place_codes, self.places = self._encode(self.place_text)
+
+        self.property_for_codes, self.property_for_values = self._encode(columns[8])
+        self.furnishing = np.array(columns[9], dtype=object)
+        self.possession = np.array(columns[10], dtype=object)
+        self.property_type = np.array([v or 0 for v in columns[11]], dtype=np.int64)
+        self.amenity_mask = np.array(columns[12], dtype=np.uint32)
+        self.is_featured = np.array(columns[13], dtype=bool)
+
+        created = np.array([c.timestamp() for c in columns[14]], dtype=np.float64)
+        age_days = (time.time() - created) / 86400 if self.size else created
+        self.freshness = np.exp(-np.maximum(age_days, 0) / 30.0)
+
+    @staticmethod
+    def _encode(values):
+        lookup = {}
+        codes = [lookup.setdefault(value, len(lookup)) for value in values]
+        return np.array(codes, dtype=np.int64), list(lookup)
+
+
+_matrix = None
+_matrix_generation = None
+_matrix_built_at = 0.0
+_matrix_lock = threading.Lock()
+
+
+def _listings_generation():
+    from .result_cache import _generation_key
+    return cache.get(_generation_key('*', '*')) or 0
+
+
+def get_matrix():
+    """Shared listing matrix, rebuilt when listings have changed"""
+    global _matrix, _matrix_generation, _matrix_built_at
+    generation = _listings_generation()
+    stale = _matrix is None or (
+        generation != _matrix_generation and time.monotonic() - _matrix_built_at >= MATRIX_TTL
+    )
+    if stale:
+        with _matrix_lock:
+            if _matrix is None or _matrix_generation != generation:
+                started = time.monotonic()
+                _matrix = ListingMatrix()
+                _matrix_generation = generation
+                _matrix_built_at = time.monotonic()
+                logger.info(
+                    f"Recommendation matrix built: {_matrix.size} listings "
+                    f"in {(_matrix_built_at - started) * 1000:.0f}ms"
+                )
+    return _matrix
+
+
+# ======================================================
+# Scoring
+# ======================================================
+
+def _range_fit(log_values, low, high):
+    """1 inside [low, high], decaying smoothly (in log space) outside"""
+    fit = np.ones_like(log_values)
+    if low:
+        below = np.maximum(np.log1p(float(low)) - log_values, 0)
+        fit *= np.exp(-(below / RANGE_SOFTNESS) ** 2)
+    if high:
+        above = np.maximum(log_values - np.log1p(float(high)), 0)
+        fit *= np.exp(-(above / RANGE_SOFTNESS) ** 2)
+    return fit
+
+
+def _history_ids(user):
+    favorites = PropertyFavorite.objects.filter(user=user).values_list('property_id', flat=True)
+    inquiries = PropertyInquiry.objects.filter(user=user).values_list('property_id', flat=True)
+    return set(favorites) | set(inquiries)
+
+
+def score_candidates(matrix, profile, history_ids=(), preferred_type_ids=()):
+    """Score every listing in ``matrix`` for a buyer; returns a float array"""
+    if matrix.size == 0:
+        return np.zeros(0)
+
+    components = {}
+    components['budget'] = _range_fit(matrix.log_price, profile.min_budget, profile.max_budget)
+    components['area'] = _range_fit(matrix.log_area, profile.min_area, profile.max_area)
+
+    bedroom_gap = np.maximum((profile.min_bedrooms or 0) - matrix.bedrooms, 0)
+    bathroom_gap = np.maximum((profile.min_bathrooms or 0) - matrix.bathrooms, 0)
+    components['rooms'] = 0.5 ** (bedroom_gap + 0.5 * bathroom_gap)
+
+    # Location: evaluate each preferred location once per distinct place
+    locations = [normalize(loc) for loc in (profile.preferred_locations or []) if normalize(loc)]
+    if locations:
+        place_match = np.array(
+            [any(loc in place for loc in locations) for place in matrix.places], dtype=np.float64
+        )
+        components['location'] = place_match[matrix.place_codes]
+    else:
+        components['location'] = np.full(matrix.size, 0.5)
+
+    if profile.furnishing_preference:
+        components['furnishing'] = (matrix.furnishing == profile.furnishing_preference).astype(np.float64)
+    else:
+        components['furnishing'] = np.full(matrix.size, 0.5)
+
+    if profile.possession_preference and profile.possession_preference != 'any':
+        components['possession'] = (matrix.possession == profile.possession_preference).astype(np.float64)
+    else:
+        components['possession'] = np.full(matrix.size, 0.5)
+
+    if preferred_type_ids:
+        components['property_type'] = np.isin(matrix.property_type, list(preferred_type_ids)).astype(np.float64)
+    else:
+        components['property_type'] = np.full(matrix.size, 0.5)
+
+    wanted = Property.amenity_mask_for(profile.preferred_amenities or [])
+    if wanted:
+        matched = np.bitwise_count(matrix.amenity_mask & np.uint32(wanted)).astype(np.float64)
+        components['amenities'] = matched / bin(wanted).count('1')
+    else:
+        components['amenities'] = np.full(matrix.size, 0.5)
+
+    components['history'] = _history_affinity(matrix, history_ids)
+    components['prior'] = 0.7 * matrix.freshness + 0.3 * matrix.is_featured
+
+    score = np.zeros(matrix.size)
+    for name, values in components.items():
+        score += WEIGHTS[name] * values
+
+    # Rent vs sale is a hard requirement
+    if profile.property_for and profile.property_for in matrix.property_for_values:
+        wanted_code = matrix.property_for_values.index(profile.property_for)
+        score[matrix.property_for_codes != wanted_code] = -np.inf
+    elif profile.property_for:
+        score[:] = -np.inf
+    return score
+
+
+def _history_affinity(matrix, history_ids):
+    """Closeness to the centroid of the buyer's favorited/inquired listings"""
+    rows = np.array([matrix.index_of[pk] for pk in history_ids if pk in matrix.index_of], dtype=np.int64)
+    if rows.size == 0:
+        return np.full(matrix.size, 0.5)
+
+    features = np.column_stack([
+        matrix.log_price / RANGE_SOFTNESS,
+        matrix.log_area / RANGE_SOFTNESS,
+        matrix.bedrooms,
+        matrix.bathrooms * 0.5,
+    ])
+    centroid = features[rows].mean(axis=0)
+    distance = np.sqrt(((features - centroid) ** 2).sum(axis=1))
+    closeness = np.exp(-distance / 2.0)
+
+    # Share of the history in each city and of each property type
+    city_share = np.bincount(matrix.city_codes[rows], minlength=len(matrix.city_names)) / rows.size
+    type_hits = np.isin(matrix.property_type, matrix.property_type[rows]).astype(np.float64)
+    return 0.6 * closeness + 0.3 * city_share[matrix.city_codes] + 0.1 * type_hits
+
+
+def recommend_ids(profile, limit=DEFAULT_LIMIT):
+    """Top ``limit`` recommended property ids for a BuyerProfile (cached)"""
+    key = _user_cache_key(profile.user_id)
+    entry = cache.get(key)
+    if entry is not None and entry['limit'] >= limit:
+        return entry['ids'][:limit]
+
+    matrix = get_matrix()
+    history = _history_ids(profile.user_id)
+    preferred_types = set(profile.preferred_property_types.values_list('id', flat=True))
+    scores = score_candidates(matrix, profile, history, preferred_types)
+
+    # Don't recommend what the buyer already saved or asked about
+    for pk in history:
+        if pk in matrix.index_of:
+            scores[matrix.index_of[pk]] = -np.inf
+
+    limit_cached = max(limit, DEFAULT_LIMIT)
+    k = min(limit_cached, matrix.size)
+    if k == 0:
+        ids = []
+    else:
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        ids = [int(matrix.ids[i]) for i in top if np.isfinite(scores[i])]
+
+    cache.set(key, {'limit': limit_cached, 'ids': ids}, USER_CACHE_TIMEOUT)
+    return ids[:limit]
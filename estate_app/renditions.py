@@ -0,0 +1,167 @@
+"""
+Resized WebP/JPEG renditions of listing photos.
+
+Uploads are kept as-is (up to ``MAX_IMAGE_SIZE``), but pages and API
+responses should never send them: when a PropertyImage is saved, ``generate``
+writes each size in ``RENDITIONS`` in every format in ``FORMATS`` next to the
+upload, under ``properties/renditions/``, and records them in the image's
+``renditions`` manifest:
+
+    {"width": 4000, "height": 3000,
+     "renditions": {"card": {"width": 480, "height": 360,
+                             "webp": "properties/renditions/x/card.webp",
+                             "jpeg": "properties/renditions/x/card.jpg"}, ...}}
+
+The listing's primary image keeps a copy of its manifest in
+``Property.primary_image_renditions``, so cards need no extra query.
+
+``srcset``/``url`` build the markup from a manifest (the ``property_images``
+template tags and the serializers use them) and fall back to the original
+file when an image has no renditions yet; ``manage.py build_image_renditions``
+fills those in. A ``srcset`` only lists renditions cropped the same way as the
+``src`` it goes with (``same_crop``), or the browser could swap a cropped card
+for an uncropped photo of a different shape.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'properties/renditions'
+
+# name -> (width, height, crop): cropped sizes fill the box exactly, the
+# others fit inside it. Images are never enlarged.
+RENDITIONS = {
+    'thumb': (200, 150, True),
+    'card': (480, 360, True),
+    'gallery': (1024, 768, False),
+    'full': (1600, 1200, False),
+}
+
+# format -> (Pillow format, extension, save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+MIME_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+
+def _load(field_file):
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _resize(image, width, height, crop):
+    if crop:
+        # Crop to the box's aspect ratio, then scale down only
+        ratio = width / height
+        if image.width / image.height > ratio:
+            box_width, box_height = round(image.height * ratio), image.height
+        else:
+            box_width, box_height = image.width, round(image.width / ratio)
+        cropped = ImageOps.fit(image, (box_width, box_height), Image.LANCZOS)
+        if box_width > width:
+            return cropped.resize((width, height), Image.LANCZOS)
+        return cropped
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.LANCZOS)
+    return resized
+
+
+def generate(field_file):
+    """Write every rendition of an uploaded image; returns its manifest"""
+    storage = field_file.storage
+    image = _load(field_file)
+    # properties/gallery/house.jpg -> properties/renditions/gallery/house/
+    stem = posixpath.splitext(field_file.name)[0]
+    if stem.startswith('properties/'):
+        stem = stem[len('properties/'):]
+
+    manifest = {'width': image.width, 'height': image.height, 'renditions': {}}
+    for name, (width, height, crop) in RENDITIONS.items():
+        resized = _resize(image, width, height, crop)
+        entry = {'width': resized.width, 'height': resized.height}
+        for fmt, (pil_format, extension, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, pil_format, **options)
+            path = f"{RENDITION_DIR}/{stem}/{name}.{extension}"
+            if storage.exists(path):
+                storage.delete(path)
+            entry[fmt] = storage.save(path, ContentFile(buffer.getvalue()))
+        manifest['renditions'][name] = entry
+    return manifest
+
+
+def build(field_file):
+    """``generate`` that logs and returns an empty manifest on unreadable files"""
+    try:
+        return generate(field_file)
+    except Exception as e:
+        logger.warning(f"Could not build renditions of {field_file.name}: {e}")
+        return {}
+
+
+# ======================================================
+# Markup helpers
+# ======================================================
+
+def source(obj):
+    """(image file, manifest) of a PropertyImage or a Property's primary image"""
+    if hasattr(obj, 'primary_image_renditions'):
+        return obj.primary_image, obj.primary_image_renditions
+    return obj.image, obj.renditions
+
+
+def url(field_file, manifest, name='card', fmt='jpeg'):
+    """URL of one rendition, or of the original if it has none"""
+    entry = (manifest or {}).get('renditions', {}).get(name)
+    if entry and entry.get(fmt):
+        return field_file.storage.url(entry[fmt])
+    return field_file.url if field_file else ''
+
+
+def same_crop(name):
+    """Renditions cropped the same way as ``name``: its ``srcset`` candidates"""
+    crop = RENDITIONS[name][2]
+    return tuple(other for other, (_width, _height, other_crop) in RENDITIONS.items() if other_crop == crop)
+
+
+def srcset(field_file, manifest, fmt='jpeg', names=None):
+    """``srcset`` attribute value over the renditions (``url 480w, ...``)"""
+    renditions = (manifest or {}).get('renditions', {})
+    candidates = {}
+    for name in names or RENDITIONS:
+        entry = renditions.get(name)
+        # Small uploads give several renditions the same width; list it once
+        if entry and entry.get(fmt) and entry['width'] not in candidates:
+            candidates[entry['width']] = f"{field_file.storage.url(entry[fmt])} {entry['width']}w"
+    return ', '.join(candidates.values())
+
+
+def as_json(field_file, manifest, name='card'):
+    """API representation: a default ``src`` plus WebP and JPEG ``srcset``s"""
+    if not field_file:
+        return None
+    names = same_crop(name)
+    return {
+        'src': url(field_file, manifest, name),
+        'webp': srcset(field_file, manifest, 'webp', names),
+        'jpeg': srcset(field_file, manifest, 'jpeg', names),
+    }
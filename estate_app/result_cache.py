@@ -0,0 +1,167 @@
+"""
+Result cache for public listing endpoints.
+
+Stores the *ordered id list* of a search (not rendered pages) under the
+filter's canonical cache key. The view then hydrates only the rows it shows.
+
+Invalidation uses generation numbers instead of deleting keys. Every cached
+entry remembers the generation it was computed at, and a search is scoped by
+(city, property_for):
+
+* ``property_for`` scope is exact (sale/rent/pg/plot, or '*' for any).
+* ``city`` filters are substring matches, so a listing edit bumps every
+  *registered* city filter text contained in the listing's city. A city
+  filter is registered the first time it is cached. Filters using anything
+  other than ``city`` to narrow location use the '*' city scope.
+
+A listing edit in Pune/rent therefore bumps ('*', '*'), ('*', 'rent') and
+e.g. ('pune', '*'), ('pune', 'rent'), leaving Mumbai searches cached.
+
+``swr=True`` enables stale-while-revalidate: when an entry is out of date,
+one request recomputes it while concurrent requests are served the stale
+ids instead of all hitting the database at once.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+
+from .autocomplete import normalize
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_TIMEOUT = 600          # 10 minutes
+GENERATION_TIMEOUT = None           # generations never expire
+REVALIDATE_LOCK_TIMEOUT = 30
+
+# Searches with more hits than this are not cached
+MAX_CACHED_IDS = 1000
+
+# Cap on registered city filter texts, to bound the work per edit
+MAX_CITY_SCOPES = 500
+
+CITY_SCOPES_KEY = 'listing_cache:city_scopes'
+
+# Saves that only touch these fields don't invalidate cached results
+COUNTER_FIELDS = frozenset({'view_count', 'inquiry_count', 'favorite_count'})
+
+
+def _generation_key(city, property_for):
+    return f'listing_cache:gen:{city}:{property_for}'
+
+
+def _bump(keys):
+    for key in keys:
+        cache.add(key, 0, GENERATION_TIMEOUT)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, GENERATION_TIMEOUT)
+
+
+# ======================================================
+# Scopes
+# ======================================================
+
+def _city_scopes():
+    return cache.get(CITY_SCOPES_KEY) or set()
+
+
+def _register_city_scope(city):
+    """Register a city filter text; returns False when the registry is full"""
+    scopes = _city_scopes()
+    if city in scopes:
+        return True
+    if len(scopes) >= MAX_CITY_SCOPES:
+        return False
+    scopes.add(city)
+    cache.set(CITY_SCOPES_KEY, scopes, None)
+    # Edits made while the text wasn't registered didn't bump its
+    # generations, so start it from a fresh one
+    _bump([_generation_key(city, '*')] + [_generation_key(city, f) for f in _property_for_values()])
+    return True
+
+
+def _property_for_values():
+    from .models import Property
+    return [value for value, _label in Property.PROPERTY_FOR_CHOICES]
+
+
+def scope_for(filters):
+    """(city, property_for) invalidation scope of a PropertyFilter"""
+    city = '*'
+    if filters.city and not (filters.location or filters.q):
+        text = normalize(filters.city)
+        if text in _city_scopes() or _register_city_scope(text):
+            city = text
+    return city, filters.property_for or '*'
+
+
+def generation(filters):
+    """Current generation for a PropertyFilter's scope"""
+    city, property_for = scope_for(filters)
+    return cache.get(_generation_key(city, property_for)) or 0
+
+
+def invalidate(city, property_for):
+    """Bump every scope a listing in (city, property_for) belongs to"""
+    city = normalize(city)
+    cities = ['*'] + [text for text in _city_scopes() if text in city]
+    keys = []
+    for scope in cities:
+        keys.append(_generation_key(scope, '*'))
+        if property_for:
+            keys.append(_generation_key(scope, property_for))
+    _bump(keys)
+
+
+def invalidate_all():
+    """Bump every scope (e.g. after a bulk import)"""
+    keys = []
+    for scope in ['*'] + list(_city_scopes()):
+        keys.append(_generation_key(scope, '*'))
+        keys.extend(_generation_key(scope, f) for f in _property_for_values())
+    _bump(keys)
+
+
+# ======================================================
+# Lookups
+# ======================================================
+
+def get_ids(filters, compute, variant='', swr=False):
+    """
+    Ordered result ids for ``filters``.
+
+    ``compute`` returns the ids when the cache can't answer. ``variant``
+    separates different result sets for the same filter (e.g. a LIMIT).
+    Returns None when the search has too many hits to cache; callers then
+    query the database directly.
+    """
+    key = f'{filters.cache_key}:ids{variant}'
+    current = generation(filters)
+    entry = cache.get(key)
+
+    if entry is not None and entry['generation'] == current:
+        return entry['ids']
+
+    if entry is not None and swr:
+        # Let one request recompute while the others keep serving stale ids
+        if not cache.add(f'{key}:lock', 1, REVALIDATE_LOCK_TIMEOUT):
+            return entry['ids']
+
+    try:
+        ids = list(compute()[:MAX_CACHED_IDS + 1])
+        if len(ids) > MAX_CACHED_IDS:
+            ids = None
+        cache.set(key, {'generation': current, 'ids': ids, 'computed_at': time.time()}, RESULT_CACHE_TIMEOUT)
+    finally:
+        if entry is not None and swr:
+            cache.delete(f'{key}:lock')
+    return ids
+
+
+def hydrate(ids, queryset):
+    """Fetch ``ids`` from ``queryset`` preserving the cached order"""
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
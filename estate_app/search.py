@@ -0,0 +1,306 @@
+"""
+Full-text search for Property listings.
+
+Keyword searches used to be built from ``icontains`` OR-chains, which force a
+full scan of ``core_property`` on every request. This module keeps an indexed
+search document (title, description, address, city, locality, landmark) next
+to the table and exposes a small backend abstraction over it:
+
+* SQLite  -> FTS5 external-content table kept in sync by triggers
+             (porter stemming, prefix matching, bm25 ranking)
+* MySQL   -> InnoDB FULLTEXT index queried in BOOLEAN MODE
+             (prefix matching, relevance ranking)
+* other   -> ``icontains`` fallback so the code paths keep working
+
+Callers only use ``keyword_q()`` (filtering) and ``rank_expression()``
+(relevance); they never need to know which backend is active. The filter
+engine (filters.py) applies both: keyword searches without an explicit sort
+are ordered by relevance.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Columns that make up the search document, in index order
+SEARCH_FIELDS = ('title', 'description', 'address', 'city', 'locality', 'landmark')
+
+# Cap the number of terms so a pasted paragraph can't build a huge query
+MAX_QUERY_TERMS = 10
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a free-text query into lowercase search terms"""
+    if not query:
+        return []
+    return _TOKEN_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+# ======================================================
+# Backends
+# ======================================================
+
+class BaseSearchBackend:
+    """Common interface for property search backends"""
+
+    vendor = None
+
+    def install(self, schema_editor=None):
+        """Create the index structures (idempotent)"""
+
+    def uninstall(self, schema_editor=None):
+        """Drop the index structures (idempotent)"""
+
+    def rebuild(self):
+        """Re-populate the index from core_property"""
+
+    def build_expression(self, terms):
+        """Translate search terms into the backend's match syntax"""
+        raise NotImplementedError
+
+    def match_subquery(self, expression):
+        """RawSQL returning the ids of matching properties"""
+        raise NotImplementedError
+
+    def rank_expression(self, expression):
+        """RawSQL scoring the outer core_property row (higher is better)"""
+        raise NotImplementedError
+
+    def _execute(self, statements):
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """FTS5 external-content index for development and tests"""
+
+    vendor = 'sqlite'
+    table = 'core_property_fts'
+
+    def _columns(self, prefix=''):
+        return ', '.join(f'{prefix}{field}' for field in SEARCH_FIELDS)
+
+    def install(self, schema_editor=None):
+        cols = self._columns()
+        new_cols = self._columns('new.')
+        old_cols = self._columns('old.')
+        statements = [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5(
+                {cols},
+                content='core_property', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON core_property BEGIN
+                INSERT INTO {self.table}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON core_property BEGIN
+                INSERT INTO {self.table}({self.table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE OF {cols} ON core_property BEGIN
+                INSERT INTO {self.table}({self.table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+                INSERT INTO {self.table}(rowid, {cols}) VALUES (new.id, {new_cols});
+            END""",
+        ]
+        if schema_editor is not None:
+            for sql in statements:
+                schema_editor.execute(sql)
+        else:
+            self._execute(statements)
+        self.rebuild()
+
+    def uninstall(self, schema_editor=None):
+        statements = [
+            f'DROP TRIGGER IF EXISTS {self.table}_ai',
+            f'DROP TRIGGER IF EXISTS {self.table}_ad',
+            f'DROP TRIGGER IF EXISTS {self.table}_au',
+            f'DROP TABLE IF EXISTS {self.table}',
+        ]
+        if schema_editor is not None:
+            for sql in statements:
+                schema_editor.execute(sql)
+        else:
+            self._execute(statements)
+
+    def is_installed(self):
+        """Check that the index table and all three sync triggers exist"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                [self.table, f'{self.table}_ai', f'{self.table}_ad', f'{self.table}_au'],
+            )
+            return cursor.fetchone()[0] == 4
+
+    def rebuild(self):
+        self._execute([f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')"])
+
+    def build_expression(self, terms):
+        # Every term must match; each term is a prefix so "apart" finds "apartments"
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def match_subquery(self, expression):
+        return RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [expression],
+        )
+
+    def rank_expression(self, expression):
+        # bm25() is "lower is better", flip it so callers can always sort descending
+        return RawSQL(
+            f'SELECT -bm25({self.table}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = core_property.id',
+            [expression],
+            output_field=FloatField(),
+        )
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """InnoDB FULLTEXT index for production"""
+
+    vendor = 'mysql'
+    index_name = 'core_property_fulltext'
+
+    @property
+    def _columns(self):
+        return ', '.join(SEARCH_FIELDS)
+
+    def _match(self, table_prefix=''):
+        cols = ', '.join(f'{table_prefix}{field}' for field in SEARCH_FIELDS)
+        return f'MATCH ({cols}) AGAINST (%s IN BOOLEAN MODE)'
+
+    def is_installed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM information_schema.statistics '
+                'WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s',
+                ['core_property', self.index_name],
+            )
+            return cursor.fetchone()[0] > 0
+
+    def install(self, schema_editor=None):
+        if self.is_installed():
+            return
+        sql = f'ALTER TABLE core_property ADD FULLTEXT INDEX {self.index_name} ({self._columns})'
+        if schema_editor is not None:
+            schema_editor.execute(sql)
+        else:
+            self._execute([sql])
+
+    def uninstall(self, schema_editor=None):
+        if not self.is_installed():
+            return
+        sql = f'ALTER TABLE core_property DROP INDEX {self.index_name}'
+        if schema_editor is not None:
+            schema_editor.execute(sql)
+        else:
+            self._execute([sql])
+
+    def rebuild(self):
+        # InnoDB maintains FULLTEXT indexes transactionally; OPTIMIZE merges
+        # the auxiliary tables after large imports
+        self._execute(['OPTIMIZE TABLE core_property'])
+
+    def build_expression(self, terms):
+        # "+term*" = required term with prefix match
+        return ' '.join(f'+{term}*' for term in terms)
+
+    def match_subquery(self, expression):
+        return RawSQL(f'SELECT id FROM core_property WHERE {self._match()}', [expression])
+
+    def rank_expression(self, expression):
+        return RawSQL(self._match('core_property.'), [expression], output_field=FloatField())
+
+
+class IContainsBackend(BaseSearchBackend):
+    """Unindexed fallback for databases without a native backend"""
+
+    def build_expression(self, terms):
+        return terms
+
+    def _q(self, terms):
+        q = Q()
+        for term in terms:
+            term_q = Q()
+            for field in SEARCH_FIELDS:
+                term_q |= Q(**{f'{field}__icontains': term})
+            q &= term_q
+        return q
+
+    def match_subquery(self, expression):
+        from .models import Property
+        return Property.objects.filter(self._q(expression)).values('id')
+
+    def rank_expression(self, expression):
+        return Value(0.0, output_field=FloatField())
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'mysql': MySQLFullTextBackend,
+}
+
+
+def get_backend(conn=None):
+    """Return the search backend for the given (default) connection"""
+    custom = getattr(settings, 'PROPERTY_SEARCH_BACKEND', None)
+    if custom:
+        return import_string(custom)()
+    vendor = (conn or connection).vendor
+    return BACKENDS.get(vendor, IContainsBackend)()
+
+
+# ======================================================
+# Public helpers used by the views
+# ======================================================
+
+def keyword_q(query, field='id'):
+    """
+    Q object restricting a queryset to properties matching ``query``.
+
+    ``field`` is the lookup holding the property id, so the same filter works
+    on related models, e.g. ``keyword_q(q, field='property_id')``.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return Q()
+    backend = get_backend()
+    return Q(**{f'{field}__in': backend.match_subquery(backend.build_expression(terms))})
+
+
+def rank_expression(query):
+    """Relevance score for ``Property`` querysets (annotate and sort descending)"""
+    terms = tokenize(query)
+    if not terms:
+        return Value(0.0, output_field=FloatField())
+    backend = get_backend()
+    return backend.rank_expression(backend.build_expression(terms))
+
+
+def ensure_search_index(sender=None, using='default', **kwargs):
+    """
+    post_migrate hook: make sure the index and its triggers exist.
+
+    SQLite rebuilds ``core_property`` for many ALTERs, which silently drops the
+    sync triggers, so re-check after every migrate run.
+    """
+    from django.db import DEFAULT_DB_ALIAS, connections
+    if using != DEFAULT_DB_ALIAS:
+        return
+    backend = BACKENDS.get(connections[using].vendor)
+    if backend is None:
+        return
+    backend = backend()
+    try:
+        if not backend.is_installed():
+            backend.install()
+    except Exception as e:
+        logger.error(f"Could not install property search index: {e}")
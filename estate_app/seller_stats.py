@@ -0,0 +1,157 @@
+"""
+Per-owner listing and lead counters (the SellerStats snapshot).
+
+Sellers, agents and builders see their property and new-lead counts on every
+page, so instead of counting on each render the counters live in one
+SellerStats row per owner:
+
+* signals apply each change as an atomic ``UPDATE ... SET col = col + n``
+  inside the transaction that made it (see signals.py)
+* bulk ``QuerySet.update()`` callers, which send no signals, call
+  ``reconcile`` for the owners they touched
+* a missing row is computed on first read; until then changes are skipped,
+  so deleting a user never recreates its row
+
+``manage.py reconcile_seller_stats`` recomputes every row from the source
+tables and repairs any drift (e.g. increments lost while a row was being
+reconciled).
+"""
+
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Property, PropertyInquiry, SellerStats
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLUMNS = {status: f'properties_{status}' for status, _label in Property.STATUS_CHOICES}
+COUNTER_FIELDS = ('properties_total', *STATUS_COLUMNS.values(), 'inquiries_total', 'new_leads', 'total_views')
+
+RECONCILE_BATCH_SIZE = 500
+
+
+# ======================================================
+# Reading
+# ======================================================
+
+def get(user):
+    """A user's SellerStats row, computed on first use; memoized on the user"""
+    if not hasattr(user, '_seller_stats_snapshot'):
+        stats = SellerStats.objects.filter(user_id=user.pk).first()
+        if stats is None:
+            reconcile([user.pk])
+            stats = SellerStats.objects.filter(user_id=user.pk).first()
+        user._seller_stats_snapshot = stats
+    return user._seller_stats_snapshot
+
+
+# ======================================================
+# Incremental updates
+# ======================================================
+
+def apply(user_id, **deltas):
+    """Add ``deltas`` ({column: n}) to an owner's counters with one UPDATE"""
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not user_id or not deltas:
+        return
+    SellerStats.objects.filter(user_id=user_id).update(
+        **{column: F(column) + delta for column, delta in deltas.items()}
+    )
+
+
+def property_deltas(status, view_count, sign=1):
+    """Counter changes for adding (sign=1) or removing (sign=-1) a property"""
+    deltas = {'properties_total': sign, 'total_views': sign * (view_count or 0)}
+    if status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[status]] = sign
+    return deltas
+
+
+def add_views(owner_deltas):
+    """Apply flushed view counts, {owner_id: views}"""
+    for owner_id, views in owner_deltas.items():
+        apply(owner_id, total_views=views)
+
+
+# ======================================================
+# Reconciliation
+# ======================================================
+
+def compute(user_ids):
+    """Counters of the given owners from the source tables, {user_id: {column: value}}"""
+    counters = {user_id: dict.fromkeys(COUNTER_FIELDS, 0) for user_id in user_ids}
+
+    properties = (
+        Property.objects.filter(owner_id__in=user_ids)
+        .values('owner_id')
+        .annotate(
+            properties_total=Count('id'),
+            total_views=Sum('view_count'),
+            **{column: Count('id', filter=Q(status=status)) for status, column in STATUS_COLUMNS.items()},
+        )
+        .order_by()
+    )
+    for row in properties:
+        owner_id = row.pop('owner_id')
+        row['total_views'] = row['total_views'] or 0
+        counters[owner_id].update(row)
+
+    inquiries = (
+        PropertyInquiry.objects.filter(property__owner_id__in=user_ids)
+        .values('property__owner_id')
+        .annotate(inquiries_total=Count('id'), new_leads=Count('id', filter=Q(status='new')))
+        .order_by()
+    )
+    for row in inquiries:
+        counters[row.pop('property__owner_id')].update(row)
+    return counters
+
+
+def _reconcile_batch(user_ids):
+    now = timezone.now()
+    counters = compute(user_ids)
+    existing = {stats.user_id: stats for stats in SellerStats.objects.filter(user_id__in=user_ids)}
+
+    changed, missing = [], []
+    for user_id, values in counters.items():
+        stats = existing.get(user_id)
+        if stats is None:
+            missing.append(SellerStats(user_id=user_id, reconciled_at=now, **values))
+            continue
+        if any(getattr(stats, column) != value for column, value in values.items()):
+            for column, value in values.items():
+                setattr(stats, column, value)
+            changed.append(stats)
+        stats.reconciled_at = now
+
+    with transaction.atomic():
+        SellerStats.objects.bulk_update(list(existing.values()), (*COUNTER_FIELDS, 'reconciled_at'))
+        try:
+            with transaction.atomic():
+                SellerStats.objects.bulk_create(missing)
+        except IntegrityError:
+            # Created concurrently (or the user is gone); the next run catches up
+            pass
+    if changed:
+        logger.info(f"Seller stats drift repaired for users {[stats.user_id for stats in changed]}")
+    return len(changed)
+
+
+def reconcile(user_ids=None, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recompute the SellerStats rows of ``user_ids`` (default: every owner and
+    every existing row); returns how many existing rows had drifted.
+    """
+    if user_ids is None:
+        owners = set(Property.objects.order_by().values_list('owner_id', flat=True).distinct())
+        owners.update(SellerStats.objects.values_list('user_id', flat=True))
+        user_ids = owners
+    user_ids = sorted(set(user_ids))
+
+    drifted = 0
+    for start in range(0, len(user_ids), batch_size):
+        drifted += _reconcile_batch(user_ids[start:start + batch_size])
+    return drifted
@@ -1,10 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.views.decorators.http import require_POST, require_GET
 from django.core.paginator import Paginator
 from django.db.models import Q, Count, Sum, Avg
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta, datetime
 import json
@@ -14,14 +15,18 @@ from datetime import date
 import uuid
 import re
 from django.db import transaction
+from django.core.cache import cache
 
 
 from .models import (
     CustomUser, UserProfile, UserMembership, MembershipPlan,
-    Property, PropertyImage, PropertyInquiry, PropertyView,
+    Property, PropertyImage, PropertyInquiry,
     PropertyCategory, PropertyType
 )
 from .forms import PropertyInquiryForm, LeadResponseForm, PackageSelectionForm, PropertyImageForm,UserProfileForm, CustomUserForm
+from .search import keyword_q
+from .pagination import KeysetPaginator, wants_cursor
+from . import analytics, exports, lead_stats, seller_stats
 
 
 # ======================================================
@@ -64,16 +69,11 @@ def seller_dashboard(request):
     last_7_days = today - timedelta(days=7)
     last_30_days = today - timedelta(days=30)
     
-    # Dashboard statistics
-    total_views = PropertyView.objects.filter(
-        property__in=active_properties,
-        viewed_at__date__gte=last_7_days
-    ).count()
-    
-    total_leads = PropertyInquiry.objects.filter(
-        property__in=active_properties,
-        created_at__date__gte=last_7_days
-    ).count()
+    # Dashboard statistics (from the daily rollup)
+    daily_stats = analytics.stats_for(active_properties)
+    week_totals = analytics.totals(daily_stats, start=last_7_days)
+    total_views = week_totals['views']
+    total_leads = week_totals['inquiries']
     
     # Response rate calculation
     responded_leads = PropertyInquiry.objects.filter(
@@ -87,11 +87,12 @@ def seller_dashboard(request):
     
     response_rate = (responded_leads / total_leads_all_time * 100) if total_leads_all_time > 0 else 0
     
-    # Top properties - FIX: Use different annotation names that don't conflict
+    # Top properties over the last 30 days
+    recent = Q(daily_stats__date__gte=last_30_days)
     top_properties = active_properties.annotate(
-        recent_views=Count('views'),  # Changed from view_count to recent_views
-        recent_leads=Count('inquiries')  # Changed from lead_count to recent_leads
-    ).order_by('-recent_views')[:3]
+        recent_views=Coalesce(Sum('daily_stats__views', filter=recent), 0),
+        recent_leads=Coalesce(Sum('daily_stats__inquiries', filter=recent), 0),
+    ).order_by('-recent_views', '-id')[:3]
     
     # Recent leads
     recent_leads = PropertyInquiry.objects.filter(
@@ -101,13 +102,8 @@ def seller_dashboard(request):
     # Performance chart data
     chart_data = get_performance_chart_data(user, last_30_days)
     
-    # Lead sources (demo data for now)
-    lead_sources = [
-        {'name': 'Website Form', 'value': 45, 'color': '#10B981'},
-        {'name': 'Phone Calls', 'value': 30, 'color': '#0E68B9'},
-        {'name': 'WhatsApp', 'value': 15, 'color': '#8B5CF6'},
-        {'name': 'Email', 'value': 10, 'color': '#F59E0B'},
-    ]
+    # Lead sources
+    lead_sources = get_lead_sources_data(user, last_30_days)
     
     # Calculate remaining listings
     listings_remaining = 0
@@ -127,7 +123,7 @@ def seller_dashboard(request):
         'profile': profile,
         'membership': membership,
         'stats': {
-            'active_properties': active_properties.count(),
+            'active_properties': seller_stats.get(user).properties_active,
             'total_views': total_views,
             'total_leads': total_leads,
             'response_rate': round(response_rate, 1),
@@ -146,44 +142,67 @@ def seller_dashboard(request):
     
     return render(request, 'dashboard/seller/dashboard.html', context)
 
+CHART_CACHE_TIMEOUT = 300  # 5 minutes
+
 def get_performance_chart_data(user, start_date):
-    """Generate performance chart data"""
-    import random
-    # Get user's active properties
-    active_properties = Property.objects.filter(owner=user, status='active')  # FIX: Use status='active'
-    
-    # Demo data - in real app, calculate from actual data
-    days = []
-    views_data = []
-    leads_data = []
-    
-    for i in range(30, 0, -1):
-        date = start_date + timedelta(days=i)
-        days.append(date.strftime('%d %b'))
-        
-        # Demo data - replace with actual calculations
-        base_views = random.randint(30, 100)
-        base_leads = random.randint(2, 10)
-        
-        # Add some trend
-        views_data.append(base_views + int(i/2))
-        leads_data.append(base_leads + int(i/5))
-    
-    return {
-        'labels': days,
-        'views': views_data,
-        'leads': leads_data,
-    }
+    """Per-day views and leads of the seller's active properties since start_date"""
+    cache_key = f'seller_charts:performance:{user.pk}:{start_date.isoformat()}'
+    chart_data = cache.get(cache_key)
+    if chart_data is None:
+        active_properties = Property.objects.filter(owner=user, status='active')
+        series = analytics.daily_series(
+            analytics.stats_for(active_properties),
+            start_date + timedelta(days=1), start_date + timedelta(days=30),
+        )
+        chart_data = {
+            'labels': [day['date'].strftime('%d %b') for day in series],
+            'views': [day['views'] for day in series],
+            'leads': [day['inquiries'] for day in series],
+        }
+        cache.set(cache_key, chart_data, CHART_CACHE_TIMEOUT)
+    return chart_data
 
-def get_lead_sources_data(properties):
-    """Generate lead sources data"""
-    # Demo data - in real app, calculate from actual sources
-    return [
-        {'name': 'Website Form', 'value': 45, 'color': '#10B981'},
-        {'name': 'Phone Calls', 'value': 30, 'color': '#0E68B9'},
-        {'name': 'WhatsApp', 'value': 15, 'color': '#8B5CF6'},
-        {'name': 'Email', 'value': 10, 'color': '#F59E0B'},
-    ]
+def get_lead_sources_data(user, start_date=None):
+    """Lead counts and shares per source for the seller's active properties"""
+    cache_key = f'seller_charts:lead_sources:{user.pk}:{start_date.isoformat() if start_date else "all"}'
+    sources = cache.get(cache_key)
+    if sources is None:
+        active_properties = Property.objects.filter(owner=user, status='active')
+        sources = analytics.lead_sources(analytics.stats_for(active_properties), start=start_date)
+        cache.set(cache_key, sources, CHART_CACHE_TIMEOUT)
+    return sources
+
+ANALYTICS_RANGES = (7, 30, 90, 365)
+MAX_ANALYTICS_DAYS = 3 * 365
+
+def get_analytics_range(params):
+    """(start, end, days) from ?start=&end= (YYYY-MM-DD) or ?days=, default last 30 days"""
+    today = timezone.now().date()
+    try:
+        end = datetime.strptime(params['end'], '%Y-%m-%d').date() if params.get('end') else today
+        start = datetime.strptime(params['start'], '%Y-%m-%d').date() if params.get('start') else None
+    except ValueError:
+        end, start = today, None
+    if start is None:
+        try:
+            days = int(params.get('days', 30))
+        except ValueError:
+            days = 30
+        days = min(max(days, 1), MAX_ANALYTICS_DAYS)
+        start = end - timedelta(days=days - 1)
+    end = min(end, today)
+    start = max(min(start, end), end - timedelta(days=MAX_ANALYTICS_DAYS - 1))
+    return start, end, (end - start).days + 1
+
+def get_analytics_report(user, start_date, end_date):
+    """Cached analytics report of the seller's active properties (see analytics.seller_report)"""
+    cache_key = f'seller_charts:report:{user.pk}:{start_date.isoformat()}:{end_date.isoformat()}'
+    report = cache.get(cache_key)
+    if report is None:
+        active_properties = Property.objects.filter(owner=user, status='active')
+        report = analytics.seller_report(active_properties, start_date, end_date)
+        cache.set(cache_key, report, CHART_CACHE_TIMEOUT)
+    return report
 
 # ======================================================
 # Seller profile
@@ -355,11 +374,9 @@ def seller_properties(request):
         properties = properties.filter(property_for=property_for_filter)
     
     if search_query:
+        # Sellers also look up their own listings by reference id
         properties = properties.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query) |
+            keyword_q(search_query) |
             Q(property_id__icontains=search_query)
         )
     
@@ -372,11 +389,12 @@ def seller_properties(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Statistics
-    total_properties = properties.count()
-    active_properties = properties.filter(status='active').count()
-    draft_properties = properties.filter(status='draft').count()
-    sold_properties = properties.filter(status='sold').count()
+    # Statistics (all of the seller's properties, from the SellerStats snapshot)
+    stats = seller_stats.get(user)
+    total_properties = stats.properties_total
+    active_properties = stats.properties_active
+    draft_properties = stats.properties_draft
+    sold_properties = stats.properties_sold
     
     # Get user's membership to check limits
     try:
@@ -415,10 +433,17 @@ def seller_property_detail(request, pk):
     
     # Get related data
     inquiries = property_obj.inquiries.all().order_by('-created_at')
+    today = timezone.localdate()
+    daily_stats = analytics.stats_for([property_obj])
+    # Today isn't rolled up yet; read it from the raw rows
+    today_totals = analytics.today_counts([property_obj])
+    earlier_views = analytics.totals(
+        daily_stats, start=today - timedelta(days=7), end=today - timedelta(days=1), fields=('views',)
+    )['views']
     stats = {
-        'views_today': property_obj.views.filter(viewed_at__date=datetime.today()).count(),
-        'inquiries_today': property_obj.inquiries.filter(created_at__date=datetime.today()).count(),
-        'views_week': property_obj.views.filter(viewed_at__gte=datetime.today() - timedelta(days=7)).count(),
+        'views_today': today_totals['views'],
+        'inquiries_today': today_totals['inquiries'],
+        'views_week': earlier_views + today_totals['views'],
     }
     
     context = {
@@ -728,24 +753,7 @@ def seller_property_create(request):
     }
     
     # Amenities list
-    amenities_list = [
-        {'id': 'parking', 'name': 'Parking'},
-        {'id': 'security', 'name': '24/7 Security'},
-        {'id': 'lift', 'name': 'Lift/Elevator'},
-        {'id': 'power_backup', 'name': 'Power Backup'},
-        {'id': 'swimming_pool', 'name': 'Swimming Pool'},
-        {'id': 'gym', 'name': 'Gym/Fitness Center'},
-        {'id': 'clubhouse', 'name': 'Club House'},
-        {'id': 'garden', 'name': 'Garden/Park'},
-        {'id': 'water_supply', 'name': '24/7 Water Supply'},
-        {'id': 'play_area', 'name': 'Children Play Area'},
-        {'id': 'internet', 'name': 'Internet/WiFi'},
-        {'id': 'ac', 'name': 'Air Conditioning'},
-        {'id': 'cctv', 'name': 'CCTV Security'},
-        {'id': 'fire_safety', 'name': 'Fire Safety'},
-        {'id': 'waste_disposal', 'name': 'Waste Disposal'},
-        {'id': 'maintenance_staff', 'name': 'Maintenance Staff'},
-    ]
+    amenities_list = [{'id': amenity, 'name': name} for amenity, name in Property.AMENITY_CHOICES]
     
     # Handle AJAX request for property types
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -1095,6 +1103,7 @@ def seller_property_create(request):
                 
                 # Update property's primary image reference
                 property_obj.primary_image = primary_img.image
+                property_obj.primary_image_renditions = primary_img.renditions
                 property_obj.save()
             
             # Save additional images if provided
@@ -1172,24 +1181,7 @@ def seller_property_edit(request, pk):
         property_types = property_types.filter(category=property_obj.category)
 
     # Amenities list
-    amenities_list = [
-        {'id': 'parking', 'name': 'Parking'},
-        {'id': 'security', 'name': '24/7 Security'},
-        {'id': 'lift', 'name': 'Lift/Elevator'},
-        {'id': 'power_backup', 'name': 'Power Backup'},
-        {'id': 'swimming_pool', 'name': 'Swimming Pool'},
-        {'id': 'gym', 'name': 'Gym/Fitness Center'},
-        {'id': 'clubhouse', 'name': 'Club House'},
-        {'id': 'garden', 'name': 'Garden/Park'},
-        {'id': 'water_supply', 'name': '24/7 Water Supply'},
-        {'id': 'play_area', 'name': 'Children Play Area'},
-        {'id': 'internet', 'name': 'Internet/WiFi'},
-        {'id': 'ac', 'name': 'Air Conditioning'},
-        {'id': 'cctv', 'name': 'CCTV Security'},
-        {'id': 'fire_safety', 'name': 'Fire Safety'},
-        {'id': 'waste_disposal', 'name': 'Waste Disposal'},
-        {'id': 'maintenance_staff', 'name': 'Maintenance Staff'},
-    ]
+    amenities_list = [{'id': amenity, 'name': name} for amenity, name in Property.AMENITY_CHOICES]
 
     # Get selected amenities
     selected_amenities = []
@@ -1552,6 +1544,7 @@ def seller_property_edit(request, pk):
                 
                 # Update property's primary image reference
                 property_obj.primary_image = primary_img.image
+                property_obj.primary_image_renditions = primary_img.renditions
                 property_obj.save()
             
             # Handle image deletion
@@ -1723,9 +1716,6 @@ def seller_leads(request):
     # Base queryset
     inquiries = PropertyInquiry.objects.filter(property__in=user_properties).select_related('property', 'user')
     
-    # Store for statistics
-    all_inquiries = inquiries
-    
     # Apply filters
     if status_filter != 'all':
         inquiries = inquiries.filter(status=status_filter)
@@ -1760,69 +1750,33 @@ def seller_leads(request):
     if sort_by in ['created_at', '-created_at', 'priority', '-priority', 'updated_at', '-updated_at']:
         inquiries = inquiries.order_by(sort_by)
     
-    # Statistics
-    total_leads = all_inquiries.count()
-    new_leads = all_inquiries.filter(status='new').count()
-    contacted_leads = all_inquiries.filter(status='contacted').count()
-    interested_leads = all_inquiries.filter(status='interested').count()
-    converted_leads = all_inquiries.filter(status='converted').count()
-    spam_leads = all_inquiries.filter(status='spam').count()
-    
-    # Response rate
-    responded_leads = all_inquiries.exclude(response__exact='').count()
-    response_rate = (responded_leads / total_leads * 100) if total_leads > 0 else 0
-    
-    # Average response time (calculate from actual data if possible)
-    responded_inquiries = all_inquiries.exclude(responded_at__isnull=True)
-    if responded_inquiries.exists():
-        total_time = sum([(inq.responded_at - inq.created_at).total_seconds() for inq in responded_inquiries])
-        avg_seconds = total_time / responded_inquiries.count()
-        hours = avg_seconds / 3600
-        if hours < 1:
-            avg_response_time = f"{int(avg_seconds / 60)} minutes"
-        elif hours < 24:
-            avg_response_time = f"{hours:.1f} hours"
-        else:
-            avg_response_time = f"{hours/24:.1f} days"
-    else:
-        avg_response_time = "N/A"
+    # Statistics (one cached aggregate query, see lead_stats.py)
+    stats = lead_stats.get_lead_stats(user)
+    status_counts = stats['status_counts']
     
-    # Lead sources
-    lead_sources = all_inquiries.values('source').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    for source in lead_sources:
-        source['percentage'] = (source['count'] * 100.0 / total_leads) if total_leads > 0 else 0
-    
-    # Priority breakdown
-    priority_counts = {
-        1: all_inquiries.filter(priority=1).count(),
-        2: all_inquiries.filter(priority=2).count(),
-        3: all_inquiries.filter(priority=3).count(),
-        4: all_inquiries.filter(priority=4).count(),
-        5: all_inquiries.filter(priority=5).count(),
-    }
-    
-    # Pagination
-    paginator = Paginator(inquiries, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination (keyset pagination when a cursor is passed)
+    if wants_cursor(request):
+        paginator = KeysetPaginator(inquiries, 10)
+        page_obj = paginator.get_page(request.GET.get('cursor'), request.GET)
+    else:
+        paginator = Paginator(inquiries, 10)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     
     context = {
         'user': user,
         'page_obj': page_obj,
         'user_properties': user_properties,
-        'total_leads': total_leads,
-        'new_leads': new_leads,
-        'contacted_leads': contacted_leads,
-        'interested_leads': interested_leads,
-        'converted_leads': converted_leads,
-        'spam_leads': spam_leads,
-        'response_rate': round(response_rate, 1),
-        'avg_response_time': avg_response_time,
-        'lead_sources': lead_sources,
-        'priority_counts': priority_counts,
+        'total_leads': stats['total_leads'],
+        'new_leads': status_counts['new'],
+        'contacted_leads': status_counts['contacted'],
+        'interested_leads': status_counts['interested'],
+        'converted_leads': status_counts['converted'],
+        'spam_leads': status_counts['spam'],
+        'response_rate': stats['response_rate'],
+        'avg_response_time': lead_stats.format_duration(stats['avg_response_seconds']),
+        'lead_sources': stats['lead_sources'],
+        'priority_counts': stats['priority_counts'],
         'status_filter': status_filter,
         'property_filter': property_filter,
         'date_from': date_from,
@@ -1888,34 +1842,10 @@ def seller_lead_detail(request, pk):
 
 @login_required
 def seller_lead_export(request):
-    """Export leads as CSV"""
-    user = request.user
-    user_properties = Property.objects.filter(owner=user)
-    inquiries = PropertyInquiry.objects.filter(property__in=user_properties)
-    
-    # Create CSV response
-    import csv
-    from django.http import HttpResponse
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="leads_export.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Name', 'Email', 'Phone', 'Property', 'Message', 'Status', 'Source'])
-    
-    for inquiry in inquiries:
-        writer.writerow([
-            inquiry.created_at.strftime('%Y-%m-%d %H:%M'),
-            inquiry.name,
-            inquiry.email,
-            inquiry.phone,
-            inquiry.property.title,
-            inquiry.message[:100],
-            inquiry.get_status_display(),
-            inquiry.get_source_display(),
-        ])
-    
-    return response
+    """Export leads as CSV (streamed, see exports.py)"""
+    inquiries = PropertyInquiry.objects.filter(property__owner=request.user)
+    fmt, compress = exports.options_from_request(request.GET)
+    return exports.export_response(exports.SELLER_LEADS_SUMMARY, inquiries, 'leads_export', fmt, compress)
 
 
 @login_required
@@ -1924,83 +1854,21 @@ def seller_analytics(request):
     user = request.user
     user_properties = Property.objects.filter(owner=user)
     
-    # Date ranges
-    today = timezone.now().date()
-    last_7_days = today - timedelta(days=7)
-    last_30_days = today - timedelta(days=30)
+    start_date, end_date, days = get_analytics_range(request.GET)
     
-    # Property statistics
+    # Views, leads, monthly trend, devices, sources, lead hours and top properties
+    report = get_analytics_report(user, start_date, end_date)
     active_properties = user_properties.filter(status='active')
-    total_views = PropertyView.objects.filter(
-        property__in=active_properties,
-        viewed_at__date__gte=last_30_days
-    ).count()
-    
-    total_leads = PropertyInquiry.objects.filter(
-        property__in=active_properties,
-        created_at__date__gte=last_30_days
-    ).count()
-    
-    # Top performing properties
-    top_properties = active_properties.annotate(
-        views_count=Count('views'),
-        lead_count=Count('inquiries')
-    ).order_by('-views_count')[:5]
-    
-    # Monthly performance data
-    monthly_data = []
-    for i in range(6, -1, -1):
-        date = today - timedelta(days=i*30)
-        month_start = date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_views = PropertyView.objects.filter(
-            property__in=active_properties,
-            viewed_at__date__range=[month_start, month_end]
-        ).count()
-        
-        month_leads = PropertyInquiry.objects.filter(
-            property__in=active_properties,
-            created_at__date__range=[month_start, month_end]
-        ).count()
-        
-        monthly_data.append({
-            'month': month_start.strftime('%b %Y'),
-            'views': month_views,
-            'leads': month_leads,
-        })
-    
-    # Lead sources
-    lead_sources = PropertyInquiry.objects.filter(
-        property__in=active_properties,
-        created_at__date__gte=last_30_days
-    ).values('source').annotate(count=Count('id')).order_by('-count')
-    
-    # Device breakdown (demo data)
-    device_breakdown = [
-        {'device': 'Mobile', 'count': 856, 'percentage': 69},
-        {'device': 'Desktop', 'count': 312, 'percentage': 25},
-        {'device': 'Tablet', 'count': 72, 'percentage': 6},
-    ]
-    
-    # Best time for leads (demo data)
-    best_times = [
-        {'time': '9AM - 12PM', 'leads': 28, 'percentage': 35},
-        {'time': '1PM - 5PM', 'leads': 32, 'percentage': 40},
-        {'time': '6PM - 9PM', 'leads': 20, 'percentage': 25},
-    ]
     
     context = {
         'user': user,
         'total_properties': user_properties.count(),
         'active_properties': active_properties.count(),
-        'total_views': total_views,
-        'total_leads': total_leads,
-        'top_properties': top_properties,
-        'monthly_data': monthly_data,
-        'lead_sources': lead_sources,
-        'device_breakdown': device_breakdown,
-        'best_times': best_times,
+        **report,
+        'start_date': start_date,
+        'end_date': end_date,
+        'days': days,
+        'analytics_ranges': ANALYTICS_RANGES,
         'user_plan': user.membership.plan.name if hasattr(user, 'membership') and user.membership.plan else 'No Plan',
         'plan_days_left': user.membership.days_until_expiry if hasattr(user, 'membership') else 0,
     }
@@ -2165,41 +2033,12 @@ def ajax_delete_lead(request, lead_id):
 @login_required
 @require_GET
 def ajax_export_leads(request):
-    """Export leads as CSV"""
-    user = request.user
-    user_properties = Property.objects.filter(owner=user)
-    inquiries = PropertyInquiry.objects.filter(property__in=user_properties).select_related('property')
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="leads_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-    
-    import csv
-    writer = csv.writer(response)
-    writer.writerow([
-        'Date', 'Name', 'Email', 'Phone', 'Property', 'Location', 
-        'Message', 'Status', 'Priority', 'Source', 'Response', 
-        'Response Date', 'Budget', 'Preferred Date'
-    ])
-    
-    for inquiry in inquiries:
-        writer.writerow([
-            inquiry.created_at.strftime('%Y-%m-%d %H:%M'),
-            inquiry.name,
-            inquiry.email,
-            inquiry.phone,
-            inquiry.property.title,
-            f"{inquiry.property.city}, {inquiry.property.state}",
-            inquiry.message.replace('\n', ' '),
-            inquiry.get_status_display(),
-            inquiry.priority,
-            inquiry.get_source_display(),
-            inquiry.response.replace('\n', ' ') if inquiry.response else '',
-            inquiry.responded_at.strftime('%Y-%m-%d %H:%M') if inquiry.responded_at else '',
-            inquiry.budget if inquiry.budget else '',
-            inquiry.preferred_date.strftime('%Y-%m-%d') if inquiry.preferred_date else ''
-        ])
-    
-    return response
+    """Export leads as CSV, or JSON Lines with ?format=jsonl (streamed, see exports.py)"""
+    inquiries = PropertyInquiry.objects.filter(property__owner=request.user)
+    fmt, compress = exports.options_from_request(request.GET)
+    return exports.export_response(
+        exports.SELLER_LEADS, inquiries, exports.timestamped('leads_export'), fmt, compress
+    )
 
 @login_required
 @require_GET
@@ -2207,39 +2046,31 @@ def ajax_lead_stats(request):
     """Get lead statistics for charts"""
     user = request.user
     user_properties = Property.objects.filter(owner=user)
-    inquiries = PropertyInquiry.objects.filter(property__in=user_properties)
+    rollup = analytics.stats_for(user_properties)
     
     # Last 30 days data
     end_date = timezone.now().date()
     start_date = end_date - timedelta(days=30)
     
-    daily_stats = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_inquiries = inquiries.filter(created_at__date=current_date)
-        daily_stats.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'count': day_inquiries.count(),
-            'new': day_inquiries.filter(status='new').count(),
-            'contacted': day_inquiries.filter(status='contacted').count(),
-        })
-        current_date += timedelta(days=1)
-    
-    # Status distribution
-    status_distribution = []
-    for status_code, status_name in PropertyInquiry.STATUS_CHOICES:
-        count = inquiries.filter(status=status_code).count()
-        if count > 0:
-            status_distribution.append({
-                'status': status_name,
-                'count': count
-            })
+    series = analytics.daily_series(
+        rollup, start_date, end_date,
+        fields=('inquiries', 'inquiries_new', 'inquiries_contacted'),
+    )
+    daily_stats = [
+        {
+            'date': day['date'].strftime('%Y-%m-%d'),
+            'count': day['inquiries'],
+            'new': day['inquiries_new'],
+            'contacted': day['inquiries_contacted'],
+        }
+        for day in series
+    ]
     
     return JsonResponse({
         'success': True,
         'daily_stats': daily_stats,
-        'status_distribution': status_distribution,
-        'total': inquiries.count()
+        'status_distribution': analytics.status_distribution(rollup),
+        'total': analytics.totals(rollup, fields=('inquiries',))['inquiries'],
     })
 
 @login_required
@@ -2350,14 +2181,19 @@ def ajax_bulk_update_leads(request):
         
         if action == 'delete':
             count = inquiries.count()
+            days = analytics.inquiry_days(inquiries)
             inquiries.delete()
+            analytics.rebuild_property_days(days)
             return JsonResponse({
                 'success': True,
                 'message': f'{count} lead(s) deleted successfully'
             })
         
         elif action == 'status_update' and new_status:
-            count = inquiries.update(status=new_status)
+            # updated_at lets the daily stats rollup see the status change
+            count = inquiries.update(status=new_status, updated_at=timezone.now())
+            lead_stats.invalidate(request.user.pk)
+            seller_stats.reconcile([request.user.pk])
             return JsonResponse({
                 'success': True,
                 'message': f'{count} lead(s) updated to {dict(PropertyInquiry.STATUS_CHOICES).get(new_status, new_status)}'
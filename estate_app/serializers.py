@@ -0,0 +1,238 @@
+"""
+Batched JSON serialization of Property lists.
+
+Serializing a page of listings costs a constant number of queries however
+large the page is:
+
+1. the listings themselves, loading only the columns the requested fields
+   need, with the owner joined only when an owner field is requested
+   (``listing_queryset``)
+2. one windowed query over core_propertyimage returning, per listing, its
+   first ``MAX_IMAGES`` gallery images together with its total image count
+   (skipped when no image field is requested)
+
+Responses can be narrowed with sparse fieldsets (see ``Projection``):
+``?view=pin|card|list|full`` picks a preset and ``?fields=id,title,price`` an
+explicit list. The projection drives both the SQL columns and the JSON keys.
+"""
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from . import renditions
+from .models import Property, PropertyImage
+
+MAX_IMAGES = 5
+
+PLACEHOLDER_IMAGE = '/static/images/property-placeholder.jpg'
+
+
+class InvalidFields(ValueError):
+    """Unknown ``view`` or ``fields`` in a request"""
+
+
+def _decimal(name):
+    def get(prop, extra):
+        value = getattr(prop, name)
+        return float(value) if value else None
+    return get
+
+
+def _attr(name):
+    return lambda prop, extra: getattr(prop, name)
+
+
+def _display(name):
+    def get(prop, extra):
+        return getattr(prop, f'get_{name}_display')() if getattr(prop, name) else None
+    return get
+
+
+def _price_formatted(prop, extra):
+    if prop.property_for == 'rent':
+        return f"₹{prop.price:,.0f}/mo"
+    return f"₹{prop.price:,.0f}"
+
+
+def _owner_initials(prop, extra):
+    owner = prop.owner
+    if owner and owner.first_name and owner.last_name:
+        return owner.first_name[0] + owner.last_name[0]
+    return 'U'
+
+
+def _owner_type(prop, extra):
+    return prop.owner.get_user_type_display() if prop.owner else 'Individual Owner'
+
+
+def _images(prop, extra):
+    return [
+        {'image': img.image.url, 'srcset': renditions.as_json(img.image, img.renditions, 'gallery')}
+        for img in extra['images']
+    ]
+
+
+def _card_image(prop, extra):
+    if not prop.primary_image:
+        return PLACEHOLDER_IMAGE
+    return renditions.url(prop.primary_image, prop.primary_image_renditions)
+
+
+def _primary_image_srcset(prop, extra):
+    return renditions.as_json(prop.primary_image, prop.primary_image_renditions, 'card')
+
+
+# Output field -> (Property columns it reads, value getter)
+FIELDS = {
+    'id': (('id',), _attr('id')),
+    'title': (('title',), _attr('title')),
+    'description': (('description',), _attr('description')),
+    'price': (('price',), lambda prop, extra: float(prop.price)),
+    'price_formatted': (('price', 'property_for'), _price_formatted),
+    'price_per_sqft': (('price_per_sqft',), _decimal('price_per_sqft')),
+    'carpet_area': (('carpet_area',), _decimal('carpet_area')),
+    'builtup_area': (('builtup_area',), _decimal('builtup_area')),
+    'bedrooms': (('bedrooms',), _attr('bedrooms')),
+    'bathrooms': (('bathrooms',), _attr('bathrooms')),
+    'balconies': (('balconies',), _attr('balconies')),
+    'city': (('city',), _attr('city')),
+    'locality': (('locality',), _attr('locality')),
+    'address': (('address',), _attr('address')),
+    'latitude': (('latitude',), _decimal('latitude')),
+    'longitude': (('longitude',), _decimal('longitude')),
+    'property_for': (('property_for',), _attr('property_for')),
+    'furnishing': (('furnishing',), _attr('furnishing')),
+    'furnishing_display': (('furnishing',), _display('furnishing')),
+    'amenities': (('amenities',), _attr('amenities')),
+    'possession_status': (('possession_status',), _attr('possession_status')),
+    'age_of_property': (('age_of_property',), _attr('age_of_property')),
+    'is_featured': (('is_featured',), _attr('is_featured')),
+    'is_premium': (('is_premium',), _attr('is_premium')),
+    'is_verified': (('is_verified',), _attr('is_verified')),
+    'is_urgent': (('is_urgent',), _attr('is_urgent')),
+    'contact_person': (('contact_person',), _attr('contact_person')),
+    'contact_phone': (('contact_phone',), _attr('contact_phone')),
+    'contact_email': (('contact_email',), _attr('contact_email')),
+    'primary_image': (('primary_image',), lambda prop, extra: prop.primary_image.url if prop.primary_image else None),
+    'image': (('primary_image', 'primary_image_renditions'), _card_image),
+    'primary_image_srcset': (('primary_image', 'primary_image_renditions'), _primary_image_srcset),
+    'images_count': ((), lambda prop, extra: extra['images_count']),
+    'images': ((), _images),
+    'owner_initials': (('owner__first_name', 'owner__last_name'), _owner_initials),
+    'owner_type': (('owner__user_type',), _owner_type),
+    'status_display': (('status',), lambda prop, extra: prop.get_status_display()),
+}
+
+IMAGE_FIELDS = frozenset({'images', 'images_count'})
+
+VIEWS = {
+    # Map markers
+    'pin': ('id', 'title', 'price', 'price_formatted', 'property_for',
+            'latitude', 'longitude', 'primary_image'),
+    # Carousels and result cards
+    'card': ('id', 'title', 'price', 'price_formatted', 'property_for', 'bedrooms',
+             'bathrooms', 'carpet_area', 'city', 'locality', 'primary_image',
+             'primary_image_srcset', 'images_count', 'is_featured', 'is_urgent', 'is_verified'),
+    # Listing pages
+    'list': ('id', 'title', 'description', 'price', 'price_per_sqft', 'carpet_area',
+             'bedrooms', 'bathrooms', 'city', 'locality', 'address', 'property_for',
+             'furnishing', 'furnishing_display', 'amenities', 'is_featured', 'is_premium',
+             'is_verified', 'is_urgent', 'contact_person', 'contact_phone', 'contact_email',
+             'primary_image', 'primary_image_srcset', 'images_count', 'owner_initials', 'owner_type',
+             'status_display', 'images'),
+    # Detail pages
+    'full': tuple(FIELDS),
+}
+
+
+class Projection:
+    """The JSON fields of a response, and the columns needed to build them"""
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        columns = {'id'}
+        for name in self.fields:
+            columns.update(FIELDS[name][0])
+        self.columns = columns
+        self.needs_owner = any(column.startswith('owner__') for column in columns)
+        self.needs_images = bool(IMAGE_FIELDS.intersection(self.fields))
+
+    @classmethod
+    def from_request(cls, params, default_view):
+        """Projection from ``?fields=`` or ``?view=``; raises InvalidFields"""
+        requested = params.get('fields', '')
+        if requested:
+            names = [name.strip() for name in requested.split(',') if name.strip()]
+            unknown = [name for name in names if name not in FIELDS]
+            if unknown:
+                raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+            return cls(dict.fromkeys(names))
+
+        view = params.get('view') or default_view
+        if view not in VIEWS:
+            raise InvalidFields(f"view must be one of: {', '.join(VIEWS)}")
+        return cls(VIEWS[view])
+
+
+_CONCRETE_FIELDS = frozenset(field.name for field in Property._meta.concrete_fields)
+
+
+def listing_queryset(queryset, projection):
+    """Restrict a Property queryset to the columns ``projection`` reads"""
+    columns = set(projection.columns)
+    # Keep the ordering keys loaded; keyset pagination reads them from the rows
+    for key in queryset.query.order_by:
+        if isinstance(key, str) and key.lstrip('-') in _CONCRETE_FIELDS:
+            columns.add(key.lstrip('-'))
+    if projection.needs_owner:
+        queryset = queryset.select_related('owner')
+    return queryset.only(*sorted(columns))
+
+
+def fetch_images(property_ids, limit=MAX_IMAGES):
+    """
+    Gallery images of many listings in one query.
+
+    Returns {property_id: (image_count, [PropertyImage, ...])} with at most
+    ``limit`` images per listing, in gallery order.
+    """
+    gallery_order = [F('display_order').asc(), F('is_primary').desc(), F('id').asc()]
+    rows = (
+        PropertyImage.objects.filter(property_id__in=property_ids)
+        .only('id', 'property_id', 'image', 'renditions', 'display_order', 'is_primary')
+        .annotate(
+            position=Window(RowNumber(), partition_by=[F('property_id')], order_by=gallery_order),
+            total=Window(Count('id'), partition_by=[F('property_id')]),
+        )
+        .filter(position__lte=limit)
+        .order_by('property_id', 'position')
+    )
+    images = {}
+    for image in rows:
+        count, gallery = images.setdefault(image.property_id, (image.total, []))
+        gallery.append(image)
+    return images
+
+
+def serialize_listing(prop, projection, images_count=0, images=()):
+    """JSON-ready dict of one listing"""
+    extra = {'images_count': images_count, 'images': images}
+    data = {}
+    for name in projection.fields:
+        if name == 'images' and not images:
+            continue
+        data[name] = FIELDS[name][1](prop, extra)
+    return data
+
+
+def serialize_listings(properties, projection, image_limit=MAX_IMAGES):
+    """Serialize a page of listings with at most one extra query for images"""
+    properties = list(properties)
+    images = {}
+    if projection.needs_images and properties:
+        images = fetch_images([prop.id for prop in properties], image_limit)
+    data = []
+    for prop in properties:
+        count, gallery = images.get(prop.id, (0, []))
+        data.append(serialize_listing(prop, projection, count, gallery))
+    return data
@@ -1,8 +1,14 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db.models.signals import post_save, pre_save, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
 from django.utils import timezone
+from django.db import transaction
 import logging
-from .models import CustomUser, UserProfile, MembershipPlan, UserMembership, BuyerProfile
+from .models import (
+    CustomUser, UserProfile, MembershipPlan, UserMembership, BuyerProfile, Property,
+    PropertyFavorite, PropertyInquiry, PropertyImage, PropertyType,
+)
+from .autocomplete import location_index, location_of
+from . import result_cache, listing_index, recommendations, conditional, lead_stats, seller_stats
 
 logger = logging.getLogger(__name__)
 
@@ -37,4 +43,251 @@ def create_user_profiles(sender, instance, created, **kwargs):
                     )
                     UserMembership.objects.create(user=instance, plan=basic_plan)
             except Exception as e:
-                logger.error(f"Error creating membership for user {instance.id}: {e}")
\ No newline at end of file
+                logger.error(f"Error creating membership for user {instance.id}: {e}")
+
+
+# ======================================================
+# Property change tracking
+# ======================================================
+
+# Sent after Property rows are changed with queryset.update() (which skips
+# save signals), with ``ids`` of the affected rows and the updated ``fields``
+properties_bulk_updated = Signal()
+
+# Fields whose previous values are kept on the instance during save
+TRACKED_PROPERTY_FIELDS = ('status', 'city', 'locality', 'state', 'pincode', 'property_for', 'is_featured',
+                           'owner_id')
+
+
+def _tracked_state(instance):
+    return {field: getattr(instance, field) for field in TRACKED_PROPERTY_FIELDS}
+
+
+def _active_location(state):
+    if state and state['status'] == 'active':
+        return location_of(state)
+    return None
+
+
+@receiver(pre_save, sender=Property)
+def remember_property_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Store the saved values of tracked fields as instance._previous_state"""
+    instance._previous_state = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & {*TRACKED_PROPERTY_FIELDS, 'owner'}:
+        # e.g. view_count increments: nothing tracked can change
+        instance._previous_state = _tracked_state(instance)
+        return
+    instance._previous_state = (
+        Property.objects.filter(pk=instance.pk).values(*TRACKED_PROPERTY_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Property)
+def update_location_index_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the listing between autocomplete entries when it changes"""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    old_location, new_location = _active_location(previous), _active_location(_tracked_state(instance))
+    # A rolled-back change must not reach this process's index
+    transaction.on_commit(lambda: location_index.update(old_location, new_location))
+
+
+@receiver(post_delete, sender=Property)
+def update_location_index_on_delete(sender, instance, **kwargs):
+    """Drop a deleted listing from the autocomplete counts"""
+    old_location = _active_location(_tracked_state(instance))
+    transaction.on_commit(lambda: location_index.update(old_location, None))
+
+
+@receiver(properties_bulk_updated, sender=Property)
+def rebuild_location_index(sender, ids, fields, **kwargs):
+    """Bulk status/location changes: rebuild the autocomplete index"""
+    if set(fields) & {'status', 'city', 'locality', 'state', 'pincode'}:
+        location_index.mark_stale()
+
+
+@receiver(post_save, sender=Property)
+def sync_listing_index_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Keep the listing's ActiveListingIndex row in step with the property"""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & listing_index.INDEXED_FIELDS:
+        return
+    listing_index.sync_property(instance)
+
+
+@receiver(properties_bulk_updated, sender=Property)
+def sync_listing_index_on_bulk_update(sender, ids, fields, **kwargs):
+    if set(fields) & listing_index.INDEXED_FIELDS:
+        listing_index.sync_ids(ids)
+
+
+def _listing_scopes(*states):
+    """Distinct (city, property_for) of the states that were/are active"""
+    return {
+        (state['city'], state['property_for'])
+        for state in states
+        if state and state['status'] == 'active'
+    }
+
+
+def _invalidate_on_commit(city, property_for):
+    # Bump only once the change is visible to other connections, so nobody
+    # caches pre-commit results under the new generation
+    transaction.on_commit(lambda: result_cache.invalidate(city, property_for))
+
+
+@receiver(post_save, sender=Property)
+def invalidate_listing_cache_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Bump cached search results for the listing's city/property_for"""
+    if raw:
+        return
+    if update_fields is not None and set(update_fields) <= result_cache.COUNTER_FIELDS:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    for city, property_for in _listing_scopes(previous, _tracked_state(instance)):
+        _invalidate_on_commit(city, property_for)
+
+
+@receiver(post_delete, sender=Property)
+def invalidate_listing_cache_on_delete(sender, instance, **kwargs):
+    for city, property_for in _listing_scopes(_tracked_state(instance)):
+        _invalidate_on_commit(city, property_for)
+
+
+@receiver(properties_bulk_updated, sender=Property)
+def invalidate_listing_cache_on_bulk_update(sender, ids, fields, **kwargs):
+    scopes = Property.objects.filter(pk__in=ids).values_list('city', 'property_for').distinct()
+    for city, property_for in scopes:
+        _invalidate_on_commit(city, property_for)
+
+
+# ======================================================
+# Buyer recommendations
+# ======================================================
+
+@receiver(post_save, sender=BuyerProfile)
+@receiver(m2m_changed, sender=BuyerProfile.preferred_property_types.through)
+def invalidate_recommendations_on_profile_change(sender, instance, **kwargs):
+    if isinstance(instance, BuyerProfile):
+        recommendations.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=PropertyFavorite)
+@receiver(post_delete, sender=PropertyFavorite)
+@receiver(post_save, sender=PropertyInquiry)
+@receiver(post_delete, sender=PropertyInquiry)
+def invalidate_recommendations_on_history_change(sender, instance, **kwargs):
+    if instance.user_id:
+        recommendations.invalidate_user(instance.user_id)
+
+
+# ======================================================
+# Seller lead statistics and counters
+# ======================================================
+
+def _inquiry_owner(instance):
+    """Owner id of an inquiry's property, looked up once per instance"""
+    if not hasattr(instance, '_owner_id'):
+        instance._owner_id = (
+            Property.objects.filter(pk=instance.property_id).values_list('owner_id', flat=True).first()
+        )
+    return instance._owner_id
+
+
+@receiver(post_save, sender=PropertyInquiry)
+@receiver(post_delete, sender=PropertyInquiry)
+def invalidate_lead_stats(sender, instance, **kwargs):
+    # Look the owner up now: when a property is deleted its inquiries go first
+    owner_id = _inquiry_owner(instance)
+    if owner_id:
+        transaction.on_commit(lambda: lead_stats.invalidate(owner_id))
+
+
+@receiver(post_save, sender=Property)
+def update_seller_stats_on_property_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        seller_stats.apply(instance.owner_id, **seller_stats.property_deltas(instance.status, instance.view_count))
+        return
+    previous = getattr(instance, '_previous_state', None)
+    if not previous:
+        return
+    if previous['owner_id'] != instance.owner_id:
+        # Its inquiries and views move too: recount both owners
+        seller_stats.reconcile([previous['owner_id'], instance.owner_id])
+    elif previous['status'] != instance.status:
+        deltas = dict.fromkeys(seller_stats.STATUS_COLUMNS.values(), 0)
+        for status, sign in ((previous['status'], -1), (instance.status, 1)):
+            if status in seller_stats.STATUS_COLUMNS:
+                deltas[seller_stats.STATUS_COLUMNS[status]] += sign
+        seller_stats.apply(instance.owner_id, **deltas)
+
+
+@receiver(post_delete, sender=Property)
+def update_seller_stats_on_property_delete(sender, instance, **kwargs):
+    seller_stats.apply(instance.owner_id, **seller_stats.property_deltas(instance.status, instance.view_count, -1))
+
+
+@receiver(properties_bulk_updated, sender=Property)
+def reconcile_seller_stats_on_bulk_update(sender, ids, fields, **kwargs):
+    if set(fields) & {'status', 'owner', 'owner_id', 'view_count'}:
+        owners = Property.objects.filter(pk__in=ids).order_by().values_list('owner_id', flat=True).distinct()
+        seller_stats.reconcile(owners)
+
+
+@receiver(pre_save, sender=PropertyInquiry)
+def remember_inquiry_status(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Store the saved status as instance._previous_status"""
+    instance._previous_status = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        instance._previous_status = instance.status
+        return
+    instance._previous_status = (
+        PropertyInquiry.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=PropertyInquiry)
+def update_seller_stats_on_inquiry_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        seller_stats.apply(_inquiry_owner(instance), inquiries_total=1, new_leads=int(instance.status == 'new'))
+        return
+    previous = getattr(instance, '_previous_status', None)
+    if previous is not None and previous != instance.status:
+        seller_stats.apply(_inquiry_owner(instance), new_leads=int(instance.status == 'new') - int(previous == 'new'))
+
+
+@receiver(post_delete, sender=PropertyInquiry)
+def update_seller_stats_on_inquiry_delete(sender, instance, **kwargs):
+    seller_stats.apply(_inquiry_owner(instance), inquiries_total=-1, new_leads=-int(instance.status == 'new'))
+
+
+# ======================================================
+# Conditional GET validators
+# ======================================================
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property_on_image_change(sender, instance, raw=False, **kwargs):
+    """Gallery changes are part of the listing JSON, so refresh its validators"""
+    if raw:
+        return
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+    scope = Property.objects.filter(pk=instance.property_id).values_list('city', 'property_for').first()
+    if scope:
+        _invalidate_on_commit(*scope)
+
+
+@receiver(post_save, sender=PropertyType)
+@receiver(post_delete, sender=PropertyType)
+def invalidate_property_types_etag(sender, **kwargs):
+    transaction.on_commit(conditional.bump_property_types)
@@ -0,0 +1,207 @@
+"""
+Precomputed "similar properties" neighbor lists.
+
+Every active listing is described by a small normalized feature vector:
+
+* log price per sqft and log carpet area (relative differences matter)
+* bedrooms
+* property type (mismatch penalty)
+* location: distance in km from latitude/longitude, falling back to
+  same-city / other-city when coordinates are missing
+
+Listings are only compared within their rent/sale segment. The top
+``NEIGHBORS`` per listing are stored in PropertySimilarity, so a detail page
+reads its similar listings with one indexed lookup.
+
+``build`` recomputes everything; ``refresh`` only recomputes the
+neighborhoods around listings whose ActiveListingIndex row changed since the
+last run (``indexed_at``), plus listings that pointed at a listing that is no
+longer active. Both are run from ``manage.py build_similar_properties``.
+"""
+
+import logging
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .autocomplete import normalize
+from .models import ActiveListingIndex, PropertySimilarity
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS = 12
+
+# Rows scored per block; a block costs BLOCK_SIZE x segment_size floats
+BLOCK_SIZE = 256
+
+# A difference of one "scale" adds 1 to the squared distance
+PRICE_SCALE = 0.25      # log price per sqft (~28%)
+AREA_SCALE = 0.3        # log carpet area (~35%)
+BEDROOM_SCALE = 1.0     # one bedroom
+GEO_SCALE_KM = 5.0
+TYPE_MISMATCH = 1.0
+
+# Assumed distance without coordinates: same city / different city
+SAME_CITY_KM = 5.0
+OTHER_CITY_KM = 50.0
+
+
+class FeatureMatrix:
+    """Feature arrays of one rent/sale segment of active listings"""
+
+    def __init__(self, rows):
+        self.size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * 9
+        self.ids = np.array(columns[0], dtype=np.int64)
+        self.position = {pk: i for i, pk in enumerate(columns[0])}
+
+        price = np.array(columns[1], dtype=np.float64)
+        area = np.maximum(np.array(columns[2], dtype=np.float64), 1.0)
+        per_sqft = np.array(
+            [float(v) if v else np.nan for v in columns[3]], dtype=np.float64
+        )
+        per_sqft = np.where(np.isnan(per_sqft), price / area, per_sqft)
+        self.price = np.log1p(per_sqft) / PRICE_SCALE
+        self.area = np.log1p(area) / AREA_SCALE
+        self.bedrooms = np.array([v or 0 for v in columns[4]], dtype=np.float64) / BEDROOM_SCALE
+        self.property_type = np.array([v or 0 for v in columns[5]], dtype=np.int64)
+
+        cities = {}
+        self.city = np.array(
+            [cities.setdefault(normalize(c), len(cities)) for c in columns[6]], dtype=np.int64
+        )
+        self.lat = np.array([float(v) if v is not None else np.nan for v in columns[7]], dtype=np.float64)
+        self.lng = np.array([float(v) if v is not None else np.nan for v in columns[8]], dtype=np.float64)
+        self.has_coords = ~(np.isnan(self.lat) | np.isnan(self.lng))
+
+    def distances(self, rows):
+        """Squared distances from the listings at ``rows`` to every listing"""
+        d = (self.price[rows, None] - self.price[None, :]) ** 2
+        d += (self.area[rows, None] - self.area[None, :]) ** 2
+        d += (self.bedrooms[rows, None] - self.bedrooms[None, :]) ** 2
+        d += TYPE_MISMATCH * (self.property_type[rows, None] != self.property_type[None, :])
+
+        # Equirectangular approximation, accurate at city scale
+        lat = np.radians(self.lat)
+        dy = (self.lat[rows, None] - self.lat[None, :]) * 110.57
+        dx = (self.lng[rows, None] - self.lng[None, :]) * 111.32 * np.cos((lat[rows, None] + lat[None, :]) / 2)
+        km = np.sqrt(dx ** 2 + dy ** 2)
+        same_city = self.city[rows, None] == self.city[None, :]
+        fallback = np.where(same_city, SAME_CITY_KM, OTHER_CITY_KM)
+        both = self.has_coords[rows, None] & self.has_coords[None, :]
+        km = np.where(both, np.minimum(km, OTHER_CITY_KM), fallback)
+        d += (km / GEO_SCALE_KM) ** 2
+
+        d[np.arange(len(rows)), rows] = np.inf    # a listing isn't its own neighbor
+        return d
+
+    def neighbors(self, rows, k=NEIGHBORS):
+        """{listing_id: [(neighbor_id, distance), ...]} for ``rows``"""
+        result = {}
+        k = min(k, self.size - 1)
+        rows = np.asarray(rows, dtype=np.int64)
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            if k <= 0:
+                result.update((int(self.ids[i]), []) for i in block)
+                continue
+            d = self.distances(block)
+            nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(d, nearest, axis=1).argsort(axis=1, kind='stable')
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            for i, row in enumerate(block):
+                result[int(self.ids[row])] = [
+                    (int(self.ids[j]), float(d[i, j])) for j in nearest[i]
+                ]
+        return result
+
+
+def load_segments():
+    """{property_for: FeatureMatrix} of all active listings"""
+    rows = ActiveListingIndex.objects.order_by('listing_id').values_list(
+        'property_for', 'listing_id', 'price', 'carpet_area', 'price_per_sqft', 'bedrooms',
+        'property_type_id', 'city', 'listing__latitude', 'listing__longitude',
+    )
+    segments = {}
+    for row in rows:
+        segments.setdefault(row[0], []).append(row[1:])
+    return {key: FeatureMatrix(values) for key, values in segments.items()}
+
+
+def _store(neighbors, computed_at):
+    """Replace the stored neighbor lists of the listings in ``neighbors``"""
+    ids = list(neighbors)
+    with transaction.atomic():
+        PropertySimilarity.objects.filter(property_id__in=ids).delete()
+        PropertySimilarity.objects.bulk_create(
+            [
+                PropertySimilarity(
+                    property_id=pk, similar_id=similar_id, rank=rank,
+                    distance=distance, computed_at=computed_at,
+                )
+                for pk, similar in neighbors.items()
+                for rank, (similar_id, distance) in enumerate(similar)
+            ],
+            batch_size=1000,
+        )
+
+
+def build():
+    """Recompute every neighbor list; returns the number of listings"""
+    computed_at = timezone.now()
+    count = 0
+    for segment in load_segments().values():
+        _store(segment.neighbors(np.arange(segment.size)), computed_at)
+        count += segment.size
+    # Listings that are no longer active
+    PropertySimilarity.objects.filter(computed_at__lt=computed_at).delete()
+    logger.info(f"Similar properties built for {count} listings")
+    return count
+
+
+def refresh():
+    """
+    Recompute only the neighborhoods affected by changes since the last run.
+
+    A changed listing gets a new list, and so do the listings that pointed at
+    it and its closest neighbors (which, distance being symmetric, are the
+    listings most likely to now include it). Returns the number of listings
+    recomputed.
+    """
+    last_run = PropertySimilarity.objects.aggregate(last=Max('computed_at'))['last']
+    if last_run is None:
+        return build()
+
+    computed_at = timezone.now()
+    changed = set(
+        ActiveListingIndex.objects.filter(indexed_at__gte=last_run).values_list('listing_id', flat=True)
+    )
+    # Lists pointing at listings that left the index (sold, deactivated, ...)
+    stale_sources = set(
+        PropertySimilarity.objects.filter(similar__search_index__isnull=True)
+        .values_list('property_id', flat=True)
+    )
+    PropertySimilarity.objects.filter(property__search_index__isnull=True).delete()
+    if not changed and not stale_sources:
+        return 0
+
+    referrers = set(
+        PropertySimilarity.objects.filter(similar_id__in=changed).values_list('property_id', flat=True)
+    )
+    count = 0
+    for segment in load_segments().values():
+        rows = {segment.position[pk] for pk in changed if pk in segment.position}
+        if rows:
+            # Moved listings get a new list, and so do their new neighbors
+            for similar in segment.neighbors(sorted(rows), k=NEIGHBORS * 2).values():
+                rows.update(segment.position[pk] for pk, _distance in similar)
+        rows.update(
+            segment.position[pk] for pk in referrers | stale_sources if pk in segment.position
+        )
+        if rows:
+            _store(segment.neighbors(sorted(rows)), computed_at)
+            count += len(rows)
+    logger.info(f"Similar properties refreshed for {count} listings")
+    return count
@@ -0,0 +1,56 @@
+from django import template
+from django.utils.html import format_html
+
+from estate_app import renditions
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 640px) 100vw, 480px'
+
+
+@register.simple_tag
+def image_url(obj, name='card', fmt='jpeg'):
+    """
+    URL of one rendition of a PropertyImage or a Property's primary image
+    Usage: <img src="{% image_url image 'gallery' %}">
+    """
+    field_file, manifest = renditions.source(obj)
+    return renditions.url(field_file, manifest, name, fmt) if field_file else ''
+
+
+@register.simple_tag
+def image_srcset(obj, name='card', fmt='jpeg'):
+    """
+    srcset over the renditions cropped like ``name``; pass the same name as the src
+    Usage: <img src="{% image_url property 'gallery' %}" srcset="{% image_srcset property 'gallery' %}" sizes="...">
+    """
+    field_file, manifest = renditions.source(obj)
+    if not field_file:
+        return ''
+    return renditions.srcset(field_file, manifest, fmt, renditions.same_crop(name))
+
+
+@register.simple_tag
+def responsive_image(obj, name='card', alt='', css_class='', sizes=DEFAULT_SIZES):
+    """
+    <picture> serving WebP with a JPEG fallback, falling back to the original
+    upload for images without renditions
+    Usage: {% responsive_image property 'card' alt=property.title css_class="w-full h-48" %}
+    """
+    field_file, manifest = renditions.source(obj)
+    if not field_file:
+        return ''
+    src = renditions.url(field_file, manifest, name)
+    names = renditions.same_crop(name)
+    webp = renditions.srcset(field_file, manifest, 'webp', names)
+    jpeg = renditions.srcset(field_file, manifest, 'jpeg', names)
+    if not (webp and jpeg):
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', src, alt, css_class)
+    # display: contents keeps the <img> sized by the surrounding layout
+    return format_html(
+        '<picture style="display: contents">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy">'
+        '</picture>',
+        webp, sizes, src, jpeg, sizes, alt, css_class,
+    )
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from estate_app import analytics
+from estate_app.models import PropertyDailyStats, PropertyInquiry, PropertyView
+
+from .utils import make_inquiry, make_property, make_user
+
+
+class RollupTests(TestCase):
+
+    def setUp(self):
+        self.seller = make_user('seller@example.com')
+        self.prop = make_property(self.seller)
+        now = timezone.now()
+        for days_ago, device in ((10, 'desktop'), (10, 'mobile'), (2, 'mobile'), (0, 'desktop')):
+            PropertyView.objects.create(
+                property=self.prop, ip_address=f'10.0.0.{days_ago}', device_type=device,
+                viewed_at=now - timedelta(days=days_ago),
+            )
+        self.old_inquiry = make_inquiry(self.prop)
+        make_inquiry(self.prop, source='phone')
+        # created_at is auto_now_add
+        PropertyInquiry.objects.filter(pk=self.old_inquiry.pk).update(created_at=now - timedelta(days=10))
+
+    def snapshot(self):
+        return list(
+            PropertyDailyStats.objects.order_by('property_id', 'date')
+            .values(*[f.attname for f in PropertyDailyStats._meta.fields if f.name not in ('id', 'computed_at')])
+        )
+
+    def test_refresh_is_idempotent(self):
+        call_command('rollup_daily_stats', stdout=StringIO())
+        first = self.snapshot()
+        self.assertEqual(sum(row['views'] for row in first), 4)
+        self.assertEqual(sum(row['inquiries'] for row in first), 2)
+
+        analytics.refresh()
+        analytics.refresh()
+        self.assertEqual(self.snapshot(), first)
+
+        analytics.rebuild_days(timezone.localdate() - timedelta(days=30), timezone.localdate())
+        self.assertEqual(self.snapshot(), first)
+
+    def test_refresh_sees_bulk_status_change_of_old_inquiry(self):
+        analytics.refresh()
+        PropertyInquiry.objects.filter(pk=self.old_inquiry.pk).update(status='converted', updated_at=timezone.now())
+        analytics.refresh()
+
+        day = timezone.localtime(PropertyInquiry.objects.get(pk=self.old_inquiry.pk).created_at).date()
+        row = PropertyDailyStats.objects.get(property=self.prop, date=day)
+        self.assertEqual((row.inquiries, row.inquiries_new, row.inquiries_converted), (1, 0, 1))
+
+    def test_today_counts_read_raw_rows(self):
+        self.assertEqual(analytics.today_counts([self.prop]), {'views': 1, 'inquiries': 1})
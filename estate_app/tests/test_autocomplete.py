@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from estate_app.autocomplete import VERSION_CACHE_KEY, LocationIndex, location_index
+
+from .utils import make_property, make_user
+
+
+class LocationIndexTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller = make_user('seller@example.com')
+        location_index.rebuild()
+
+    def cities(self, query):
+        return [suggestion['city'] for suggestion in location_index.suggest(query)]
+
+    def test_committed_save_updates_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_property(self.seller, city='Nashik')
+        self.assertIn('Nashik', self.cities('nash'))
+
+    def test_rolled_back_save_leaves_index_alone(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    make_property(self.seller, city='Nagpur')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.cities('nag'), [])
+        self.assertEqual(location_index._version, cache.get(VERSION_CACHE_KEY))
+
+    def test_concurrent_update_is_not_skipped(self):
+        first, second = LocationIndex(), LocationIndex()
+        first.rebuild()
+        second.rebuild()
+        first.update(None, ('Pune', 'Baner', 'Maharashtra', '411001'))
+        second.update(None, ('Goa', '', 'Goa', ''))
+        # first bumped in between: second is missing Pune and must rebuild
+        self.assertEqual(first._version, 1)
+        self.assertNotEqual(second._version, cache.get(VERSION_CACHE_KEY))
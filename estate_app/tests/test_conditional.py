@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from estate_app.filters import LISTING_SPEC
+from estate_app.models import Property
+
+from .utils import make_property, make_user
+
+
+class FeaturedPropertiesETagTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        seller = make_user('seller@example.com')
+        self.props = [make_property(seller, is_featured=True, view_count=views) for views in (1, 2, 3)]
+        self.url = reverse('api_featured_properties')
+
+    def ids(self, response):
+        return [prop['id'] for prop in response.json()['properties']]
+
+    def test_unchanged_listing_gets_304(self):
+        response = self.client.get(self.url, {'sort': '-price'})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(self.url, {'sort': '-price'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_counter_sort_is_not_served_stale(self):
+        response = self.client.get(self.url, {'sort': '-view_count'})
+        self.assertEqual(self.ids(response), [prop.pk for prop in reversed(self.props)])
+        self.assertNotIn('ETag', response)
+
+        # Counter updates (e.g. the view flush) never bump the result cache;
+        # let the cached id list lapse
+        Property.objects.filter(pk=self.props[0].pk).update(view_count=10)
+        filters = LISTING_SPEC.parse({'sort': '-view_count'}, featured_only=True)
+        cache.delete(f'{filters.cache_key}:ids')
+
+        response = self.client.get(self.url, {'sort': '-view_count'}, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.ids(response)[0], self.props[0].pk)
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from estate_app.filters import LISTING_SPEC
+from estate_app.models import Property
+from estate_app.pagination import InvalidCursor, KeysetPaginator
+
+from .utils import make_property, make_user
+
+
+class KeysetPaginatorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller = make_user('seller@example.com')
+        # Repeated prices, so pages must break ties on the id
+        for index in range(11):
+            make_property(
+                self.seller,
+                title=f'Villa {index}' if index % 2 else f'Flat {index}',
+                description='villa with a garden' if index % 3 == 0 else 'quiet street',
+                price=Decimal(3000000 + (index % 4) * 500000),
+            )
+
+    def walk(self, queryset, per_page=3):
+        """Every row, following next_cursor from the first page"""
+        paginator = KeysetPaginator(queryset, per_page)
+        page = paginator.page()
+        rows = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            self.assertLessEqual(len(page), per_page)
+            rows.extend(page)
+        return rows
+
+    def test_round_trip_matches_full_ordering(self):
+        for ordering in (('-price',), ('price',), ('-created_at',), ('-price', 'bedrooms')):
+            queryset = Property.objects.order_by(*ordering)
+            with self.subTest(ordering=ordering):
+                expected = list(queryset.order_by(*ordering, '-id' if ordering[-1].startswith('-') else 'id'))
+                self.assertEqual(self.walk(queryset), expected)
+
+    def test_round_trip_by_relevance(self):
+        queryset = LISTING_SPEC.parse({'q': 'villa'}).queryset()
+        expected = list(queryset)
+        self.assertTrue(expected)
+        self.assertEqual([prop.pk for prop in self.walk(queryset, per_page=2)], [prop.pk for prop in expected])
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        by_price = KeysetPaginator(Property.objects.order_by('-price'), 3)
+        cursor = by_price.page().next_cursor
+        by_date = KeysetPaginator(Property.objects.order_by('-created_at'), 3)
+        with self.assertRaises(InvalidCursor):
+            by_date.page(cursor)
+        with self.assertRaises(InvalidCursor):
+            by_date.page('not-a-cursor')
+        self.assertEqual(list(by_date.get_page('not-a-cursor')), list(by_date.page()))
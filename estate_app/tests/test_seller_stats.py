@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from estate_app import seller_stats, view_tracking
+from estate_app.models import CustomUser, Property, PropertyInquiry
+from estate_app.signals import properties_bulk_updated
+
+from .utils import make_inquiry, make_property, make_user
+
+
+@override_settings(PROPERTY_VIEWS_INLINE_FLUSH=False)
+class SellerStatsSignalTests(TestCase):
+    """Every change path must leave the snapshot equal to a fresh count"""
+
+    def setUp(self):
+        cache.clear()
+        self.seller = make_user('seller@example.com')
+        self.other = make_user('agent@example.com', user_type='agent')
+        # Rows missing until first read would skip the incremental updates
+        seller_stats.get(self.seller)
+        seller_stats.get(self.other)
+
+    def assertInStep(self, *users):
+        for user in users:
+            stats = seller_stats.get(CustomUser.objects.get(pk=user.pk))
+            snapshot = {field: getattr(stats, field) for field in seller_stats.COUNTER_FIELDS}
+            self.assertEqual(snapshot, seller_stats.compute([user.pk])[user.pk])
+
+    def test_property_create(self):
+        make_property(self.seller)
+        make_property(self.seller, status='draft')
+        self.assertInStep(self.seller)
+        self.assertEqual(seller_stats.get(CustomUser.objects.get(pk=self.seller.pk)).properties_total, 2)
+
+    def test_status_change(self):
+        prop = make_property(self.seller)
+        prop.status = 'sold'
+        prop.save()
+        self.assertInStep(self.seller)
+        self.assertEqual(seller_stats.get(CustomUser.objects.get(pk=self.seller.pk)).properties_sold, 1)
+
+    def test_owner_move(self):
+        prop = make_property(self.seller)
+        make_inquiry(prop)
+        prop.owner = self.other
+        prop.save()
+        self.assertInStep(self.seller, self.other)
+        self.assertEqual(seller_stats.get(CustomUser.objects.get(pk=self.other.pk)).inquiries_total, 1)
+
+    def test_inquiry_status_change_and_delete(self):
+        prop = make_property(self.seller)
+        inquiry = make_inquiry(prop)
+        make_inquiry(prop)
+        inquiry.status = 'contacted'
+        inquiry.save()
+        self.assertInStep(self.seller)
+        inquiry.delete()
+        self.assertInStep(self.seller)
+        self.assertEqual(seller_stats.get(CustomUser.objects.get(pk=self.seller.pk)).new_leads, 1)
+
+    def test_property_delete(self):
+        prop = make_property(self.seller)
+        make_inquiry(prop)
+        prop.delete()
+        self.assertInStep(self.seller)
+
+    def test_bulk_update(self):
+        props = [make_property(self.seller) for _ in range(3)]
+        for prop in props:
+            make_inquiry(prop)
+
+        # What the admin actions do: update(), then signal or reconcile
+        queryset = Property.objects.filter(pk__in=[prop.pk for prop in props[:2]])
+        ids = list(queryset.values_list('pk', flat=True))
+        queryset.update(status='inactive', updated_at=timezone.now())
+        properties_bulk_updated.send(sender=Property, ids=ids, fields={'status', 'updated_at'})
+
+        PropertyInquiry.objects.filter(property__owner=self.seller).update(status='interested')
+        seller_stats.reconcile([self.seller.pk])
+        self.assertInStep(self.seller)
+
+    def test_view_flush(self):
+        prop = make_property(self.seller)
+        factory = RequestFactory()
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3'):
+            request = factory.get('/', REMOTE_ADDR=ip)
+            view_tracking.record_view(request, prop.pk)
+        self.assertEqual(view_tracking.flush(), 3)
+        self.assertInStep(self.seller)
+        self.assertEqual(seller_stats.get(CustomUser.objects.get(pk=self.seller.pk)).total_views, 3)
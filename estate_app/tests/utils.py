@@ -0,0 +1,44 @@
+import uuid
+from decimal import Decimal
+
+from estate_app.models import CustomUser, Property, PropertyInquiry
+
+
+def make_user(email, user_type='seller'):
+    return CustomUser.objects.create_user(email=email, password='pass12345', user_type=user_type)
+
+
+def make_property(owner, **fields):
+    values = {
+        'owner': owner,
+        'property_id': uuid.uuid4().hex[:8].upper(),
+        'title': 'Two bedroom apartment',
+        'description': 'Spacious apartment near the park',
+        'property_for': 'sale',
+        'status': 'active',
+        'address': '12 MG Road',
+        'city': 'Pune',
+        'state': 'Maharashtra',
+        'pincode': '411001',
+        'locality': 'Baner',
+        'price': Decimal('5000000'),
+        'carpet_area': Decimal('900'),
+        'bedrooms': 2,
+        'bathrooms': 2,
+        'contact_person': 'Owner',
+        'contact_phone': '+919999999999',
+    }
+    values.update(fields)
+    return Property.objects.create(**values)
+
+
+def make_inquiry(prop, **fields):
+    values = {
+        'property': prop,
+        'name': 'Buyer',
+        'email': 'buyer@example.com',
+        'phone': '+919888888888',
+        'message': 'Is this still available?',
+    }
+    values.update(fields)
+    return PropertyInquiry.objects.create(**values)
@@ -116,8 +116,10 @@ urlpatterns = [
     path("terms/", TemplateView.as_view(template_name="core/terms.html"), name="terms"),
     path("properties_list/", views.properties_list_view, name="properties_list"),
     path('api/featured-properties/', views.api_featured_properties, name='api_featured_properties'),
+    path('api/facets/', views.api_facets, name='api_facets'),
+    path('api/properties/nearby/', views.api_nearby_properties, name='api_nearby_properties'),
+    path('api/autocomplete/locations/', views.api_autocomplete_locations, name='api_autocomplete_locations'),
     path('api/property-types/', views.api_property_types, name='api_property_types'),
-    path('api/property-details/<int:id>/', views.api_property_details, name='api_property_details'),
 
 
     # ======================================================
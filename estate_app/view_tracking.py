@@ -0,0 +1,204 @@
+"""
+Write-behind property view counting.
+
+Recording a view never touches the property row. Each view becomes an event
+in the shared cache, under a sequence number taken with an atomic ``incr``:
+
+    views:seq          -> last sequence number handed out
+    views:event:<seq>  -> the PropertyView fields of one view
+    views:flushed      -> last sequence number written to the database
+
+``flush`` reads the pending events in batches, applies the aggregated
+deltas with ``UPDATE ... SET view_count = view_count + n`` (one statement per
+distinct n), bulk-inserts the PropertyView rows and adds the views to the
+owners' SellerStats. It runs from the ``flush_property_views`` command
+(cron/worker) and, unless ``PROPERTY_VIEWS_INLINE_FLUSH`` is False, from the
+first request recording a view after ``FLUSH_INTERVAL`` seconds or once
+``FLUSH_THRESHOLD`` views are pending. The inline flush is also what drains a per-process LocMemCache,
+which a separate command process can't see.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import seller_stats
+from .models import CustomUser, Property, PropertyView
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_KEY = 'views:seq'
+FLUSHED_KEY = 'views:flushed'
+FLUSH_LOCK_KEY = 'views:flush_lock'
+FLUSH_DUE_KEY = 'views:flush_due'
+
+EVENT_TIMEOUT = 60 * 60 * 24    # unflushed events are kept for a day
+FLUSH_INTERVAL = 30             # seconds between inline flushes
+FLUSH_THRESHOLD = 100           # ...or as soon as this many views are pending
+FLUSH_LOCK_TIMEOUT = 300
+FLUSH_BATCH_SIZE = 500
+
+# A missing event among the newest ones may still be being written
+IN_FLIGHT_GRACE = 50
+
+# Views counted per IP and property per hour
+VIEW_RATE_LIMIT = 10
+VIEW_RATE_WINDOW = 3600
+
+
+def _event_key(seq):
+    return f'views:event:{seq}'
+
+
+def get_client_ip(request):
+    """Get client IP address"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def get_device_type(request):
+    """Determine device type from user agent"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '').lower()
+    if any(bot in user_agent for bot in ['bot', 'crawler', 'spider']):
+        return 'bot'
+    if 'tablet' in user_agent or 'ipad' in user_agent:
+        return 'tablet'
+    if any(device in user_agent for device in ['mobile', 'android', 'iphone']):
+        return 'mobile'
+    return 'desktop'
+
+
+def _next_sequence():
+    cache.add(SEQUENCE_KEY, 0, None)
+    try:
+        return cache.incr(SEQUENCE_KEY)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(SEQUENCE_KEY, 1, None)
+        return 1
+
+
+def record_view(request, property_id):
+    """Buffer one view of a property; returns False if it was rate limited"""
+    ip = get_client_ip(request) or '0.0.0.0'
+    rate_key = f'view_rate:{ip}:{property_id}'
+    cache.add(rate_key, 0, VIEW_RATE_WINDOW)
+    try:
+        if cache.incr(rate_key) > VIEW_RATE_LIMIT:
+            return False
+    except ValueError:
+        cache.set(rate_key, 1, VIEW_RATE_WINDOW)
+
+    user = getattr(request, 'user', None)
+    authenticated = bool(user and user.is_authenticated)
+    session = getattr(request, 'session', None)
+    event = {
+        'property_id': property_id,
+        'user_id': user.pk if authenticated else None,
+        'session_key': session.session_key if session is not None and not authenticated else None,
+        'ip_address': ip,
+        'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        'referrer': request.META.get('HTTP_REFERER', ''),
+        'device_type': get_device_type(request),
+        'viewed_at': timezone.now(),
+    }
+    seq = _next_sequence()
+    cache.set(_event_key(seq), event, EVENT_TIMEOUT)
+
+    if not getattr(settings, 'PROPERTY_VIEWS_INLINE_FLUSH', True):
+        return True
+    due = seq - (cache.get(FLUSHED_KEY) or 0) >= FLUSH_THRESHOLD
+    if cache.add(FLUSH_DUE_KEY, 1, FLUSH_INTERVAL) or due:
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Error flushing property views: {e}")
+    return True
+
+
+def pending_count():
+    """Number of buffered views not yet written"""
+    return max((cache.get(SEQUENCE_KEY) or 0) - (cache.get(FLUSHED_KEY) or 0), 0)
+
+
+def flush(batch_size=FLUSH_BATCH_SIZE):
+    """Write buffered views to the database; returns the number written"""
+    if not cache.add(FLUSH_LOCK_KEY, 1, FLUSH_LOCK_TIMEOUT):
+        return 0  # another process is flushing
+    written = 0
+    try:
+        current = cache.get(SEQUENCE_KEY) or 0
+        flushed = cache.get(FLUSHED_KEY) or 0
+        if flushed > current:
+            flushed = 0  # the sequence was reset (cache flushed or evicted)
+
+        while flushed < current:
+            end = min(flushed + batch_size, current)
+            found = cache.get_many([_event_key(seq) for seq in range(flushed + 1, end + 1)])
+
+            claimed = {}
+            done = flushed
+            for seq in range(flushed + 1, end + 1):
+                key = _event_key(seq)
+                if key not in found:
+                    if current - seq < IN_FLIGHT_GRACE:
+                        break  # probably still being written; retry next flush
+                # Deleting claims the event, so a view is never written twice
+                # even if two flushes overlap (e.g. the lock was evicted)
+                elif cache.delete(key):
+                    claimed[key] = found[key]
+                done = seq
+
+            try:
+                written += _write(list(claimed.values()))
+            except Exception:
+                cache.set_many(claimed, EVENT_TIMEOUT)  # put them back
+                raise
+            cache.set(FLUSHED_KEY, done, None)
+            if done < end:
+                break
+            flushed = done
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
+    if written:
+        logger.info(f"Flushed {written} property views")
+    return written
+
+
+def _write(events):
+    """Apply a batch of view events; returns the number of views written"""
+    if not events:
+        return 0
+    property_ids = {event['property_id'] for event in events}
+    owners = dict(Property.objects.filter(pk__in=property_ids).values_list('pk', 'owner_id'))
+    user_ids = {event['user_id'] for event in events if event['user_id']}
+    users = set(CustomUser.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+    deltas = defaultdict(int)
+    rows = []
+    for event in events:
+        if event['property_id'] not in owners:
+            continue  # deleted since
+        deltas[event['property_id']] += 1
+        rows.append(PropertyView(**dict(event, user_id=event['user_id'] if event['user_id'] in users else None)))
+
+    # One UPDATE per distinct increment
+    by_delta = defaultdict(list)
+    owner_deltas = defaultdict(int)
+    for property_id, delta in deltas.items():
+        by_delta[delta].append(property_id)
+        owner_deltas[owners[property_id]] += delta
+
+    with transaction.atomic():
+        for delta, ids in by_delta.items():
+            Property.objects.filter(pk__in=ids).update(view_count=F('view_count') + delta)
+        PropertyView.objects.bulk_create(rows, batch_size=FLUSH_BATCH_SIZE)
+        seller_stats.add_views(owner_deltas)
+    return len(rows)
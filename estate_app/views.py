@@ -6,11 +6,13 @@ from django.contrib.sites.shortcuts import get_current_site
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.template.loader import render_to_string
-from django.core.mail import EmailMessage
 from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+import logging
 import uuid
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
@@ -19,6 +21,16 @@ from .models import Property, PropertyType, PropertyInquiry
 from .models import CustomUser, UserProfile, Property, PropertyCategory, PropertyInquiry, PropertyView, PropertyFavorite, PropertyType, PropertyImage
 from .forms import UserRegistrationForm, UserLoginForm, UserProfileForm, EmailVerificationForm
 from .tokens import account_activation_token
+from .filters import HOME_SPEC, LISTING_SPEC, PropertyFilter
+from . import result_cache
+from .facets import get_facets
+from .pagination import KeysetPaginator, InvalidCursor, wants_cursor
+from . import geo, conditional, outbox, renditions
+from .autocomplete import location_index, DEFAULT_LIMIT, MAX_LIMIT
+from .view_tracking import record_view
+from .serializers import InvalidFields, Projection, listing_queryset, serialize_listings
+
+logger = logging.getLogger(__name__)
 
 # ==============================================
 #  Authentication Views
@@ -323,36 +335,26 @@ def send_verification_email(request, user):
     {site_url}
     """
     
-    # Create EmailMessage object
-    email = EmailMessage(
-        subject=mail_subject,
-        body=message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[user.email],
-    )
-    
-    # Set content type to HTML
-    email.content_subtype = "html"
-    
-    # Add alternative plain text version
-    email.alternatives = [(plain_message, 'text/plain')]
-    
     try:
-        # Send email
-        email.send(fail_silently=False)
-        
-        # Update user's verification sent timestamp
-        user.verification_sent_at = timezone.now()
-        user.save(update_fields=['verification_sent_at'])
+        # Queued in the caller's transaction; process_outbox sends it
+        with transaction.atomic():
+            outbox.enqueue(
+                mail_subject,
+                user.email,
+                body=plain_message,
+                html_body=message,
+                category='verification',
+            )
+            
+            # Update user's verification sent timestamp
+            user.verification_sent_at = timezone.now()
+            user.save(update_fields=['verification_sent_at'])
         
-        print(f"DEBUG: Email sent successfully to {user.email}")
+        logger.info(f"Verification email queued for {user.email}")
         return True
         
-    except Exception as e:
-        print(f"DEBUG: Error sending email: {str(e)}")
-        print(f"DEBUG: Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception(f"Could not queue verification email for {user.email}")
         return False
 
 def verify_email_view(request, uidb64, token):
@@ -839,7 +841,6 @@ from django.http import JsonResponse
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
 from django.conf import settings
 import json
 
@@ -847,22 +848,24 @@ from .models import Property, PropertyType
 
 def home_view(request):
     """Home page with featured properties and premier houses"""
+    listings = Property.objects.select_related('owner').prefetch_related('images')
     
     # Get featured properties (no login required)
-    featured_properties = Property.objects.filter(
-        status='active',
-        is_featured=True
-    ).select_related('owner').prefetch_related('images')[:3]  # Limit to 3
-    
-    # Get all active properties for premier section (will be filtered by JS)
-    premier_properties = Property.objects.filter(
-        status='active'
-    ).select_related('owner').prefetch_related('images')
-    
-    # Order by urgent first, then by upload date
-    premier_properties = premier_properties.order_by(
-        '-is_urgent', '-created_at'
-    )[:8]  # Limit to 8
+    featured = PropertyFilter(featured_only=True)
+    featured_ids = result_cache.get_ids(
+        featured, lambda: featured.id_queryset()[:3],
+        variant=':3', swr=True,
+    )  # Limit to 3
+    featured_properties = result_cache.hydrate(featured_ids, listings)
+    
+    # Get all active properties for premier section (will be filtered by JS),
+    # urgent first, then by upload date
+    premier = PropertyFilter(sort='-is_urgent,-created_at')
+    premier_ids = result_cache.get_ids(
+        premier, lambda: premier.id_queryset()[:8],
+        variant=':8', swr=True,
+    )  # Limit to 8
+    premier_properties = result_cache.hydrate(premier_ids, listings)
     
     context = {
         'featured_properties': featured_properties,
@@ -876,50 +879,15 @@ def home_view(request):
 def api_filter_properties(request):
     """API endpoint for filtering properties (no login required)"""
     
-    # Get filter parameters
-    property_type = request.GET.get('property_type', '')
-    price_range = request.GET.get('price_range', '')
-    location = request.GET.get('location', '')
-    bedrooms = request.GET.get('bedrooms', '')
-    
-    # Base queryset - only active properties
-    properties = Property.objects.filter(status='active')
-    
-    # Apply filters
-    if property_type:
-        properties = properties.filter(
-            Q(title__icontains=property_type) |
-            Q(property_type__name__icontains=property_type)
-        )
-    
-    if price_range:
-        try:
-            if price_range == '1000000+':
-                properties = properties.filter(price__gte=1000000)
-            else:
-                min_price, max_price = map(int, price_range.split('-'))
-                properties = properties.filter(price__gte=min_price, price__lte=max_price)
-        except (ValueError, TypeError):
-            pass
-    
-    if location:
-        properties = properties.filter(
-            Q(city__icontains=location) |
-            Q(locality__icontains=location) |
-            Q(address__icontains=location)
-        )
+    # Base queryset - only active properties, filtered by the shared engine
+    filters = HOME_SPEC.parse(request.GET, sort='')
     
-    if bedrooms and bedrooms != '0':
-        if bedrooms == '4':
-            properties = properties.filter(bedrooms__gte=4)
-        else:
-            try:
-                properties = properties.filter(bedrooms=int(bedrooms))
-            except ValueError:
-                pass
-    
-    # Limit to 20 results for performance
-    properties = properties[:20]
+    # Limit to 20 results for performance; the ordered ids are cached
+    ids = result_cache.get_ids(
+        filters, lambda: filters.id_queryset()[:20],
+        variant=':20', swr=True,
+    )
+    properties = result_cache.hydrate(ids, Property.objects.all())
     
     # Format properties for JSON
     properties_data = []
@@ -935,7 +903,8 @@ def api_filter_properties(request):
             'address': f"{prop.locality or ''} {prop.city}",
             'city': prop.city,
             'property_for': prop.get_property_for_display(),
-            'image': prop.primary_image.url if prop.primary_image else '/static/images/property-placeholder.jpg',
+            'image': renditions.url(prop.primary_image, prop.primary_image_renditions) if prop.primary_image else '/static/images/property-placeholder.jpg',
+            'image_srcset': renditions.as_json(prop.primary_image, prop.primary_image_renditions, 'card'),
             'is_urgent': prop.is_urgent,
             'is_featured': prop.is_featured,
         })
@@ -947,50 +916,6 @@ def api_filter_properties(request):
     })
 
 
-def api_property_details(request, property_id):
-    """API endpoint for property details"""
-    try:
-        property = Property.objects.get(id=property_id, status='active')
-        
-        # Increment view count
-        property.view_count += 1
-        property.save(update_fields=['view_count'])
-        
-        data = {
-            'success': True,
-            'property': {
-                'id': property.id,
-                'title': property.title,
-                'description': property.description,
-                'price': float(property.price),
-                'price_formatted': f"₹{property.price:,.0f}" if property.property_for != 'rent' else f"₹{property.price:,.0f}/mo",
-                'price_per_sqft': float(property.price_per_sqft) if property.price_per_sqft else None,
-                'carpet_area': float(property.carpet_area) if property.carpet_area else None,
-                'bedrooms': property.bedrooms,
-                'bathrooms': property.bathrooms,
-                'balconies': property.balconies,
-                'city': property.city,
-                'locality': property.locality,
-                'address': property.address,
-                'property_for': property.get_property_for_display(),
-                'furnishing': property.get_furnishing_display() if property.furnishing else None,
-                'amenities': property.amenities,
-                'possession_status': property.possession_status,
-                'age_of_property': property.age_of_property,
-                'contact_person': property.contact_person,
-                'contact_phone': property.contact_phone,
-                'contact_email': property.contact_email,
-                'image': property.primary_image.url if property.primary_image else '/static/images/property-placeholder.jpg',
-                'is_urgent': property.is_urgent,
-                'is_featured': property.is_featured,
-            }
-        }
-        
-        return JsonResponse(data)
-    except Property.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Property not found'}, status=404)
-
-
 def api_send_contact(request):
     """API endpoint for contact form (no login required)"""
     if request.method == 'POST':
@@ -1028,13 +953,13 @@ def api_send_contact(request):
             {property_info}
             """
             
-            # Send email
-            send_mail(
+            # Queue the email; process_outbox sends it
+            outbox.enqueue(
                 subject,
-                email_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.CONTACT_EMAIL],
-                fail_silently=False,
+                getattr(settings, 'CONTACT_EMAIL', settings.ADMIN_EMAIL),
+                body=email_message,
+                reply_to=[email] if email else None,
+                category='contact',
             )
             
             # Also save to database if you have a Contact model
@@ -1062,10 +987,14 @@ def premier_properties_view(request):
         status='active'
     ).order_by('-is_urgent', '-created_at')
     
-    # Paginate
-    paginator = Paginator(properties, 12)
-    page = request.GET.get('page', 1)
-    properties_page = paginator.get_page(page)
+    # Paginate (keyset pagination when a cursor is passed)
+    if wants_cursor(request):
+        paginator = KeysetPaginator(properties, 12, count_cache_key='premier_properties:count')
+        properties_page = paginator.get_page(request.GET.get('cursor'), request.GET)
+    else:
+        paginator = Paginator(properties, 12)
+        page = request.GET.get('page', 1)
+        properties_page = paginator.get_page(page)
     
     context = {
         'properties': properties_page,
@@ -1082,105 +1011,19 @@ def properties_list_view(request):
     """Display featured properties with filters"""
     
     # Base queryset - only active and featured properties
-    properties = Property.objects.filter(
-        status='active',
-        is_featured=True
-    ).select_related('owner', 'owner__profile').prefetch_related('images')
-    
-    # Apply search filters
-    search_query = request.GET.get('q', '')
-    if search_query:
-        properties = properties.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query) |
-            Q(locality__icontains=search_query)
-        )
-    
-    # City filter
-    city = request.GET.get('city', '')
-    if city:
-        properties = properties.filter(city__icontains=city)
-    
-    # Property for filter (sale/rent)
-    property_for = request.GET.get('property_for', '')
-    if property_for:
-        properties = properties.filter(property_for=property_for)
-    
-    # Price range filter
-    price_range = request.GET.get('price_range', '')
-    if price_range:
-        if price_range == 'under_50l':
-            properties = properties.filter(price__lt=5000000)
-        elif price_range == '50l_1cr':
-            properties = properties.filter(price__gte=5000000, price__lt=10000000)
-        elif price_range == '1cr_2cr':
-            properties = properties.filter(price__gte=10000000, price__lt=20000000)
-        elif price_range == 'above_2cr':
-            properties = properties.filter(price__gte=20000000)
-    
-    # Min/Max price
-    min_price = request.GET.get('min_price')
-    if min_price:
-        try:
-            properties = properties.filter(price__gte=float(min_price))
-        except ValueError:
-            pass
-    
-    max_price = request.GET.get('max_price')
-    if max_price:
-        try:
-            properties = properties.filter(price__lte=float(max_price))
-        except ValueError:
-            pass
-    
-    # Property type filter
-    property_type_ids = request.GET.getlist('property_type')
-    if property_type_ids:
-        properties = properties.filter(property_type_id__in=property_type_ids)
-    
-    # BHK filter
-    bhk = request.GET.get('bhk')
-    if bhk:
-        if bhk == '4plus':
-            properties = properties.filter(bedrooms__gte=4)
-        else:
-            try:
-                properties = properties.filter(bedrooms=int(bhk))
-            except ValueError:
-                pass
-    
-    # Amenities filter
-    amenities = request.GET.getlist('amenities')
-    if amenities:
-        for amenity in amenities:
-            properties = properties.filter(amenities__selected__contains=[amenity])
-    
-    # Possession filter
-    possession = request.GET.get('possession')
-    if possession == 'ready':
-        properties = properties.filter(possession_status__icontains='ready')
-    elif possession == 'under_construction':
-        properties = properties.filter(possession_status__icontains='construction')
-    
-    # Sorting
-    sort_by = request.GET.get('sort', '-created_at')
-    valid_sort_fields = ['price', '-price', 'created_at', '-created_at', 'view_count', '-view_count', 'inquiry_count', '-inquiry_count']
-    if sort_by in valid_sort_fields:
-        properties = properties.order_by(sort_by)
-    else:
-        properties = properties.order_by('-created_at')
+    filters = LISTING_SPEC.parse(request.GET, featured_only=True)
+    properties = filters.queryset().select_related('owner', 'owner__profile').prefetch_related('images')
     
     # Get user favorites if logged in
     user_favorites = []
     if request.user.is_authenticated:
         user_favorites = request.user.favorites.values_list('property_id', flat=True)
     
-    # Pagination
-    paginator = Paginator(properties, 10)  # Show 10 properties per page
+    # Pagination - page through ids on the narrow index, then fetch the page
+    paginator = Paginator(filters.id_queryset(), 10)  # Show 10 properties per page
     page_number = request.GET.get('page')
     featured_properties = paginator.get_page(page_number)
+    featured_properties.object_list = result_cache.hydrate(list(featured_properties.object_list), properties)
     
     # Get all property types for filter
     property_types = PropertyType.objects.filter(is_active=True)
@@ -1198,203 +1041,206 @@ from django.core.paginator import Paginator
 from django.db.models import Q
 from .models import Property, PropertyType
 
+@cache_control(no_cache=True)
+@condition(etag_func=conditional.featured_properties_etag)
 def api_featured_properties(request):
     """API endpoint for featured properties with filters - returns JSON"""
     
     # Base queryset - only active and featured properties
-    properties = Property.objects.filter(
-        status='active',
-        is_featured=True
-    ).select_related('owner').prefetch_related('images')
-    
-    # Apply filters
-    search_query = request.GET.get('q', '')
-    if search_query:
-        properties = properties.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(address__icontains=search_query) |
-            Q(city__icontains=search_query) |
-            Q(locality__icontains=search_query)
-        )
+    filters = LISTING_SPEC.parse(request.GET, featured_only=True)
+    try:
+        projection = Projection.from_request(request.GET, default_view='list')
+    except InvalidFields as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    properties = listing_queryset(filters.queryset(), projection)
     
-    city = request.GET.get('city', '')
-    if city:
-        properties = properties.filter(city__icontains=city)
-    
-    property_for = request.GET.get('property_for', '')
-    if property_for:
-        properties = properties.filter(property_for=property_for)
-    
-    # Price range
-    price_range = request.GET.get('price_range', '')
-    if price_range:
-        if price_range == 'under_50l':
-            properties = properties.filter(price__lt=5000000)
-        elif price_range == '50l_1cr':
-            properties = properties.filter(price__gte=5000000, price__lt=10000000)
-        elif price_range == '1cr_2cr':
-            properties = properties.filter(price__gte=10000000, price__lt=20000000)
-        elif price_range == 'above_2cr':
-            properties = properties.filter(price__gte=20000000)
-    
-    # Min/Max price
-    min_price = request.GET.get('min_price')
-    if min_price:
-        try:
-            properties = properties.filter(price__gte=float(min_price))
-        except ValueError:
-            pass
+    # Pagination
+    page = int(request.GET.get('page', 1))
+    page_size = int(request.GET.get('page_size', 8))
     
-    max_price = request.GET.get('max_price')
-    if max_price:
+    if wants_cursor(request):
+        # Keyset pagination (opt-in): no COUNT(*) and no OFFSET
+        paginator = KeysetPaginator(
+            properties, page_size,
+            count_cache_key=f"{filters.without('sort').cache_key}:count",
+        )
         try:
-            properties = properties.filter(price__lte=float(max_price))
-        except ValueError:
-            pass
+            page_obj = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    else:
+        # Paginate the cached id list when the search is small enough to cache
+        ids = result_cache.get_ids(filters, lambda: filters.id_queryset())
+        paginator = Paginator(ids if ids is not None else properties, page_size)
+        total_pages = paginator.num_pages
+        total_count = paginator.count
+        
+        if page > total_pages:
+            page = total_pages
+        
+        page_obj = paginator.get_page(page)
+        if ids is not None:
+            page_obj.object_list = result_cache.hydrate(list(page_obj.object_list), properties)
     
-    # Property types
-    property_type_ids = request.GET.getlist('property_type')
-    if property_type_ids:
-        properties = properties.filter(property_type_id__in=property_type_ids)
+    # Format properties for JSON (constant query count per page)
+    properties_data = serialize_listings(page_obj.object_list, projection)
     
-    # BHK
-    bhk = request.GET.get('bhk')
-    if bhk:
-        if bhk == '4plus':
-            properties = properties.filter(bedrooms__gte=4)
-        else:
-            try:
-                properties = properties.filter(bedrooms=int(bhk))
-            except ValueError:
-                pass
-    
-    # Amenities
-    amenities = request.GET.getlist('amenities')
-    if amenities:
-        for amenity in amenities:
-            properties = properties.filter(amenities__selected__contains=[amenity])
-    
-    # Possession
-    possession = request.GET.get('possession')
-    if possession == 'ready':
-        properties = properties.filter(possession_status__icontains='ready')
-    elif possession == 'under_construction':
-        properties = properties.filter(possession_status__icontains='construction')
-    
-    # Sorting
-    sort_by = request.GET.get('sort', '-created_at')
-    valid_sort_fields = ['price', '-price', 'created_at', '-created_at', 'view_count', '-view_count']
-    if sort_by in valid_sort_fields:
-        properties = properties.order_by(sort_by)
-    else:
-        properties = properties.order_by('-created_at')
+    if wants_cursor(request):
+        data = {
+            'properties': properties_data,
+            'next_cursor': page_obj.next_cursor,
+            'has_next': page_obj.has_next(),
+        }
+        # The total is an optional, cached estimate in cursor mode
+        if request.GET.get('include_total'):
+            data['total_estimate'] = paginator.count
+        return JsonResponse(data)
     
-    # Pagination
-    page = int(request.GET.get('page', 1))
-    page_size = int(request.GET.get('page_size', 8))
+    return JsonResponse({
+        'properties': properties_data,
+        'total_pages': total_pages,
+        'total_count': total_count,
+        'current_page': page,
+        'has_next': page_obj.has_next(),
+        'has_previous': page_obj.has_previous(),
+    })
+
+def api_facets(request):
+    """API endpoint for facet counts - accepts the same filters as api_featured_properties"""
+    filters = LISTING_SPEC.parse(request.GET, featured_only=True)
+    return JsonResponse({
+        'success': True,
+        'facets': get_facets(filters),
+    })
+
+MAX_NEARBY_RADIUS_KM = 100
+MAX_NEARBY_RESULTS = 100
+
+def _parse_float(value, low, high):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if low <= number <= high else None
+
+
+def api_nearby_properties(request):
+    """
+    API endpoint for geo search - returns JSON
     
-    paginator = Paginator(properties, page_size)
-    total_pages = paginator.num_pages
-    total_count = paginator.count
+    Radius search:   ?lat=&lng=&radius_km=   (sorted by distance by default)
+    Viewport search: ?bbox=min_lng,min_lat,max_lng,max_lat
+    Accepts the same filters as api_featured_properties (price, bhk, ...).
+    """
+    filters = LISTING_SPEC.parse(request.GET)
+    properties = filters.queryset().filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).select_related('owner').prefetch_related('images')
     
-    if page > total_pages:
-        page = total_pages
+    sort_by = request.GET.get('sort', '')
+    bbox = request.GET.get('bbox', '')
+    lat = lng = None
+    
+    if bbox:
+        parts = bbox.split(',')
+        if len(parts) != 4:
+            return JsonResponse({'success': False, 'error': 'bbox must be min_lng,min_lat,max_lng,max_lat'}, status=400)
+        min_lng, max_lng = _parse_float(parts[0], -180, 180), _parse_float(parts[2], -180, 180)
+        min_lat, max_lat = _parse_float(parts[1], -90, 90), _parse_float(parts[3], -90, 90)
+        if None in (min_lng, min_lat, max_lng, max_lat) or min_lat > max_lat or min_lng > max_lng:
+            return JsonResponse({'success': False, 'error': 'Invalid bbox'}, status=400)
+        properties = geo.within_bbox(properties, min_lat, min_lng, max_lat, max_lng)
+        
+        # Distance from the viewport centre, if a point wasn't given explicitly
+        lat = _parse_float(request.GET.get('lat'), -90, 90)
+        lng = _parse_float(request.GET.get('lng'), -180, 180)
+        if lat is None or lng is None:
+            lat, lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+        properties = properties.annotate(distance_km=geo.distance_expression(lat, lng))
+    else:
+        lat = _parse_float(request.GET.get('lat'), -90, 90)
+        lng = _parse_float(request.GET.get('lng'), -180, 180)
+        if lat is None or lng is None:
+            return JsonResponse({'success': False, 'error': 'lat and lng (or bbox) are required'}, status=400)
+        radius_km = _parse_float(request.GET.get('radius_km', 5), 0, MAX_NEARBY_RADIUS_KM)
+        if not radius_km:
+            return JsonResponse({'success': False, 'error': f'radius_km must be between 0 and {MAX_NEARBY_RADIUS_KM}'}, status=400)
+        properties = geo.within_radius(properties, lat, lng, radius_km)
+        if not sort_by:
+            sort_by = 'distance'
+    
+    if sort_by == 'distance':
+        properties = properties.order_by('distance_km', 'id')
     
-    page_obj = paginator.get_page(page)
+    try:
+        limit = min(int(request.GET.get('limit', 20)), MAX_NEARBY_RESULTS)
+    except ValueError:
+        limit = 20
     
-    # Format properties for JSON
     properties_data = []
-    for prop in page_obj:
-        prop_data = {
+    for prop in properties[:max(limit, 1)]:
+        properties_data.append({
             'id': prop.id,
             'title': prop.title,
-            'description': prop.description,
             'price': float(prop.price),
-            'price_per_sqft': float(prop.price_per_sqft) if prop.price_per_sqft else None,
-            'carpet_area': float(prop.carpet_area) if prop.carpet_area else None,
+            'price_formatted': f"₹{prop.price:,.0f}" if prop.property_for != 'rent' else f"₹{prop.price:,.0f}/mo",
             'bedrooms': prop.bedrooms,
             'bathrooms': prop.bathrooms,
             'city': prop.city,
             'locality': prop.locality,
-            'address': prop.address,
             'property_for': prop.property_for,
-            'furnishing': prop.furnishing,
-            'furnishing_display': prop.get_furnishing_display() if prop.furnishing else None,
-            'amenities': prop.amenities,
+            'latitude': float(prop.latitude),
+            'longitude': float(prop.longitude),
+            'distance_km': round(prop.distance_km, 2),
+            'primary_image': prop.primary_image.url if prop.primary_image else None,
+            'primary_image_srcset': renditions.as_json(prop.primary_image, prop.primary_image_renditions, 'card'),
             'is_featured': prop.is_featured,
-            'is_premium': prop.is_premium,
-            'is_verified': prop.is_verified,
             'is_urgent': prop.is_urgent,
-            'contact_person': prop.contact_person,
-            'contact_phone': prop.contact_phone,
-            'contact_email': prop.contact_email,
-            'primary_image': prop.primary_image.url if prop.primary_image else None,
-            'images_count': prop.images.count(),
-            'owner_initials': prop.owner.first_name[0] + prop.owner.last_name[0] if prop.owner.first_name and prop.owner.last_name else 'U',
-            'owner_type': prop.owner.get_user_type_display() if prop.owner else 'Individual Owner',
-            'status_display': prop.get_status_display(),
-        }
-        
-        # Add images if needed
-        if prop.images.exists():
-            prop_data['images'] = [{'image': img.image.url} for img in prop.images.all()[:5]]
-        
-        properties_data.append(prop_data)
+        })
     
     return JsonResponse({
+        'success': True,
         'properties': properties_data,
-        'total_pages': total_pages,
-        'total_count': total_count,
-        'current_page': page,
-        'has_next': page_obj.has_next(),
-        'has_previous': page_obj.has_previous(),
+        'count': len(properties_data),
+    })
+
+def api_autocomplete_locations(request):
+    """API endpoint for city/locality/pincode suggestions - served from memory"""
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    suggestions = location_index.suggest(request.GET.get('q', ''), max(limit, 1))
+    return JsonResponse({
+        'success': True,
+        'suggestions': suggestions,
     })
 
+@cache_control(no_cache=True)
+@condition(etag_func=conditional.property_types_etag)
 def api_property_types(request):
     """API endpoint to get all property types"""
     types = PropertyType.objects.filter(is_active=True).values('id', 'name')
     return JsonResponse(list(types), safe=False)
 
-def api_property_details(request, id):
-    """API endpoint to get single property details"""
+@cache_control(no_cache=True)
+@condition(etag_func=conditional.property_etag, last_modified_func=conditional.property_last_modified)
+def api_property_details(request, property_id):
+    """API endpoint to get single property details (?view= / ?fields= select the fields)"""
     try:
-        property = Property.objects.get(id=id, status='active')
-        
-        data = {
-            'success': True,
-            'property': {
-                'id': property.id,
-                'title': property.title,
-                'description': property.description,
-                'price': float(property.price),
-                'price_per_sqft': float(property.price_per_sqft) if property.price_per_sqft else None,
-                'carpet_area': float(property.carpet_area) if property.carpet_area else None,
-                'builtup_area': float(property.builtup_area) if property.builtup_area else None,
-                'bedrooms': property.bedrooms,
-                'bathrooms': property.bathrooms,
-                'balconies': property.balconies,
-                'city': property.city,
-                'locality': property.locality,
-                'address': property.address,
-                'property_for': property.property_for,
-                'furnishing': property.furnishing,
-                'furnishing_display': property.get_furnishing_display() if property.furnishing else None,
-                'amenities': property.amenities,
-                'possession_status': property.possession_status,
-                'age_of_property': property.age_of_property,
-                'contact_person': property.contact_person,
-                'contact_phone': property.contact_phone,
-                'contact_email': property.contact_email,
-                'status_display': property.get_status_display(),
-                'primary_image': property.primary_image.url if property.primary_image else None,
-            }
-        }
-        
-        # Increment view count
-        property.view_count += 1
-        property.save(update_fields=['view_count'])
-        
-        return JsonResponse(data)
-    except Property.DoesNotExist:
-        return JsonResponse({'success': False, 'error': 'Property not found'}, status=404)
\ No newline at end of file
+        projection = Projection.from_request(request.GET, default_view='full')
+    except InvalidFields as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    properties = listing_queryset(Property.objects.filter(id=property_id, status='active'), projection)
+    property_data = serialize_listings(properties, projection)
+    if not property_data:
+        return JsonResponse({'success': False, 'error': 'Property not found'}, status=404)
+    
+    # Track view (buffered, written by the periodic flush)
+    record_view(request, property_id)
+    
+    return JsonResponse({
+        'success': True,
+        'property': property_data[0],
+    })